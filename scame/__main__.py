@@ -1,297 +1,399 @@
 import os
 import re
-import subprocess
 import sys
-from optparse import OptionParser
+import time
 
-from scame import __version__
-from scame.formatcheck import (
-    DEFAULT_MAX_LENGTH,
-    Language,
-    Reporter,
-    ScameOptions,
-    UniversalChecker,
-)
+from scame import formatcheck
+from scame.commandline import REPORT_TYPES, parse_command_line
+from scame.formatcheck import Language, Reporter, is_in_ranges
+from scame.runner import get_results
 
 
-def parse_command_line(args):
+def _get_all_files(dir_path, path_filter=None):
     """
-    Return the `options` based on the command line arguments.
+    Generated all the files in the dir_path tree (recursive),
+    in the same order as `os.walk`.
+
+    The folders excluded by `path_filter` are not visited.
     """
-    usage = "usage: %prog [options] path1 path2"
-    parser = OptionParser(
-        usage=usage,
-        version=__version__,
-    )
-    parser.add_option(
-        "-q", "--quiet", action="store_false", dest="verbose", help="Show errors only."
-    )
-    parser.add_option(
-        "--progress",
-        action="store_true",
-        dest="progress",
-        help="Show a dot for each processed file.",
-    )
+    pending = [dir_path]
+    while pending:
+        root = pending.pop()
+        try:
+            with os.scandir(root) as entries:
+                entries = list(entries)
+        except OSError:
+            # Ignored, as done by os.walk.
+            continue
 
-    parser.add_option(
-        "--pycodestyle",
-        dest="pycodestyle",
-        action="store_true",
-        help="Enable pycodestyle checks.",
-    )
-    parser.add_option(
-        "-a",
-        "--align-closing",
-        dest="hang_closing",
-        action="store_false",
-        help="Align the closing bracket with the matching opening.",
-    )
+        folders = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if not is_dir:
+                yield entry.path
+                continue
+            if entry.is_symlink():
+                # Links to folders are not followed, as done by os.walk.
+                continue
+            if path_filter is not None and path_filter.is_excluded_folder(entry.path):
+                continue
+            folders.append(entry.path)
+        pending.extend(reversed(folders))
 
-    parser.add_option(
-        "--bandit", dest="bandit", action="store_true", help="Enable bandit checks."
-    )
 
-    parser.add_option(
-        "--diff-branch",
-        dest="diff_branch",
-        help="Name of the branch to use as base for changed files.",
-    )
-    parser.add_option(
-        "--exclude",
-        dest="exclude",
-        help="Comma separated list of regex paths to exclude.",
-    )
+def _compile_any(patterns):
+    """
+    Return a list of regex which together match any of the `patterns`.
 
-    parser.add_option(
-        "-m",
-        "--max-length",
-        dest="max_line_length",
-        type="int",
-        help="Set the max line length (default %s)" % DEFAULT_MAX_LENGTH,
-    )
-    parser.add_option(
-        "--max-complexity",
-        dest="max_complexity",
-        type="int",
-        help="Set the max complexity (default -1 - disabled)",
-    )
-    parser.set_defaults(
-        verbose=True,
-        hang_closing=True,
-        max_line_length=DEFAULT_MAX_LENGTH,
-        max_complexity=-1,
-        diff_branch=None,
-        exclude="",
-        pycodestyle=False,
-        bandit=False,
-    )
+    The patterns are combined into a single regex, when possible.
+    """
+    if len(patterns) > 1:
+        try:
+            return [re.compile("|".join("(?:%s)" % (pattern,) for pattern in patterns))]
+        except re.error:
+            # Patterns with conflicting group names or global flags.
+            pass
+    return [re.compile(pattern) for pattern in patterns]
 
-    (command_options, sources) = parser.parse_args(args=args)
-
-    # Create options based on parsed command line.
-    options = ScameOptions()
-    options.verbose = command_options.verbose
-    options.progress = command_options.progress
-    options.max_line_length = command_options.max_line_length
-    options.mccabe["max_complexity"] = command_options.max_complexity
-    options.bandit["enabled"] = command_options.bandit
-    options.pycodestyle["enabled"] = command_options.pycodestyle
-    options.pycodestyle["hang_closing"] = command_options.hang_closing
-    options.diff_branch = command_options.diff_branch
-
-    exclude = []
-    for part in command_options.exclude.split(","):
-        part = part.strip()
-        if not part:
-            continue
-        exclude.append(part)
 
-    options.scope["include"] = sources
-    options.scope["exclude"] = exclude
+class _PathFilter:
+    """
+    Selects the paths using the include prefixes and the exclude regex
+    from the `scope` option.
 
-    return options
+    The files inside the `ignored` folders, as the cache folder, are
+    always excluded.
+    """
 
+    # Parts of a regex which depend on the text after the match, so that
+    # a match for a folder is not a match for all the paths inside it.
+    _LOOK_AHEAD = re.compile(r"\$|\\[ZbB]|\(\?[=!]")
 
-def _get_all_files(dir_path):
-    """
-    Generated all the files in the dir_path tree (recursive),
-    """
-    for root, _, filenames in os.walk(dir_path):
-        for name in filenames:
-            target = os.path.join(root, name)
-            yield target
-
-
-def _execute(
-    command,
-    input_text=None,
-    output=None,
-    ignore_errors=False,
-    verbose=False,
-    extra_environment=None,
-):
-    """
-    Returns (exit_code, stdoutdata)
-    """
-    if verbose:
-        print(("Calling: %s" % command))
+    def __init__(self, include, exclude, ignored=()):
+        self._include = tuple(include)
+        self._ignored = tuple(
+            os.path.join(os.path.abspath(folder), "") for folder in ignored
+        )
+        self._exclude = _compile_any(exclude)
+        self._exclude_folder = _compile_any(
+            [pattern for pattern in exclude if not self._LOOK_AHEAD.search(pattern)]
+        )
 
-    if output is None:
-        output = subprocess.PIPE
+    def is_excluded(self, path):
+        """
+        Return `True` if the file at `path` should not be checked.
+        """
+        for expression in self._exclude:
+            if expression.match(path):
+                return True
 
-    if extra_environment is not None:
-        execute_environment = os.environ.copy()
-        execute_environment.update(extra_environment)
-    else:
-        execute_environment = None
+        if self._include and not path.startswith(self._include):
+            return True
 
-    try:
-        process = subprocess.Popen(
-            command,
-            stdin=subprocess.PIPE,
-            stdout=output,
-            env=execute_environment,
-        )
-    except OSError as error:
-        if error.errno == 2:
-            print(("Failed to execute: %s" % " ".join(command)))
-            print(("Missing command: %s" % command[0]))
-            sys.exit(1)
-        else:
-            raise
+        if self._ignored and os.path.abspath(path).startswith(self._ignored):
+            return True
 
-    try:
-        (stdoutdata, stderrdata) = process.communicate(input_text)
-    except KeyboardInterrupt:
-        # Don't print stack trace on keyboard interrupt.
-        # Just exit.
-        os._exit(1)
+        return False
 
-    exit_code = process.returncode
-    if exit_code != 0:
-        if verbose:
-            print(("Failed to execute %s\n%s" % (command, stderrdata)))
-        if not ignore_errors:
-            sys.exit(exit_code)
+    def is_excluded_folder(self, path):
+        """
+        Return `True` if all the files inside the folder at `path` are
+        excluded.
+        """
+        path = os.path.join(path, "")
+        for expression in self._exclude_folder:
+            if expression.match(path):
+                return True
 
-    return (exit_code, stdoutdata)
+        if self._ignored:
+            return os.path.join(os.path.abspath(path), "").startswith(self._ignored)
+        return False
 
 
-def _git_diff_files(ref="master"):
+def _get_vcs(options):
     """
-    Return a list of (action, filename) that have changed in
-    comparison with `ref`.
+    Return the `GitRepository` used for `options` or `None` when the
+    VCS is not used.
     """
-    result = []
-    command = ["git", "diff", "--name-status", "%s" % (ref)]
-    exit_code, output = _execute(command)
-    if exit_code != 0:
-        print("Failed to diff files.")
-        sys.exit(1)
+    if not options.diff_branch and not options.scope["vcs"]:
+        return None
 
-    for line in output.decode("utf-8").splitlines():
-        parts = line.split("\t")
-        action = parts[0]
-        name = parts[-1]
-        action = action.lower()
-        result.append((action, name))
+    from scame.vcs import GitRepository
 
-    return result
+    return GitRepository()
 
 
-def check_sources(options, reporter=None):
+def _get_source_files(options, vcs=None):
     """
-    Run checker on all the sources using `options` and sending results to
-    `reporter`.
-    """
-    if reporter is None:
-        reporter = Reporter(Reporter.CONSOLE)
-    reporter.call_count = 0
+    Generate the paths of all the files which should be checked, based on
+    `options`.
 
-    if options.diff_branch:
+    The folders are walked using the files known by `vcs`, when
+    available, so that the ignored files are not visited.
+    """
+    from_vcs = True
+    if options.changed_lines is not None:
+        # Only the files with changed lines, from the VCS.
+        sources = sorted(options.changed_lines)
+    elif options.diff_branch:
         # We ignore the passed sources, and get the files from the VCS.
         sources = []
-        for change in _git_diff_files(ref=options.diff_branch):
+        for action, name in _call_vcs(vcs.get_changed_files, options.diff_branch):
             # Filter deleted changes since we can not lint then.
-            if change[0] == "d":
+            if action == "d":
                 continue
-            sources.append(change[1])
+            sources.append(name)
     else:
+        from_vcs = False
         # We don't have explicit sources, so we use the one from the
         # configuration
         sources = options.scope["include"]
 
-    regex_exclude = [re.compile(expression) for expression in options.scope["exclude"]]
-
-    def is_excepted_file(file_name):
-        for expresion in regex_exclude:
-            if expresion.match(file_name):
-                return True
-
-        if options.scope["include"]:
-            included = False
-            for include in options.scope["include"]:
-                if file_name.startswith(include):
-                    included = True
-                    break
-            if not included:
-                return True
-
-        return False
+    path_filter = _PathFilter(
+        options.scope["include"],
+        options.scope["exclude"],
+        # Also when not used in this run, it might have older results.
+        ignored=[options.cache["path"]],
+    )
 
-    count = 0
     for source in sources:
         file_path = os.path.normpath(source)
 
-        if os.path.isdir(source):
-            paths = _get_all_files(file_path)
-        else:
+        if from_vcs:
+            if not os.path.isfile(file_path):
+                # As for the changed git submodules.
+                continue
             paths = [file_path]
+        elif not os.path.isdir(source):
+            paths = [file_path]
+        else:
+            paths = None
+            if vcs is not None and options.scope["vcs"]:
+                paths = vcs.list_files(file_path)
+            if paths is None:
+                paths = _get_all_files(file_path, path_filter)
 
         for file_path in paths:
-            if is_excepted_file(file_path):
+            if path_filter.is_excluded(file_path):
                 continue
 
-            if not Language.is_editable(file_path):
+            if not Language.is_editable(file_path, options.extensions):
                 continue
 
-            language = Language.get_language(file_path)
-            with open(file_path, "rt") as file_:
-                text = file_.read()
+            yield file_path
+
+
+def _call_vcs(method, *args):
+    """
+    Return the result of calling the VCS `method` and exit when it fails.
+    """
+    from scame.vcs import VCSError
+
+    try:
+        return method(*args)
+    except VCSError as error:
+        print(error)
+        print("Failed to diff files.")
+        sys.exit(1)
+
+
+def _filter_changed_lines(results, changed_lines):
+    """
+    Generate the (file_path, messages) `results` keeping only the
+    messages for the whole file or for the `changed_lines`.
+    """
+    for file_path, messages in results:
+        line_ranges = changed_lines.get(os.path.normpath(file_path), ())
+        yield file_path, [
+            message
+            for message in messages
+            if not message[0] or is_in_ranges(line_ranges, message[0])
+        ]
+
+
+def _get_client_results(file_paths, options, buffers, stats):
+    """
+    Generate (file_path, messages) for the files checked by the server.
+
+    The files are checked by this process when the server is not running,
+    and the files not yet checked when the server fails.
+    """
+    from scame.server import ServerError
+    from scame.server import get_results as get_server_results
+
+    # All paths are needed to send them to the server.
+    file_paths = list(file_paths)
+    checked = 0
+    try:
+        results = get_server_results(
+            options.server["socket"], options.server["args"], file_paths, buffers
+        )
+        if results is not None:
+            if options.changed_lines is not None:
+                # The server checks all the lines.
+                results = _filter_changed_lines(results, options.changed_lines)
+            for result in results:
+                yield result
+                checked += 1
+            return
+    except ServerError as error:
+        sys.stderr.write("Checking without the server: %s\n" % (error,))
+
+    yield from get_results(file_paths[checked:], options, buffers, stats)
+
+
+def check_sources(options, reporter=None, stats=None):
+    """
+    Run checker on all the sources using `options` and sending results to
+    `reporter`.
+
+    When `stats` is a `CheckStats`, the time spent and the number of
+    messages for each file are added to it.
+    With `options.stats` enabled, the statistics are also written to
+    stderr.
+
+    When `options.jobs` is greater than 1, the files are checked in
+    separate processes, but the messages are still sent to `reporter`
+    in the order in which the files were found.
+
+    In client mode, the files are checked by the server, or by this
+    process when the server is not running or fails.
+    The statistics are only collected for the files checked by this
+    process.
+    """
+    start = time.perf_counter()
+    if stats is None and options.stats["enabled"]:
+        from scame.stats import CheckStats
+
+        stats = CheckStats()
+
+    close_reporter = reporter is None
+    if reporter is None:
+        reporter = Reporter(REPORT_TYPES[options.report_format])
+    reporter.call_count = 0
+
+    vcs = _get_vcs(options)
+    if options.diff_lines and options.changed_lines is None:
+        options.changed_lines = _call_vcs(vcs.get_changed_lines, options.diff_branch)
+
+    if options.stdin["path"]:
+        file_paths = [options.stdin["path"]]
+        buffers = {options.stdin["path"]: sys.stdin.read()}
+    else:
+        file_paths = _get_source_files(options, vcs)
+        buffers = {}
+
+    if options.server["mode"] == "client":
+        results = _get_client_results(file_paths, options, buffers, stats)
+    else:
+        results = get_results(file_paths, options, buffers, stats)
 
-            count += 1
-            if options.progress:
-                sys.stdout.write(".")
-                if count % 72 == 0:
-                    sys.stdout.write("\n")
-                if count % 5 == 0:
-                    sys.stdout.flush()
+    # Keep the structured reports valid.
+    if options.report_format == "console":
+        progress_stream = sys.stdout
+    else:
+        progress_stream = sys.stderr
 
-            checker = UniversalChecker(
-                file_path, text, language, reporter, options=options
+    count = 0
+    for _, messages in results:
+        count += 1
+        if options.progress:
+            progress_stream.write(".")
+            if count % 72 == 0:
+                progress_stream.write("\n")
+            if count % 5 == 0:
+                progress_stream.flush()
+
+        for line_no, message, icon, base_dir, file_name, category, code in messages:
+            reporter(
+                line_no,
+                message,
+                icon=icon,
+                base_dir=base_dir,
+                file_name=file_name,
+                category=category,
+                code=code,
             )
-            checker.check()
 
-    sys.stdout.flush()
+    progress_stream.flush()
+    if close_reporter:
+        reporter.close()
+    if stats is not None:
+        stats.seconds = time.perf_counter() - start
+        if options.stats["enabled"]:
+            stats.write_report(sys.stderr, top=options.stats["top"])
     return reporter.call_count
 
 
+def _report_startup_profile(startup, options_time, check_time, stream=None):
+    """
+    Write to `stream` the time spent before checking the files, importing
+    the checkers and checking the files.
+
+    `startup` is the CPU time of the process before calling `main`, which
+    covers the interpreter startup and the import of the scame modules.
+    """
+    if stream is None:
+        stream = sys.stderr
+
+    import_time = sum(formatcheck.import_times.values())
+    lines = [
+        "Startup profile (seconds):",
+        "  %-24s %8.3f" % ("startup and scame import", startup),
+        "  %-24s %8.3f" % ("command line", options_time),
+        "  %-24s %8.3f" % ("checkers import", import_time),
+    ]
+    for name, duration in sorted(formatcheck.import_times.items()):
+        lines.append("    %-22s %8.3f" % (name, duration))
+    lines.append("  %-24s %8.3f" % ("checking", check_time - import_time))
+    stream.write("\n".join(lines) + "\n")
+
+
 def main(args=None):
     """
     Execute the checker.
     """
+    startup = time.process_time()
+    start = time.perf_counter()
     if args is None:
         args = sys.argv[1:]
 
     options = parse_command_line(args=args)
 
-    if not options.scope["include"] and not options.diff_branch:
+    if options.server["mode"] == "serve":
+        from scame.server import ServerError, serve
+
+        try:
+            serve(options.server["socket"])
+        except ServerError as error:
+            sys.stderr.write("%s\n" % (error,))
+            sys.exit(1)
+        return 0
+
+    if (
+        not options.scope["include"]
+        and not options.diff_branch
+        and not options.stdin["path"]
+    ):
         sys.stderr.write("Expected file paths or branch diff reference.\n")
         sys.exit(1)
 
-    reporter = Reporter(Reporter.CONSOLE)
+    reporter = Reporter(REPORT_TYPES[options.report_format])
     reporter.error_only = not options.verbose
-    return check_sources(options, reporter)
+    options_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    try:
+        result = check_sources(options, reporter)
+    finally:
+        reporter.close()
+    if options.profile_startup:
+        # Imports done by the --jobs processes are not included.
+        _report_startup_profile(startup, options_time, time.perf_counter() - start)
+    return result
 
 
 if __name__ == "__main__":
@@ -0,0 +1,10 @@
+"""
+Throughput benchmarks for the checkers, using generated files.
+
+Run them with::
+
+    python -m scame.benchmarks --output results.json
+    python -m scame.benchmarks --baseline results.json --threshold 0.2
+
+No network access or extra dependencies are needed.
+"""
@@ -0,0 +1,212 @@
+"""
+Run the benchmarks and compare the results with a baseline.
+"""
+
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from optparse import OptionParser
+
+from scame import __version__
+from scame.benchmarks.corpus import create_corpus
+from scame.benchmarks.measure import benchmark_check_sources, benchmark_checker
+from scame.formatcheck import (
+    AnyTextChecker,
+    JSONChecker,
+    PythonChecker,
+    ReStructuredTextChecker,
+    XMLChecker,
+)
+
+# Checker class and corpus kind for each isolated checker benchmark.
+_CHECKER_BENCHMARKS = (
+    (PythonChecker, "python"),
+    (XMLChecker, "xml"),
+    (JSONChecker, "json"),
+    (ReStructuredTextChecker, "rst"),
+    (AnyTextChecker, "text"),
+)
+
+# Results compared with the baseline.
+# A regression is a smaller rate or a larger peak memory.
+_RATES = ("files_per_second", "lines_per_second")
+
+
+def parse_command_line(args):
+    """
+    Return the options for the benchmarks command line `args`.
+    """
+    parser = OptionParser(
+        usage="usage: %prog [options]",
+        version=__version__,
+    )
+    parser.add_option(
+        "--output",
+        dest="output",
+        help="Path of the JSON file where the results are written.",
+    )
+    parser.add_option(
+        "--baseline",
+        dest="baseline",
+        help="Path of a results file to compare with.",
+    )
+    parser.add_option(
+        "--threshold",
+        dest="threshold",
+        type="float",
+        help="Accepted slowdown compared with the baseline (default 0.2).",
+    )
+    parser.add_option(
+        "--scale",
+        dest="scale",
+        type="float",
+        help="Multiplier for the number and size of the files (default 1).",
+    )
+    parser.add_option(
+        "--corpus-dir",
+        dest="corpus_dir",
+        help="Folder where the files are created (default a temporary one).",
+    )
+    parser.set_defaults(
+        output=None,
+        baseline=None,
+        threshold=0.2,
+        scale=1.0,
+        corpus_dir=None,
+    )
+    options, arguments = parser.parse_args(args=args)
+    if arguments:
+        parser.error("Unexpected arguments: %s" % (" ".join(arguments),))
+    return options
+
+
+def _run_isolated(benchmark, *args):
+    """
+    Return the result of calling `benchmark` with `args` in a new process.
+
+    The process is not forked, so its peak memory is the one of this
+    benchmark only.
+    """
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(benchmark, *args).result()
+
+
+def run_benchmarks(corpus_dir, scale=1.0, options=None, args=()):
+    """
+    Create the corpus in `corpus_dir` and return the results of all the
+    benchmarks.
+
+    `options` are used for the checker benchmarks and `args` are the
+    command line arguments for the `check_sources` benchmark.
+    Each benchmark is run in a separate process, so that `peak_rss` is
+    the peak memory of that benchmark.
+    """
+    corpus = create_corpus(corpus_dir, scale=scale)
+    benchmarks = {}
+    for checker_class, kind in _CHECKER_BENCHMARKS:
+        benchmarks[checker_class.__name__] = _run_isolated(
+            benchmark_checker, checker_class, corpus[kind], options
+        )
+    benchmarks["check_sources"] = _run_isolated(
+        benchmark_check_sources, corpus_dir, args
+    )
+    return {
+        "version": __version__,
+        "python": sys.version.split()[0],
+        "scale": scale,
+        "benchmarks": benchmarks,
+    }
+
+
+def compare_results(results, baseline, threshold):
+    """
+    Return the list of regressions of `results` compared with `baseline`.
+
+    A rate smaller, or a peak memory larger, by more than the `threshold`
+    fraction of the baseline value is a regression.
+    """
+    regressions = []
+    for name, base in sorted(baseline["benchmarks"].items()):
+        current = results["benchmarks"].get(name)
+        if current is None:
+            continue
+
+        for key in _RATES:
+            if current[key] < base[key] * (1 - threshold):
+                regressions.append(
+                    "%s %s: %.1f, baseline %.1f" % (name, key, current[key], base[key])
+                )
+
+        if current["peak_rss"] and base["peak_rss"]:
+            if current["peak_rss"] > base["peak_rss"] * (1 + threshold):
+                regressions.append(
+                    "%s peak_rss: %d, baseline %d"
+                    % (name, current["peak_rss"], base["peak_rss"])
+                )
+    return regressions
+
+
+def _write_summary(results, stream):
+    """
+    Write the human readable `results` to `stream`.
+    """
+    stream.write(
+        "%-24s %8s %10s %12s %10s\n"
+        % ("benchmark", "files", "files/s", "lines/s", "peak MB")
+    )
+    for name, result in sorted(results["benchmarks"].items()):
+        peak = result["peak_rss"]
+        stream.write(
+            "%-24s %8d %10.1f %12.1f %10s\n"
+            % (
+                name,
+                result["files"],
+                result["files_per_second"],
+                result["lines_per_second"],
+                "-" if peak is None else "%.1f" % (peak / 1024 / 1024,),
+            )
+        )
+
+
+def main(args=None):
+    """
+    Run the benchmarks and return the exit code.
+    """
+    if args is None:
+        args = sys.argv[1:]
+    options = parse_command_line(args)
+
+    corpus_dir = options.corpus_dir
+    if corpus_dir is None:
+        corpus_dir = tempfile.mkdtemp(prefix="scame_benchmarks_")
+    try:
+        results = run_benchmarks(os.path.join(corpus_dir, "corpus"), options.scale)
+    finally:
+        if options.corpus_dir is None:
+            shutil.rmtree(corpus_dir, ignore_errors=True)
+
+    _write_summary(results, sys.stdout)
+    if options.output:
+        with open(options.output, "w") as stream:
+            json.dump(results, stream, indent=2, sort_keys=True)
+
+    if not options.baseline:
+        return 0
+
+    with open(options.baseline) as stream:
+        baseline = json.load(stream)
+    regressions = compare_results(results, baseline, options.threshold)
+    for regression in regressions:
+        sys.stdout.write("Regression: %s\n" % (regression,))
+    if regressions:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
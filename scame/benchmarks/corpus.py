@@ -0,0 +1,174 @@
+"""
+Synthetic source files used by the benchmarks.
+"""
+
+__all__ = [
+    "create_corpus",
+]
+
+import json
+import os
+import random
+
+# Base number of files, or size, of each kind of corpus for scale 1.
+_PYTHON_FILES = 2000
+_RST_SECTIONS = 2000
+_JSON_ITEMS = 20000
+_XML_ITEMS = 20000
+_TEXT_FILES = 500
+_TREE_DEPTH = 12
+
+
+def _get_python(rng, index):
+    """
+    Return the source of a Python module with a random number of classes.
+    """
+    parts = [
+        '"""',
+        "Generated module %d." % (index,),
+        '"""',
+        "",
+        "import os",
+        "",
+    ]
+    for class_index in range(rng.randint(1, 20)):
+        parts.extend(
+            [
+                "",
+                "class Generated%d:" % (class_index,),
+                '    """A generated class."""',
+                "",
+                "    def __init__(self, value):",
+                "        self.value = value",
+            ]
+        )
+        for method_index in range(rng.randint(1, 10)):
+            parts.extend(
+                [
+                    "",
+                    "    def method_%d(self, other):" % (method_index,),
+                    "        if other > %d:" % (rng.randint(0, 100),),
+                    "        " * 2 + "return os.path.join(str(self.value), 'x')",
+                    "        result = [item for item in range(other) if item]",
+                    "        return result",
+                ]
+            )
+        if rng.random() < 0.1:
+            # Some trailing whitespace and long lines to report.
+            parts.append("    trailing = 1 ")
+            parts.append("    long_name = '%s'" % ("x" * 90,))
+    return "\n".join(parts) + "\n"
+
+
+def _get_rst(rng, sections):
+    """
+    Return a long reStructuredText document.
+    """
+    parts = ["Generated document", "=" * 18, ""]
+    for index in range(sections):
+        title = "Section %d" % (index,)
+        parts.extend(
+            [
+                "",
+                "",
+                title,
+                "-" * len(title),
+                "",
+                "Some text for the section with *emphasis* and ``code``.",
+                "",
+            ]
+        )
+        for _ in range(rng.randint(1, 5)):
+            parts.append("* An item of a list.")
+        parts.extend(["", ".. code-block:: python", "", "    print(1)"])
+    return "\n".join(parts) + "\n"
+
+
+def _get_json(rng, items):
+    """
+    Return a large JSON document.
+    """
+    data = [
+        {
+            "id": index,
+            "name": "item-%d" % (index,),
+            "value": rng.random(),
+            "tags": ["a", "b", "c"][: rng.randint(0, 3)],
+        }
+        for index in range(items)
+    ]
+    return json.dumps(data, indent=2) + "\n"
+
+
+def _get_xml(rng, items):
+    """
+    Return a large XML document.
+    """
+    parts = ['<?xml version="1.0" encoding="utf-8"?>', "<root>"]
+    for index in range(items):
+        parts.append(
+            '  <item id="%d" value="%d">Text &amp; more</item>'
+            % (index, rng.randint(0, 1000))
+        )
+    parts.append("</root>")
+    return "\n".join(parts) + "\n"
+
+
+def _get_text(rng):
+    """
+    Return a plain text file.
+    """
+    lines = []
+    for index in range(rng.randint(10, 500)):
+        lines.append("Line %d of plain text. " % (index,) * rng.randint(1, 6))
+    return "\n".join(lines) + "\n"
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as stream:
+        stream.write(content)
+
+
+def create_corpus(path, scale=1.0, seed=0):
+    """
+    Create the benchmark files under `path`.
+
+    `scale` multiplies the number and size of the files.
+    Return a dictionary with the list of created paths for each kind of
+    file: python, rst, json, xml and text.
+
+    The content is the same for the same `scale` and `seed`.
+    """
+    rng = random.Random(seed)
+    corpus = {"python": [], "rst": [], "json": [], "xml": [], "text": []}
+
+    for index in range(max(1, int(_PYTHON_FILES * scale))):
+        file_path = os.path.join(
+            path, "python", "package%d" % (index % 20,), "module%d.py" % (index,)
+        )
+        _write(file_path, _get_python(rng, index))
+        corpus["python"].append(file_path)
+
+    file_path = os.path.join(path, "rst", "document.rst")
+    _write(file_path, _get_rst(rng, max(1, int(_RST_SECTIONS * scale))))
+    corpus["rst"].append(file_path)
+
+    file_path = os.path.join(path, "json", "data.json")
+    _write(file_path, _get_json(rng, max(1, int(_JSON_ITEMS * scale))))
+    corpus["json"].append(file_path)
+
+    file_path = os.path.join(path, "xml", "data.xml")
+    _write(file_path, _get_xml(rng, max(1, int(_XML_ITEMS * scale))))
+    corpus["xml"].append(file_path)
+
+    # A deep tree, with a few files on each level.
+    folder = os.path.join(path, "text")
+    for index in range(max(1, int(_TEXT_FILES * scale))):
+        if index % max(1, int(_TEXT_FILES * scale) // _TREE_DEPTH) == 0:
+            folder = os.path.join(folder, "level%d" % (index,))
+        file_path = os.path.join(folder, "file%d.txt" % (index,))
+        _write(file_path, _get_text(rng))
+        corpus["text"].append(file_path)
+
+    return corpus
@@ -0,0 +1,113 @@
+"""
+Benchmarks measuring the checking speed and the peak memory.
+
+They are in a separate module from the command line, so that they can be
+run in a new process.
+"""
+
+import sys
+import time
+
+from scame.formatcheck import Reporter, ScameOptions
+
+
+def get_peak_rss():
+    """
+    Return the peak resident memory of this process in bytes or `None`
+    when it is not available.
+
+    This is the peak since the process was started, for all the code run
+    by the process.
+    On Linux, `ru_maxrss` is inherited from the parent process, so the
+    peak is read from /proc when available.
+    """
+    try:
+        with open("/proc/self/status") as stream:
+            for line in stream:
+                if line.startswith("VmHWM:"):
+                    # In kilobytes.
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        # Not available on Windows.
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return peak
+    # Linux and the BSDs use kilobytes.
+    return peak * 1024
+
+
+def _get_result(files, lines, duration):
+    """
+    Return the result of a benchmark which checked `files` having `lines`.
+    """
+    duration = max(duration, 1e-9)
+    return {
+        "files": files,
+        "lines": lines,
+        "seconds": duration,
+        "files_per_second": files / duration,
+        "lines_per_second": lines / duration,
+        "peak_rss": get_peak_rss(),
+    }
+
+
+def _count_lines(paths):
+    """
+    Return the total number of lines in the files from `paths`.
+    """
+    total = 0
+    for path in paths:
+        with open(path, "rb") as stream:
+            total += stream.read().count(b"\n")
+    return total
+
+
+def benchmark_checker(checker_class, paths, options=None):
+    """
+    Return the result of checking the files from `paths` with
+    `checker_class`.
+
+    The files are read before starting the timer.
+    """
+    if options is None:
+        options = ScameOptions()
+    sources = []
+    for path in paths:
+        with open(path) as stream:
+            sources.append((path, stream.read()))
+    lines = sum(text.count("\n") for _, text in sources)
+    reporter = Reporter(Reporter.COLLECTOR)
+
+    start = time.perf_counter()
+    for path, text in sources:
+        checker_class(path, text, reporter, options).check()
+    duration = time.perf_counter() - start
+
+    return _get_result(len(sources), lines, duration)
+
+
+def benchmark_check_sources(path, args=()):
+    """
+    Return the result of checking all the files under `path` with
+    `check_sources`, using the command line `args`.
+    """
+    from scame.__main__ import _get_source_files, check_sources
+    from scame.commandline import parse_command_line as parse_scame_command_line
+
+    options = parse_scame_command_line(["--no-cache"] + list(args) + [path])
+    paths = list(_get_source_files(options))
+    lines = _count_lines(paths)
+    reporter = Reporter(Reporter.COLLECTOR)
+
+    start = time.perf_counter()
+    check_sources(options, reporter)
+    duration = time.perf_counter() - start
+
+    return _get_result(len(paths), lines, duration)
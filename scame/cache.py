@@ -0,0 +1,272 @@
+"""
+Persistent cache for the messages reported for a file.
+"""
+
+__all__ = [
+    "ResultCache",
+]
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+from scame import __version__
+from scame.formatcheck import UniversalChecker
+
+# Options which don't change the messages reported for a file.
+_FINGERPRINT_IGNORED = (
+    "verbose",
+    "progress",
+    "profile_startup",
+    "stats",
+    "report_format",
+    "jobs",
+    "external",
+    "diff_branch",
+    "diff_lines",
+    "changed_lines",
+    "scope",
+    "cache",
+    "stdin",
+    "server",
+    "_path_options_tree",
+)
+
+# Changed when the format of the stored messages is changed.
+_FORMAT_VERSION = 3
+
+# Checkers for which the version is part of the fingerprint.
+_CHECKER_DISTRIBUTIONS = ("pyflakes", "pycodestyle", "mccabe", "bandit", "pylint")
+
+# Configuration files read by pycodestyle, besides the ones from the options.
+_PYCODESTYLE_CONFIG_FILES = ("setup.cfg", "tox.ini")
+
+# Options with the command of an external linter.
+_EXTERNAL_LINTERS = ("shellcheck", "chevah_js_linter")
+
+
+def _get_distribution_version(name):
+    """
+    Return the installed version of distribution `name` or `None`.
+    """
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return None
+
+
+def _get_option_values(options, name):
+    """
+    Generate the `name` options dictionary and the values of `name` from
+    each of the path options rules.
+    """
+    yield getattr(options, name)
+    for _, values in options.path_options:
+        if name in values:
+            yield values[name]
+
+
+def _get_file_digest(path):
+    """
+    Return the SHA-256 of the file content from `path` or `None`.
+    """
+    try:
+        with open(path, "rb") as stream:
+            return hashlib.sha256(stream.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def _get_config_files(options):
+    """
+    Return the paths of the configuration files read by the checkers.
+    """
+    config_home = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+    paths = [os.path.join(config_home, "pycodestyle")]
+    paths.extend(_PYCODESTYLE_CONFIG_FILES)
+    for values in _get_option_values(options, "pylint"):
+        if values.get("rcfile"):
+            paths.append(values["rcfile"])
+    return paths
+
+
+def _get_tool_identity(command):
+    """
+    Return the path, size and modification time of the `command`
+    executable, which change when the tool is upgraded.
+    """
+    path = shutil.which(command)
+    if path is None:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [os.path.realpath(path), stat.st_size, stat.st_mtime_ns]
+
+
+def _get_commands(options):
+    """
+    Return the commands of the external linters enabled for any path.
+    """
+    commands = set()
+    for name in _EXTERNAL_LINTERS:
+        all_values = list(_get_option_values(options, name))
+        if any(values.get("enabled") for values in all_values):
+            commands.update(
+                values["command"] for values in all_values if "command" in values
+            )
+    return sorted(commands)
+
+
+def get_fingerprint(options):
+    """
+    Return a string identifying the `options` and the checkers versions
+    used to produce the messages.
+
+    It also has the content of the checkers configuration files and the
+    identity of the external linter programs, which are not options.
+    """
+    values = {
+        name: value
+        for name, value in vars(options).items()
+        if name not in _FINGERPRINT_IGNORED
+    }
+    values["__scame__"] = __version__
+    values["__format__"] = _FORMAT_VERSION
+    values["__python__"] = sys.version
+    for name in _CHECKER_DISTRIBUTIONS:
+        values["__%s__" % (name,)] = _get_distribution_version(name)
+    values["__checkers__"] = UniversalChecker.registry.get_fingerprint()
+    values["__config_files__"] = {
+        path: _get_file_digest(path) for path in _get_config_files(options)
+    }
+    values["__tools__"] = {
+        command: _get_tool_identity(command) for command in _get_commands(options)
+    }
+    return json.dumps(values, sort_keys=True, default=repr)
+
+
+class ResultCache:
+    """
+    Keeps the messages reported for a file in `path`.
+
+    The messages are stored for a key computed from the file content,
+    file path and the options used to check the file.
+
+    Each entry is stored as a separate file and the least recently used
+    entries are removed when the cache is larger than `max_size` bytes.
+    """
+
+    def __init__(self, path, options, max_size):
+        self._path = path
+        self._max_size = max_size
+        self._fingerprint = get_fingerprint(options).encode("utf-8")
+        self._changed = False
+
+    def get_key(self, file_path, text=None, line_ranges=None):
+        """
+        Return the key for `text` or for the current content of
+        `file_path`.
+
+        `line_ranges` are the ranges of lines for which the messages are
+        reported, with `None` for all lines.
+        """
+        digest = hashlib.sha256(self._fingerprint)
+        digest.update(b"\0")
+        digest.update(file_path.encode("utf-8", "surrogateescape"))
+        digest.update(b"\0")
+        if line_ranges is not None:
+            digest.update(b"\0lines\0")
+            digest.update(repr(tuple(line_ranges)).encode("ascii"))
+            digest.update(b"\0")
+        if text is None:
+            with open(file_path, "rb") as stream:
+                digest.update(stream.read())
+        else:
+            # Marked to not have the same key as a file with this content.
+            digest.update(b"\0text\0")
+            digest.update(text.encode("utf-8", "surrogateescape"))
+        return digest.hexdigest()
+
+    def _get_entry_path(self, key):
+        return os.path.join(self._path, key[:2], key)
+
+    def get(self, key):
+        """
+        Return the list of messages stored for `key` or `None` when
+        they are not in the cache.
+        """
+        entry_path = self._get_entry_path(key)
+        try:
+            with open(entry_path, "rt") as stream:
+                messages = json.load(stream)
+            # Mark it as recently used.
+            os.utime(entry_path)
+        except (OSError, ValueError):
+            return None
+        return [tuple(message) for message in messages]
+
+    def set(self, key, messages):
+        """
+        Store `messages` for `key`.
+        """
+        entry_path = self._get_entry_path(key)
+        try:
+            os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+            # Write and rename to not leave partial entries.
+            handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(entry_path))
+        except OSError:
+            # The cache is only an optimization.
+            return
+
+        try:
+            with os.fdopen(handle, "wt") as stream:
+                json.dump(messages, stream)
+            os.replace(temp_path, entry_path)
+        except (OSError, TypeError, ValueError):
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return
+        self._changed = True
+
+    def close(self):
+        """
+        Remove the least recently used entries, if the cache is too big.
+        """
+        if not self._changed:
+            return
+        self._changed = False
+
+        entries = []
+        total_size = 0
+        try:
+            for shard in os.scandir(self._path):
+                if not shard.is_dir():
+                    continue
+                for entry in os.scandir(shard.path):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total_size += stat.st_size
+        except OSError:
+            return
+
+        if total_size <= self._max_size:
+            return
+
+        entries.sort()
+        for _, size, entry_path in entries:
+            try:
+                os.remove(entry_path)
+            except OSError:
+                continue
+            total_size -= size
+            if total_size <= self._max_size:
+                break
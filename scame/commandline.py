@@ -0,0 +1,292 @@
+"""
+Options for the command line arguments.
+"""
+
+__all__ = [
+    "REPORT_TYPES",
+    "parse_command_line",
+]
+
+import os
+from optparse import OptionParser
+
+from scame import __version__
+from scame.formatcheck import DEFAULT_MAX_LENGTH, Reporter, ScameOptions
+
+# Reporter type for each --format value.
+REPORT_TYPES = {
+    "console": Reporter.CONSOLE,
+    "jsonl": Reporter.JSON_LINES,
+    "sarif": Reporter.SARIF,
+}
+
+
+def parse_command_line(args):
+    """
+    Return the `options` based on the command line arguments.
+    """
+    usage = "usage: %prog [options] path1 path2"
+    parser = OptionParser(
+        usage=usage,
+        version=__version__,
+    )
+    parser.add_option(
+        "-q", "--quiet", action="store_false", dest="verbose", help="Show errors only."
+    )
+    parser.add_option(
+        "--progress",
+        action="store_true",
+        dest="progress",
+        help="Show a dot for each processed file.",
+    )
+    parser.add_option(
+        "--format",
+        dest="report_format",
+        type="choice",
+        choices=sorted(REPORT_TYPES),
+        help="Format of the report: console, jsonl or sarif (default console).",
+    )
+    parser.add_option(
+        "--profile-startup",
+        action="store_true",
+        dest="profile_startup",
+        help="Show the time spent importing the checkers versus checking.",
+    )
+    parser.add_option(
+        "--stats",
+        action="store_true",
+        dest="stats",
+        help="Show the slowest files and the time spent in each checker.",
+    )
+    parser.add_option(
+        "--stats-top",
+        dest="stats_top",
+        type="int",
+        help="Number of slowest files shown by --stats (default 10).",
+    )
+
+    parser.add_option(
+        "--pycodestyle",
+        dest="pycodestyle",
+        action="store_true",
+        help="Enable pycodestyle checks.",
+    )
+    parser.add_option(
+        "-a",
+        "--align-closing",
+        dest="hang_closing",
+        action="store_false",
+        help="Align the closing bracket with the matching opening.",
+    )
+
+    parser.add_option(
+        "--bandit", dest="bandit", action="store_true", help="Enable bandit checks."
+    )
+    parser.add_option(
+        "--shellcheck",
+        dest="shellcheck",
+        action="store_true",
+        help="Check the shell scripts using the shellcheck program.",
+    )
+
+    parser.add_option(
+        "--diff-branch",
+        dest="diff_branch",
+        help="Name of the branch to use as base for changed files.",
+    )
+    parser.add_option(
+        "--diff-lines",
+        dest="diff_lines",
+        action="store_true",
+        help="With --diff-branch, only report the problems on the changed lines.",
+    )
+    parser.add_option(
+        "--no-vcs",
+        dest="vcs",
+        action="store_false",
+        help=(
+            "Walk all the files from the folders, "
+            "instead of the files known by git which are not ignored."
+        ),
+    )
+    parser.add_option(
+        "--exclude",
+        dest="exclude",
+        help="Comma separated list of regex paths to exclude.",
+    )
+
+    parser.add_option(
+        "--extension",
+        dest="extensions",
+        action="append",
+        metavar="EXTENSION=MIME_TYPE",
+        help=(
+            "Check the files with this extension as the mime type. "
+            "Ex: .tac=text/x-python. Can be used multiple times."
+        ),
+    )
+    parser.add_option(
+        "--max-file-size",
+        dest="max_file_size",
+        type="int",
+        help="Don't check the files larger than this number of bytes.",
+    )
+    parser.add_option(
+        "-m",
+        "--max-length",
+        dest="max_line_length",
+        type="int",
+        help="Set the max line length (default %s)" % DEFAULT_MAX_LENGTH,
+    )
+    parser.add_option(
+        "--max-complexity",
+        dest="max_complexity",
+        type="int",
+        help="Set the max complexity (default -1 - disabled)",
+    )
+    parser.add_option(
+        "-j",
+        "--jobs",
+        dest="jobs",
+        help=(
+            "Number of processes used to check the files. "
+            "Use 'auto' to have one process for each CPU (default 1)"
+        ),
+    )
+    parser.add_option(
+        "--no-cache",
+        dest="cache",
+        action="store_false",
+        help="Don't use the results of the previous runs for unchanged files.",
+    )
+    parser.add_option(
+        "--cache-dir",
+        dest="cache_dir",
+        help="Path to the folder storing the results (default .scame_cache).",
+    )
+    parser.add_option(
+        "--stdin-filename",
+        dest="stdin_filename",
+        help="Check the text from the standard input as the content of this file.",
+    )
+    parser.add_option(
+        "--serve",
+        dest="server_mode",
+        action="store_const",
+        const="serve",
+        help="Start a server which checks the files for --client.",
+    )
+    parser.add_option(
+        "--client",
+        dest="server_mode",
+        action="store_const",
+        const="client",
+        help=(
+            "Check the files using the server started with --serve. "
+            "The files are checked by this process when no server is running."
+        ),
+    )
+    parser.add_option(
+        "--socket",
+        dest="socket",
+        help="Path to the socket used by --serve and --client.",
+    )
+    parser.set_defaults(
+        verbose=True,
+        profile_startup=False,
+        stats=False,
+        stats_top=10,
+        report_format="console",
+        hang_closing=True,
+        max_line_length=DEFAULT_MAX_LENGTH,
+        max_complexity=-1,
+        diff_branch=None,
+        diff_lines=False,
+        vcs=True,
+        exclude="",
+        extensions=None,
+        max_file_size=0,
+        pycodestyle=False,
+        bandit=False,
+        shellcheck=False,
+        jobs="1",
+        cache=True,
+        cache_dir=".scame_cache",
+        stdin_filename=None,
+        server_mode=None,
+        socket=None,
+    )
+
+    command_options, sources = parser.parse_args(args=args)
+
+    if command_options.diff_lines and not command_options.diff_branch:
+        parser.error("--diff-lines requires --diff-branch")
+
+    try:
+        jobs = _get_jobs_count(command_options.jobs)
+    except ValueError:
+        parser.error("Invalid --jobs value: %s" % (command_options.jobs,))
+
+    # Create options based on parsed command line.
+    options = ScameOptions()
+    options.verbose = command_options.verbose
+    options.progress = command_options.progress
+    options.profile_startup = command_options.profile_startup
+    options.stats["enabled"] = command_options.stats
+    options.stats["top"] = command_options.stats_top
+    options.report_format = command_options.report_format
+    options.max_line_length = command_options.max_line_length
+    options.max_file_size = command_options.max_file_size
+    options.mccabe["max_complexity"] = command_options.max_complexity
+    options.bandit["enabled"] = command_options.bandit
+    options.shellcheck["enabled"] = command_options.shellcheck
+    options.pycodestyle["enabled"] = command_options.pycodestyle
+    options.pycodestyle["hang_closing"] = command_options.hang_closing
+    options.diff_branch = command_options.diff_branch
+    options.diff_lines = command_options.diff_lines
+    options.jobs = jobs
+    options.cache["enabled"] = command_options.cache
+    options.cache["path"] = command_options.cache_dir
+    options.stdin["path"] = command_options.stdin_filename
+    options.server["mode"] = command_options.server_mode
+    options.server["socket"] = command_options.socket
+    options.server["args"] = list(args)
+
+    if options.server["mode"] and options.server["socket"] is None:
+        from scame.server import get_default_socket_path
+
+        options.server["socket"] = get_default_socket_path()
+
+    exclude = []
+    for part in command_options.exclude.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        exclude.append(part)
+
+    for value in command_options.extensions or []:
+        extension, separator, mime_type = value.partition("=")
+        if not separator or not extension.startswith(".") or not mime_type:
+            parser.error("Invalid --extension value: %s" % (value,))
+        options.extensions[extension] = mime_type
+
+    options.scope["include"] = sources
+    options.scope["exclude"] = exclude
+    options.scope["vcs"] = command_options.vcs
+
+    return options
+
+
+def _get_jobs_count(value):
+    """
+    Return the number of processes to use for the `--jobs` `value`.
+    """
+    if value == "auto":
+        if hasattr(os, "sched_getaffinity"):
+            return len(os.sched_getaffinity(0))
+        return os.cpu_count() or 1
+
+    jobs = int(value)
+    if jobs < 1:
+        raise ValueError("Jobs should be a positive number.")
+    return jobs
@@ -0,0 +1,260 @@
+"""
+Checks done by external programs.
+
+The programs are run using asyncio in a separate thread, so that they run
+while the files are checked by the in-process checkers.
+Multiple files are checked by a single program run.
+"""
+
+__all__ = [
+    "ChevahJSLinter",
+    "ExternalLinter",
+    "ExternalRunner",
+    "ShellCheckLinter",
+    "get_enabled_linters",
+]
+
+import asyncio
+import os
+import re
+import threading
+
+from scame.formatcheck import BaseChecker, Language
+
+
+class ExternalLinter:
+    """
+    An external program which checks the files of some languages.
+
+    `name` is the name of the options and the category of the messages.
+    """
+
+    name = None
+    languages = ()
+    # Exit codes of a program run, with or without finding problems.
+    # Other exit codes are reported as failures.
+    ok_return_codes = (0, 1)
+
+    def is_enabled(self, options):
+        """
+        Return `True` if the linter should be used for `options`.
+        """
+        return options.get(self.name)["enabled"]
+
+    def get_command(self, options, paths):
+        """
+        Return the command line arguments to check `paths`.
+        """
+        raise NotImplementedError
+
+    def parse(self, output, options):
+        """
+        Generate (path, line_no, message, code, icon) for each problem
+        from the program `output`.
+        """
+        raise NotImplementedError
+
+
+class ShellCheckLinter(ExternalLinter):
+    """
+    Check the shell scripts using shellcheck.
+    """
+
+    name = "shellcheck"
+    languages = (Language.SH,)
+
+    _LINE = re.compile(r"^(.*?):(\d+):\d+: (\w+): (.*?)(?: \[(SC\d+)\])?$")
+
+    def get_command(self, options, paths):
+        return (
+            [options.get(self.name)["command"], "--format=gcc", "--color=never"]
+            + list(options.get(self.name)["flags"])
+            + list(paths)
+        )
+
+    def parse(self, output, options):
+        for line in output.splitlines():
+            match = self._LINE.match(line)
+            if match is None:
+                continue
+            path, line_no, severity, message, code = match.groups()
+            icon = "error" if severity == "error" else "info"
+            yield path, int(line_no), message, code, icon
+
+
+class ChevahJSLinter(ExternalLinter):
+    """
+    Check the JavaScript files using the Chevah JS Linter, in the unix
+    output mode.
+    """
+
+    name = "chevah_js_linter"
+    languages = (Language.JAVASCRIPT,)
+
+    _LINE = re.compile(r"^(.*?):(\d+):\((-?\d+)\) (.*)$")
+
+    def get_command(self, options, paths):
+        return (
+            [options.get(self.name)["command"], "--unix_mode"]
+            + list(options.get(self.name)["flags"])
+            + list(paths)
+        )
+
+    def parse(self, output, options):
+        ignore = options.get(self.name)["ignore"]
+        for line in output.splitlines():
+            match = self._LINE.match(line)
+            if match is None:
+                continue
+            path, line_no, code, message = match.groups()
+            if int(code) in ignore:
+                continue
+            yield path, int(line_no), message, code, "info"
+
+
+# All the known external linters.
+LINTERS = (ShellCheckLinter(), ChevahJSLinter())
+
+
+def get_enabled_linters(options):
+    """
+    Return the linters enabled by `options`.
+    """
+    return [linter for linter in LINTERS if linter.is_enabled(options)]
+
+
+class ExternalRunner:
+    """
+    Runs the external linters for multiple files in a separate thread.
+
+    The files are checked using batches of at most `batch_size` files,
+    with at most `jobs` programs running at the same time.
+    """
+
+    def __init__(self, linters, options, jobs=4, batch_size=50):
+        self._linters = linters
+        self._options = options
+        self._jobs = jobs
+        self._batch_size = batch_size
+        # Problems for each path, as (linter, line_no, message, code, icon).
+        self._problems = {}
+        # The events set when all the linters for a path are done.
+        self._done = {}
+        self._thread = None
+
+    def start(self, paths):
+        """
+        Start checking the files from `paths`.
+        """
+        batches = []
+        for linter in self._linters:
+            linter_paths = [
+                path
+                for path in paths
+                if Language.get_language(path, self._options.extensions)
+                in linter.languages
+            ]
+            for index in range(0, len(linter_paths), self._batch_size):
+                batch = linter_paths[index : index + self._batch_size]
+                event = threading.Event()
+                for path in batch:
+                    self._done.setdefault(path, []).append(event)
+                batches.append((linter, batch, event))
+
+        if not batches:
+            return
+        self._thread = threading.Thread(
+            target=asyncio.run, args=(self._run(batches),), daemon=True
+        )
+        self._thread.start()
+
+    async def _run(self, batches):
+        semaphore = asyncio.Semaphore(self._jobs)
+        await asyncio.gather(
+            *[
+                self._run_batch(semaphore, linter, paths, event)
+                for linter, paths, event in batches
+            ]
+        )
+
+    async def _run_batch(self, semaphore, linter, paths, event):
+        """
+        Check `paths` with `linter` and set `event` when done.
+        """
+        try:
+            command = linter.get_command(self._options, paths)
+            async with semaphore:
+                try:
+                    process = await asyncio.create_subprocess_exec(
+                        *command,
+                        stdin=asyncio.subprocess.DEVNULL,
+                        stdout=asyncio.subprocess.PIPE,
+                        stderr=asyncio.subprocess.PIPE,
+                    )
+                    output, errors = await process.communicate()
+                except OSError as error:
+                    message = "Failed to execute %s: %s" % (command[0], error)
+                    for path in paths:
+                        self._add(path, linter, 0, message, None, "error")
+                    return
+
+            if process.returncode not in linter.ok_return_codes:
+                message = "%s failed with exit code %d: %s" % (
+                    command[0],
+                    process.returncode,
+                    errors.decode("utf-8", "replace").strip() or "no error output",
+                )
+                for path in paths:
+                    self._add(path, linter, 0, message, None, "error")
+
+            # The problems found before the failure are still reported.
+            output = output.decode("utf-8", "replace")
+            by_path = {os.path.normpath(path): path for path in paths}
+            for path, line_no, message, code, icon in linter.parse(
+                output, self._options
+            ):
+                path = by_path.get(os.path.normpath(path))
+                if path is not None:
+                    self._add(path, linter, line_no, message, code, icon)
+        finally:
+            event.set()
+
+    def _add(self, path, linter, line_no, message, code, icon):
+        self._problems.setdefault(path, []).append(
+            (linter, line_no, message, code, icon)
+        )
+
+    def get_messages(self, path, options, text=None):
+        """
+        Return the messages for `path`, as recorded by `MessageRecorder`,
+        waiting for the linters to finish.
+
+        The messages are reported using a checker for `text` or the content
+        of `path`, so that the ignored lines are not reported.
+        """
+        for event in self._done.get(path, ()):
+            event.wait()
+        problems = self._problems.get(path)
+        if not problems:
+            return []
+
+        from scame.runner import MessageRecorder
+
+        if text is None:
+            with open(path, "rb") as stream:
+                text = stream.read().decode("utf-8", "ignore")
+        recorder = MessageRecorder()
+        checker = BaseChecker(path, text, recorder, options)
+        for linter, line_no, message, code, icon in problems:
+            checker.message(
+                line_no, message, icon=icon, category=linter.name, code=code
+            )
+        return recorder.messages
+
+    def close(self):
+        """
+        Wait for the linters to finish.
+        """
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -5,30 +5,43 @@
 Check for syntax and style problems.
 """
 
-
 __all__ = [
     "Reporter",
     "UniversalChecker",
 ]
 
 
-import json
+import _ast
+import bisect
+import fnmatch
 import mimetypes
+import operator
 import os
 import re
-import subprocess
-from html.entities import entitydefs
-from io import StringIO
+import shutil
+import time
+from array import array
+from contextlib import contextmanager
+from functools import cached_property, lru_cache
 from tokenize import TokenError
-from xml.etree import ElementTree
-from xml.etree.ElementTree import ParseError
-from xml.parsers import expat
-
-import _ast
-from pyflakes.checker import Checker as PyFlakesChecker
 
 from scame.reporter import Reporter
 
+# Time spent importing the optional modules used by the checkers.
+import_times = {}
+
+
+@contextmanager
+def _timed_import(name):
+    """
+    Record in `import_times` the time spent importing the `name` checker.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        import_times[name] = import_times.get(name, 0) + time.perf_counter() - start
+
 
 def find_exec(names):
     """Return the name of a GI enabled JS interpreter."""
@@ -36,46 +49,163 @@ def find_exec(names):
         return None
 
     for name in names:
-        js = subprocess.Popen(
-            ["which", name], stdout=subprocess.PIPE, stderr=subprocess.PIPE
-        )
-        js_exec, ignore = js.communicate()
-        if js.returncode == 0:
-            return js_exec.decode("utf-8").strip()
+        path = shutil.which(name)
+        if path:
+            return path
+    return None
 
 
-JS = find_exec(["gjs", "seed"])
+def __getattr__(name):
+    """
+    Resolve the module attributes which are expensive to create.
+    """
+    if name == "JS":
+        value = find_exec(["gjs", "seed"])
+    elif name == "PocketLintPyFlakesChecker":
+        from scame.pyflakes_checker import PocketLintPyFlakesChecker as value
+    elif name in ("FastParser", "FastTreeBuilder"):
+        from scame import xmlparser
+
+        value = getattr(xmlparser, name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
 
 
 DEFAULT_MAX_LENGTH = 80
 
 
-class PocketLintPyFlakesChecker(PyFlakesChecker):
-    """PocketLint checker for pyflakes.
+def is_in_ranges(line_ranges, line_no):
+    """
+    Return `True` if `line_no` is inside one of the sorted (first, last)
+    `line_ranges`.
+    """
+    index = bisect.bisect_right(line_ranges, (line_no, float("inf"))) - 1
+    return index >= 0 and line_ranges[index][1] >= line_no
+
+
+# The line breaks, other than new line, used by str.splitlines().
+_OTHER_LINE_BREAKS = "\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+
+
+class TextBuffer:
+    """
+    The text of a file, shared by all the checks.
 
-    This is here to work around some of the pyflakes problems.
+    The lines and the line offsets are computed only when first used.
     """
 
-    def __init__(self, tree, file_path="(none)", text=None):
+    def __init__(self, text):
         self.text = text
-        if self.text:
-            self.text = self.text.split("\n")
-        super().__init__(tree=tree, filename=file_path)
+        # Suppressions for each marker.
+        self._suppressions = {}
 
-    @property
-    def file_path(self):
-        """Alias for consistency with the rest of pocketlint."""
-        return self.filename
+    @cached_property
+    def has_other_line_breaks(self):
+        """
+        Whether the text has line breaks, other than new line, used by
+        `str.splitlines`.
+        """
+        return any(line_break in self.text for line_break in _OTHER_LINE_BREAKS)
 
-    def report(self, messageClass, *args, **kwargs):
-        """Filter some errors not used in our project."""
-        self.messages.append(messageClass(self.file_path, *args, **kwargs))
+    @cached_property
+    def lines(self):
+        """
+        The lines of the text, as split by `str.splitlines`.
+        """
+        return self.text.splitlines()
 
-    def NAME(self, node):
-        """Locate name. Ignore WindowsErrors."""
-        if node.id == "WindowsError":
-            return
-        return super().NAME(node)
+    @cached_property
+    def total_lines(self):
+        """
+        The number of lines from `lines`.
+        """
+        if "lines" in self.__dict__ or self.has_other_line_breaks:
+            return len(self.lines)
+        total = self.text.count("\n")
+        if self.text and self.text[-1] != "\n":
+            total += 1
+        return total
+
+    @cached_property
+    def line_starts(self):
+        """
+        The offset in the text of the start of each line separated by a
+        new line.
+        """
+        text = self.text
+        starts = array("I" if len(text) < 2**32 else "Q", [0])
+        position = text.find("\n")
+        while position != -1:
+            starts.append(position + 1)
+            position = text.find("\n", position + 1)
+        return starts
+
+    def get_suppressions(self, marker):
+        """
+        Return a dictionary with the suppressions for each line having the
+        `marker`, separated by new lines.
+
+        The value is `None` when all messages are suppressed, otherwise it
+        is a dictionary with the suppressed codes for each category, with
+        `None` for all codes.
+        This is created once for each `marker`.
+        """
+        result = self._suppressions.get(marker)
+        if result is not None:
+            return result
+
+        result = {}
+        pattern = re.compile(
+            r"%s(?::([^\s:=,]*)(?:=([^\s:]+))?)?" % (re.escape(marker),)
+        )
+        text = self.text
+        line_no = 1
+        position = 0
+        for match in pattern.finditer(text):
+            line_no += text.count("\n", position, match.start())
+            position = match.start()
+            category, codes = match.groups()
+            if match.group(0) == marker:
+                # A generic marker.
+                result[line_no] = None
+                continue
+            categories = result.setdefault(line_no, {})
+            if categories is None or not category:
+                continue
+            current = categories.get(category, frozenset())
+            if current is None:
+                # Already suppressed for all codes.
+                continue
+            if codes is None:
+                categories[category] = None
+            else:
+                categories[category] = current.union(codes.split(","))
+
+        self._suppressions[marker] = result
+        return result
+
+    def get_line_no(self, offset):
+        """
+        Return the number, starting from 1, of the line separated by new
+        lines which contains `offset`.
+        """
+        return bisect.bisect_right(self.line_starts, offset)
+
+    def get_line(self, line_no):
+        """
+        Return the line `line_no`, starting from 1, when the text is
+        split only at new lines.
+
+        An empty line is returned for the numbers outside of the text.
+        """
+        starts = self.line_starts
+        if line_no < 1 or line_no > len(starts):
+            return ""
+        if line_no == len(starts):
+            return self.text[starts[-1] :]
+        return self.text[starts[line_no - 1] : starts[line_no] - 1]
 
 
 class Language:
@@ -99,23 +229,44 @@ class Language:
 
     XML_LIKE = (XML, XSLT, HTML, ZPT, ZCML, DOCBOOK)
 
+    # Language for each name used by the `scame.checkers` entry points.
+    names = {
+        "css": CSS,
+        "docbook": DOCBOOK,
+        "html": HTML,
+        "javascript": JAVASCRIPT,
+        "json": JSON,
+        "log": LOG,
+        "python": PYTHON,
+        "restructuredtext": RESTRUCTUREDTEXT,
+        "sh": SH,
+        "sql": SQL,
+        "text": TEXT,
+        "xml": XML,
+        "xslt": XSLT,
+        "zcml": ZCML,
+        "zpt": ZPT,
+    }
+
     # Sorted after extension.
-    mimetypes.add_type("text/plain", ".bat")
-    mimetypes.add_type("text/css", ".css")
-    mimetypes.add_type("text/html", ".html")
-    mimetypes.add_type("image/x-icon", ".ico")
-    mimetypes.add_type("text/plain", ".ini")
-    mimetypes.add_type("application/javascript", ".js")
-    mimetypes.add_type("application/json", ".json")
-    mimetypes.add_type("text/x-log", ".log")
-    mimetypes.add_type("application/x-zope-page-template", ".pt")
-    mimetypes.add_type("text/x-python", ".py")
-    mimetypes.add_type("text/x-rst", ".rst")
-    mimetypes.add_type("text/x-sh", ".sh")
-    mimetypes.add_type("text/x-sql", ".sql")
-    mimetypes.add_type("text/x-twisted-application", ".tac")
-    mimetypes.add_type("text/plain", ".txt")
-    mimetypes.add_type("application/x-zope-configuation", ".zcml")
+    extension_mime_type = (
+        (".bat", "text/plain"),
+        (".css", "text/css"),
+        (".html", "text/html"),
+        (".ico", "image/x-icon"),
+        (".ini", "text/plain"),
+        (".js", "application/javascript"),
+        (".json", "application/json"),
+        (".log", "text/x-log"),
+        (".pt", "application/x-zope-page-template"),
+        (".py", "text/x-python"),
+        (".rst", "text/x-rst"),
+        (".sh", "text/x-sh"),
+        (".sql", "text/x-sql"),
+        (".tac", "text/x-twisted-application"),
+        (".txt", "text/plain"),
+        (".zcml", "application/x-zope-configuation"),
+    )
 
     # Sorted after content type.
     mime_type_language = {
@@ -131,14 +282,19 @@ class Language:
         "text/x-log": LOG,
         "text/x-python": PYTHON,
         "text/x-rst": RESTRUCTUREDTEXT,
+        "text/x-sh": SH,
         "text/x-sql": SQL,
         "text/x-twisted-application": PYTHON,
     }
 
+    # Language for each extension from `extension_mime_type` and for the
+    # other extensions already looked up in the system mime types.
+    # Created at first use.
+    _extension_language = None
+
     @staticmethod
-    def get_language(file_path):
-        """Return the language for the source."""
-        mime_type, encoding = mimetypes.guess_type(file_path)
+    def get_mime_type_language(mime_type):
+        """Return the language for the `mime_type`."""
         if mime_type is None:
             # This could be a very bad guess.
             return Language.TEXT
@@ -154,13 +310,252 @@ class Language:
             return None
 
     @staticmethod
-    def is_editable(file_path):
+    def get_language(file_path, extensions=None):
+        """Return the language for the source.
+
+        `None` is returned for the files which are not sources.
+        `extensions` is a dictionary with the mime type for other
+        extensions, or to replace the default ones.
+
+        The system mime types are only used for the extensions which are
+        not known, and are looked up once for each extension.
+        """
+        extension = os.path.splitext(file_path)[1]
+        if extensions:
+            mime_type = extensions.get(extension, extensions.get(extension.lower()))
+            if mime_type is not None:
+                return Language.get_mime_type_language(mime_type)
+
+        table = Language._extension_language
+        if table is None:
+            table = {
+                extension: Language.get_mime_type_language(mime_type)
+                for extension, mime_type in Language.extension_mime_type
+            }
+            Language._extension_language = table
+
+        try:
+            return table[extension]
+        except KeyError:
+            pass
+
+        lower_extension = extension.lower()
+        if lower_extension in table:
+            language = table[lower_extension]
+        elif (
+            lower_extension in mimetypes.encodings_map
+            or lower_extension in mimetypes.suffix_map
+        ):
+            # As for file.txt.gz, the type is from the previous extension.
+            return Language.get_mime_type_language(mimetypes.guess_type(file_path)[0])
+        else:
+            mime_type, _ = mimetypes.guess_type("file" + extension)
+            language = Language.get_mime_type_language(mime_type)
+        table[extension] = language
+        return language
+
+    @staticmethod
+    def is_editable(file_path, extensions=None):
         """Only search mime-types that are like sources can open.
 
         A fuzzy match of text/ or +xml is good, but some files types are
         unknown or described as application data.
         """
-        return Language.get_language(file_path) is not None
+        return Language.get_language(file_path, extensions) is not None
+
+
+class _PathNode:
+    """
+    A node of the `PathOptions` tree, for a path component.
+    """
+
+    def __init__(self, is_recursive=False):
+        # `True` for a `**` component, which matches any number of folders.
+        self.is_recursive = is_recursive
+        # Child node for each literal component.
+        self.children = {}
+        # (compiled pattern, node) for the components with wildcards.
+        self.patterns = []
+        # The child node for a `**` component.
+        self.recursive = None
+        # Indexes of the rules ending at this node.
+        self.rules = []
+
+    def get_child(self, component):
+        """
+        Return the child node for the pattern `component`.
+        """
+        if component == "**":
+            if self.recursive is None:
+                self.recursive = _PathNode(is_recursive=True)
+            return self.recursive
+
+        if not any(char in component for char in "*?["):
+            return self.children.setdefault(component, _PathNode())
+
+        pattern = fnmatch.translate(component)
+        for compiled, node in self.patterns:
+            if compiled.pattern == pattern:
+                return node
+        node = _PathNode()
+        self.patterns.append((re.compile(pattern), node))
+        return node
+
+    @property
+    def is_leaf(self):
+        """
+        `True` when no other component can be matched from this node.
+        """
+        return not (
+            self.is_recursive or self.children or self.patterns or self.recursive
+        )
+
+
+class PathOptions:
+    """
+    The `path_options` rules compiled into a tree of path components.
+
+    Each rule is a (pattern, values) tuple.
+    The pattern is a path relative to the current folder, which can have
+    the `*`, `?` and `[...]` wildcards inside a component, and `**` for
+    any number of folders.
+    The `values` dictionary has the options for the matched file or
+    folder and for all the files inside the matched folder.
+    The dictionary options are updated with the values from the rule,
+    and `max_line_length` also updates the pycodestyle one.
+    When multiple rules match, the values of the later rules are used.
+
+    The rules are matched once for each folder, and the resolved options
+    are shared by all the paths matching the same rules.
+    """
+
+    def __init__(self, rules, options):
+        self.rules = rules
+        self._options = options
+        self._root = _PathNode()
+        for index, (pattern, values) in enumerate(rules):
+            for name in values:
+                if not hasattr(options, name):
+                    raise ValueError("Unknown option %s for %s" % (name, pattern))
+            node = self._root
+            for component in self._split(pattern):
+                node = node.get_child(component)
+            node.rules.append(index)
+
+        # (matched rules, nodes) for each folder, where nodes is `None`
+        # when the files can't match other rules than the folder.
+        self._folders = {}
+        # Resolved options for each set of matched rules.
+        self._values = {}
+
+    @staticmethod
+    def _split(path):
+        """
+        Return the components of `path`, relative to the current folder.
+        """
+        if os.path.isabs(path):
+            path = os.path.relpath(path)
+        path = os.path.normpath(path)
+        if path == os.curdir:
+            return []
+        return path.replace(os.sep, "/").split("/")
+
+    @staticmethod
+    def _expand(nodes):
+        """
+        Return `nodes` with their `**` nodes, which also match no folder.
+        """
+        result = []
+        pending = list(nodes)
+        while pending:
+            node = pending.pop()
+            if node in result:
+                continue
+            result.append(node)
+            if node.recursive is not None:
+                pending.append(node.recursive)
+        return result
+
+    @staticmethod
+    def _step(nodes, component):
+        """
+        Return the nodes matching `component` from `nodes`.
+        """
+        result = []
+        for node in nodes:
+            child = node.children.get(component)
+            if child is not None:
+                result.append(child)
+            for compiled, child in node.patterns:
+                if compiled.match(component):
+                    result.append(child)
+            if node.is_recursive:
+                result.append(node)
+        return PathOptions._expand(result)
+
+    def _match(self, components, matched, nodes):
+        """
+        Return (matched rules, nodes) after matching `components`.
+        """
+        for component in components:
+            nodes = self._step(nodes, component)
+            if not nodes:
+                break
+            for node in nodes:
+                matched.update(node.rules)
+        return matched, nodes
+
+    def _get_folder(self, folder):
+        """
+        Return (matched rules, nodes) for `folder`.
+        """
+        try:
+            return self._folders[folder]
+        except KeyError:
+            pass
+
+        nodes = self._expand([self._root])
+        matched = set()
+        for node in nodes:
+            matched.update(node.rules)
+        matched, nodes = self._match(self._split(folder or os.curdir), matched, nodes)
+        if all(node.is_leaf for node in nodes):
+            nodes = None
+        result = (frozenset(matched), nodes)
+        self._folders[folder] = result
+        return result
+
+    def get_values(self, path):
+        """
+        Return a dictionary with the options which are changed for `path`.
+        """
+        folder, name = os.path.split(path)
+        matched, nodes = self._get_folder(folder)
+        if nodes is not None and name:
+            matched, _ = self._match([name], set(matched), nodes)
+            matched = frozenset(matched)
+
+        try:
+            return self._values[matched]
+        except KeyError:
+            pass
+
+        values = {}
+        for index in sorted(matched):
+            for name, value in self.rules[index][1].items():
+                if name == "max_line_length":
+                    pycodestyle = dict(
+                        values.get("pycodestyle", self._options.pycodestyle)
+                    )
+                    pycodestyle["max_line_length"] = value - 1
+                    values["pycodestyle"] = pycodestyle
+                if isinstance(value, dict):
+                    merged = dict(values.get(name, getattr(self._options, name)))
+                    merged.update(value)
+                    value = merged
+                values[name] = value
+        self._values[matched] = values
+        return values
 
 
 class ScameOptions:
@@ -169,22 +564,76 @@ class ScameOptions:
 
     The configuration options are accessed via a `get` method with takes a
     path as argument so you can have different options based on different
-    paths.
+    paths, as configured by `path_options`.
     """
 
     def __init__(self):
         self._max_line_length = 0
 
         self.verbose = True
+        self.progress = False
+        # Report the time spent on imports versus checking.
+        self.profile_startup = False
+        self.stats = {
+            # Report the time spent for each file and checker.
+            "enabled": False,
+            # Number of slowest files in the report.
+            "top": 10,
+        }
+        # One of "console", "jsonl" or "sarif".
+        self.report_format = "console"
         self.diff_branch = None
+        # Only report the problems on the lines changed from `diff_branch`.
+        self.diff_lines = False
+        # Dictionary with the changed line ranges for each path, or `None`
+        # to check all the lines.
+        # The ranges are sorted (first, last) tuples of line numbers.
+        self.changed_lines = None
+        # Number of processes used to check the files.
+        self.jobs = 1
+
+        # Text to check for `path`, read from the standard input.
+        self.stdin = {"path": None}
+
+        self.server = {
+            # None for checking in this process, "serve" to start the
+            # server or "client" to check using a running server.
+            "mode": None,
+            "socket": None,
+            # Command line arguments sent by the client to the server.
+            "args": [],
+        }
+
+        self.cache = {
+            "enabled": False,
+            # Folder where the results are stored.
+            "path": ".scame_cache",
+            # Least recently used results are removed above this size.
+            "max_size": 64 * 1024 * 1024,
+        }
 
         self.regex_line = []
 
+        # List of (pattern, {option: value}) with the options changed for
+        # some paths. See `PathOptions`.
+        self.path_options = []
+        # The compiled `path_options`, created at first use.
+        self._path_options_tree = None
+
+        # Mime type for extra file extensions, as ".tac": "text/x-python".
+        self.extensions = {}
+        # Files larger than this number of bytes are not checked.
+        # 0 to check all the files.
+        self.max_file_size = 0
+
         self.scope = {
             # Paths to be included in the report.
             "include": [],
             # List of regex for paths to be excluded.
             "exclude": [],
+            # Walk the folders using the files known by git, which are
+            # not ignored.
+            "vcs": False,
         }
 
         self.pyflakes = {
@@ -193,9 +642,34 @@ class ScameOptions:
 
         self.mccabe = {"enabled": False, "max_complexity": -1}
 
+        self.json = {
+            # Report the keys found multiple times in the same object.
+            "duplicate_keys": False,
+            # Report the arrays and objects nested deeper than this.
+            # 0 to not check the depth.
+            "max_depth": 0,
+        }
+
+        # The external linters are run in separate processes,
+        # see `scame.external`.
+        self.external = {
+            # Number of linter processes running at the same time.
+            "jobs": 4,
+            # Number of files checked by a single linter process.
+            "batch_size": 50,
+        }
+
+        self.shellcheck = {
+            "enabled": False,
+            "command": "shellcheck",
+            # Extra flags to pass to shellcheck.
+            "flags": [],
+        }
+
         self.chevah_js_linter = {
             # Disabled by default, since jslint is the default linter.
             "enabled": False,
+            "command": "gjslint",
             # List of errors to ignore.
             # Ex 110 is line to long which is already provided by pocket-lint.
             "ignore": [110],
@@ -237,8 +711,16 @@ class ScameOptions:
 
     def get(self, option, path=None):
         """
-        Return the value of "option" configuration.
+        Return the value of "option" configuration for `path`.
         """
+        if path is not None and self.path_options:
+            tree = self._path_options_tree
+            if tree is None or tree.rules is not self.path_options:
+                tree = PathOptions(self.path_options, self)
+                self._path_options_tree = tree
+            values = tree.get_values(path)
+            if option in values:
+                return values[option]
         return getattr(self, option)
 
     @property
@@ -260,6 +742,9 @@ class BaseChecker:
     # Marker use to signal that errors should be ignored.
     _IGNORE_MARKER = "  # noqa"
     REENCODE = True
+    # Dictionary where the seconds spent in each check are added, or
+    # `None` when the checks are not timed.
+    timings = None
 
     def __init__(self, file_path, text, reporter=None, options=None):
         self.file_path = file_path
@@ -272,13 +757,20 @@ class BaseChecker:
             else:
                 self.text = text.decode("utf-8", "ignore")
 
-        self._lines = self.text.split("\n")
         self.set_reporter(reporter=reporter)
 
         if not options:
             options = ScameOptions()
         self.options = options
 
+    @cached_property
+    def buffer(self):
+        """
+        The `TextBuffer` for the text, shared with the other checkers of
+        the same text.
+        """
+        return TextBuffer(self.text)
+
     def set_reporter(self, reporter=None):
         """Set the reporter for messages."""
         if reporter is None:
@@ -303,7 +795,13 @@ class BaseChecker:
         if file_name is None:
             file_name = self.file_name
 
-        if self._isExceptedLine(self._lines[line_no - 1], category, code):
+        line_ranges = self.line_ranges
+        if line_ranges is not None and line_no:
+            # Messages for the whole file, on line 0, are always reported.
+            if not is_in_ranges(line_ranges, line_no):
+                return
+
+        if self.is_suppressed(line_no, category, code):
             return
 
         self._reporter(
@@ -313,42 +811,63 @@ class BaseChecker:
             base_dir=base_dir,
             file_name=file_name,
             category=category,
+            code=code,
         )
 
-    def _isExceptedLine(self, line, category, code):
+    @cached_property
+    def line_ranges(self):
+        """
+        The sorted (first, last) ranges of the lines for which the problems
+        are reported, or `None` to report all the lines.
+        """
+        # Options objects without it check all the lines.
+        changed_lines = getattr(self.options, "changed_lines", None)
+        if changed_lines is None:
+            return None
+        return changed_lines.get(os.path.normpath(self.file_path), ())
+
+    def is_suppressed(self, line_no, category=None, code=None):
         """
-        Return `True` if line should be excepted.
+        Return `True` if the messages for `category` and `code` are
+        suppressed for `line_no`.
 
         Any error can be excepted using the MARKER in the line.
         A category can be ignored using MARKER:CATEGORY
         A code from a category can be ignored using MARKER:CATEGORY=ID1,ID
         """
-        if self._IGNORE_MARKER not in line:
+        suppressions = self.buffer.get_suppressions(self._IGNORE_MARKER)
+        if line_no not in suppressions:
             # Not an excepted line.
             return False
 
-        comment = line
-
-        if comment.find(self._IGNORE_MARKER + ":") == -1:
+        categories = suppressions[line_no]
+        if categories is None:
             # We have a generic exception.
             return True
 
-        if not category:
-            # This is a tagged exception but the checker has not advertised
-            # a category.
+        if category not in categories:
+            # This is a tagged exception, but not for this category.
             return False
 
-        if comment.find(f"{self._IGNORE_MARKER}:{category}") == -1:
-            # Not this category.
-            return False
-        else:
-            # We have a tagged exception
-            return True
+        codes = categories[category]
+        return codes is None or code in codes
 
     def check(self):
         """Check the content."""
         raise NotImplementedError
 
+    def _timed(self, name, check):
+        """
+        Call `check` and add the time spent to `timings` as `name`.
+        """
+        if self.timings is None:
+            return check()
+        start = time.perf_counter()
+        try:
+            return check()
+        finally:
+            self.timings[name] = self.timings.get(name, 0) + time.perf_counter() - start
+
     @property
     def check_length_filter(self):
         """Default filter used by default for checking line length."""
@@ -359,9 +878,126 @@ class BaseChecker:
             return DEFAULT_MAX_LENGTH
 
 
+class CheckerRegistry:
+    """
+    The checker classes used for each language.
+
+    The built-in checkers are followed by the ones from the
+    `scame.checkers` entry points of the installed distributions, and then
+    by the ones added using `register`.
+    The name of an entry point is a name from `Language.names` and its
+    value is the checker class, which is imported the first time a file
+    of its language is checked.
+    """
+
+    ENTRY_POINT_GROUP = "scame.checkers"
+
+    def __init__(self):
+        # The entry points for each language, found at first use.
+        self._entry_points = None
+        self._registered = {}
+        # The checker classes already resolved for each language.
+        self._checkers = {}
+
+    def register(self, language, checker_class):
+        """
+        Add `checker_class` to the checkers for `language`.
+        """
+        self._registered.setdefault(language, []).append(checker_class)
+        self._checkers.pop(language, None)
+
+    def get_checkers(self, language):
+        """
+        Return the tuple of checker classes for `language`.
+
+        An empty tuple is returned when the files are not checked.
+        """
+        try:
+            return self._checkers[language]
+        except KeyError:
+            pass
+
+        checkers = self._get_builtin_checkers(language)
+        for entry_point in self.entry_points.get(language, ()):
+            checkers += (entry_point.load(),)
+        checkers += tuple(self._registered.get(language, ()))
+        self._checkers[language] = checkers
+        return checkers
+
+    @staticmethod
+    def _get_builtin_checkers(language):
+        """
+        Return the tuple of the scame checker classes for `language`.
+        """
+        if language is Language.LOG:
+            # Log files are not source, but they are often in source code
+            # trees.
+            return ()
+        if language in Language.XML_LIKE:
+            return (XMLChecker,)
+        checker_class = {
+            Language.PYTHON: PythonChecker,
+            Language.JAVASCRIPT: JavascriptChecker,
+            Language.JSON: JSONChecker,
+            Language.RESTRUCTUREDTEXT: ReStructuredTextChecker,
+            Language.SQL: SQLChecker,
+        }.get(language, AnyTextChecker)
+        return (checker_class,)
+
+    @property
+    def entry_points(self):
+        """
+        Dictionary with the list of entry points for each language.
+
+        The entry points with unknown language names are ignored.
+        """
+        if self._entry_points is None:
+            from importlib.metadata import entry_points
+
+            try:
+                found = entry_points(group=self.ENTRY_POINT_GROUP)
+            except TypeError:
+                # Python before 3.10.
+                found = entry_points().get(self.ENTRY_POINT_GROUP, ())
+
+            self._entry_points = {}
+            for entry_point in sorted(found, key=lambda entry: entry.value):
+                language = Language.names.get(entry_point.name)
+                if language is not None:
+                    self._entry_points.setdefault(language, []).append(entry_point)
+        return self._entry_points
+
+    def get_fingerprint(self):
+        """
+        Return a sorted list identifying the checkers which are not part of
+        scame.
+        """
+        result = [
+            "%s=%s" % (entry_point.name, entry_point.value)
+            for found in self.entry_points.values()
+            for entry_point in found
+        ]
+        names = {language: name for name, language in Language.names.items()}
+        for language, checker_classes in self._registered.items():
+            result.extend(
+                "%s=%s:%s"
+                % (
+                    names.get(language),
+                    checker_class.__module__,
+                    checker_class.__qualname__,
+                )
+                for checker_class in checker_classes
+            )
+        return sorted(result)
+
+
 class UniversalChecker(BaseChecker):
     """Check and reformat source files."""
 
+    # Shared by all the files, so that the checkers of each language are
+    # resolved once.
+    registry = CheckerRegistry()
+
     def __init__(self, file_path, text, language=None, reporter=None, options=None):
         super().__init__(
             file_path=file_path,
@@ -374,29 +1010,316 @@ class UniversalChecker(BaseChecker):
 
     def check(self):
         """Check the file syntax and style."""
-        if self.language is Language.PYTHON:
-            checker_class = PythonChecker
-        elif self.language in Language.XML_LIKE:
-            checker_class = XMLChecker
-        elif self.language is Language.JAVASCRIPT:
-            checker_class = JavascriptChecker
-        elif self.language is Language.JSON:
-            checker_class = JSONChecker
-        elif self.language is Language.RESTRUCTUREDTEXT:
-            checker_class = ReStructuredTextChecker
-        elif self.language is Language.LOG:
-            # Log files are not source, but they are often in source code
-            # trees.
-            return
+        for checker_class in self.registry.get_checkers(self.language):
+            checker = checker_class(
+                self.file_path, self.text, self._reporter, self.options
+            )
+            checker.timings = self.timings
+            if checker.text is self.text:
+                checker.buffer = self.buffer
+            if checker_class is PythonChecker:
+                # Timed for each of the Python checkers.
+                checker.check()
+            else:
+                self._timed(checker_class.__name__, checker.check)
+
+
+class RegexLineMatcher:
+    """
+    The compiled rules of the `regex_line` option.
+
+    Literal rules are found using plain text search.
+    The regular expressions which can only match inside a line are
+    searched separately when they start with a literal character, as the
+    regex engine is faster in this case, and the rest are combined into
+    a single regex.
+    All of them are searched over the whole text to find the candidate
+    lines.
+
+    If any rule can match across lines, all the lines need to be checked,
+    but the rules are first combined into a single regex so that a line
+    is searched only once when there are no matches.
+    """
+
+    # Characters with special meaning inside a regex.
+    _SPECIAL = frozenset(".^$*+?{}[]\\|()")
+    # Parts of a regex which might match a new line or depend on the
+    # text outside of the line.
+    _MULTI_LINE = re.compile(r"\\[sWDAZ0-9nxuUN]|\[\^|\(\?|\n")
+
+    def __init__(self, regex_line):
+        self.rules = [(re.compile(pattern), message) for pattern, message in regex_line]
+        self.prefilter = None
+        # The candidates used by `AnyTextMixin.check_text_lines`.
+        self.candidates = None
+
+        candidates = []
+        combined = []
+        for pattern, _ in self.rules:
+            if pattern.flags & ~re.UNICODE:
+                # Has flags like DOTALL or MULTILINE.
+                break
+            source = pattern.pattern
+            if not isinstance(source, str) or not source:
+                break
+            if self._MULTI_LINE.search(source):
+                break
+            if self._SPECIAL.isdisjoint(source):
+                candidates.append(source)
+            elif source[0] not in self._SPECIAL:
+                candidates.append(re.compile(source, re.MULTILINE))
+            else:
+                combined.append(source)
         else:
-            checker_class = AnyTextChecker
-        checker = checker_class(self.file_path, self.text, self._reporter, self.options)
-        checker.check()
+            if combined:
+                combined = self._combine(combined, re.MULTILINE)
+                if combined is None:
+                    return
+                candidates.append(combined)
+            self.candidates = tuple(candidates)
+            return
+
+        self.prefilter = self._combine([pattern.pattern for pattern, _ in self.rules])
+
+    @staticmethod
+    def _combine(patterns, flags=0):
+        """
+        Return a regex matching any of the `patterns` or `None` if they
+        can not be combined.
+        """
+        try:
+            return re.compile(
+                "|".join("(?:%s)" % (pattern,) for pattern in patterns), flags
+            )
+        except (re.error, TypeError):
+            # Patterns with conflicting group names or global flags.
+            return None
+
+
+@lru_cache(maxsize=32)
+def get_regex_line_matcher(regex_line):
+    """
+    Return the `RegexLineMatcher` for the `regex_line` tuple of
+    (pattern, message).
+    """
+    return RegexLineMatcher(regex_line)
+
+
+def _find_line_offsets(buffer, candidate):
+    """
+    Generate an offset inside the matched line for each match of the
+    `candidate` literal or regex in `buffer`.
+
+    A match starting with a new line is for the line after it.
+    """
+    if isinstance(candidate, str):
+        skip = 1 if candidate.startswith("\n") else 0
+        start = buffer.find(candidate)
+        while start != -1:
+            yield start + skip
+            start = buffer.find(candidate, start + 1)
+        return
+
+    for match in candidate.finditer(buffer):
+        start, end = match.span()
+        if end > start and buffer[start] == "\n":
+            start += 1
+        yield start
+
+
+# Texts with at least this number of characters have the lines failing
+# the length, trailing whitespace and tab checks found using NumPy, when
+# it is installed.
+NUMPY_MIN_SIZE = 1024 * 1024
+
+
+@lru_cache(maxsize=1)
+def _get_linestats():
+    """
+    Return the `scame.linestats` module or `None` when NumPy is not
+    installed.
+    """
+    with _timed_import("numpy"):
+        try:
+            from scame import linestats
+        except ImportError:
+            return None
+    return linestats
 
 
 class AnyTextMixin:
     """Common checks for many checkers."""
 
+    # Regular expressions, literal strings or tuples of them, matching
+    # the lines which can fail a line check.
+    # A line check is only called for the lines matched by its candidates.
+    # They are searched in the text with a new line added at start and
+    # end, so that a leading or trailing "\n" can match the line limits.
+    line_candidates = {
+        "check_conflicts": ("\n<<<<<<<", "\n>>>>>>>"),
+        "check_tab": ("\t",),
+        "check_trailing_whitespace": (" \n",),
+    }
+    # Names of the line checks which only set the checker state, without
+    # reporting messages, so they are also called outside `line_ranges`.
+    state_checks = ()
+
+    def get_line_candidates(self, check):
+        """
+        Return the candidates matching the lines for which `check` is called.
+
+        Return `None` when `check` needs to be called for all the lines
+        and `False` when it does not need to be called at all.
+        A dictionary has the offset of the start of each line, for the
+        line numbers already found.
+        """
+        name = check.__name__
+        line_statistics = self.line_statistics
+        if line_statistics is not None and name in line_statistics:
+            return line_statistics[name]
+        if name == "check_length":
+            return re.compile(r"\n[^\n]{%d}" % (self.check_length_filter + 1,))
+        if name == "check_regex_line":
+            if not self.regex_line_matcher.rules:
+                return False
+            return self.regex_line_matcher.candidates
+        return self.line_candidates.get(name)
+
+    @cached_property
+    def line_statistics(self):
+        """
+        The lines failing the line checks, as returned by
+        `scame.linestats.get_line_offsets`.
+
+        `None` when the text is small or not ASCII, or NumPy is not
+        installed, and the lines are found using the candidates.
+        """
+        if len(self.text) < NUMPY_MIN_SIZE or not self.text.isascii():
+            return None
+        linestats = _get_linestats()
+        if linestats is None:
+            return None
+
+        text_buffer = self.buffer
+        if text_buffer.has_other_line_breaks:
+            # Only use new lines to separate the lines.
+            text = "\n".join(text_buffer.lines)
+        else:
+            text = self.text
+        return linestats.get_line_offsets(text, self.check_length_filter)
+
+    @cached_property
+    def regex_line_matcher(self):
+        """The compiled `regex_line` option."""
+        regex_line = self.options.get("regex_line", self.file_path)
+        return get_regex_line_matcher(tuple(tuple(rule) for rule in regex_line))
+
+    def check_text_lines(self, *checks):
+        """
+        Call each of the line `checks` for the lines in text and return the
+        number of lines.
+
+        The messages are the same as when calling all the checks for each
+        line, but the whole text is scanned once for each check, and the
+        check is called only for the lines matched by its candidates regex.
+        When `line_ranges` is set, the checks are only called for the lines
+        inside the ranges, except for the `state_checks`.
+        """
+        line_ranges = self.line_ranges
+        state = [
+            index
+            for index, check in enumerate(checks)
+            if check.__name__ in self.state_checks
+        ]
+        text_buffer = self.buffer
+        total_lines = text_buffer.total_lines
+        if text_buffer.has_other_line_breaks:
+            # Only use new lines to separate the lines.
+            text = "\n".join(text_buffer.lines)
+        else:
+            text = self.text
+
+        buffer = "\n" + text + "\n"
+        always = []
+        # Offset inside the buffer for (line_no, check index).
+        found = {}
+        for index, check in enumerate(checks):
+            candidates = self.get_line_candidates(check)
+            if candidates is False:
+                continue
+            if candidates is None:
+                always.append(index)
+                continue
+            if isinstance(candidates, dict):
+                for line_no, offset in candidates.items():
+                    # The buffer starts with a new line.
+                    found[(line_no, index)] = offset + 1
+                continue
+            if not isinstance(candidates, tuple):
+                candidates = (candidates,)
+            for candidate in candidates:
+                line_no = 0
+                position = 0
+                for offset in _find_line_offsets(buffer, candidate):
+                    line_no += buffer.count("\n", position, offset)
+                    position = offset
+                    found[(line_no, index)] = offset
+
+        if always:
+            # Some checks are called for every line.
+            by_line = {}
+            for line_no, index in found:
+                by_line.setdefault(line_no, []).append(index)
+
+            lines = text_buffer.lines
+            if line_ranges is None:
+                numbered_lines = enumerate(lines, 1)
+            else:
+                line_numbers = {
+                    line_no
+                    for first, last in line_ranges
+                    for line_no in range(first, min(last, total_lines) + 1)
+                }
+                if any(index in always for index in state):
+                    line_numbers = range(1, total_lines + 1)
+                elif state:
+                    line_numbers.update(
+                        line_no
+                        for line_no, index in found
+                        if index in state and 1 <= line_no <= total_lines
+                    )
+                numbered_lines = (
+                    (line_no, lines[line_no - 1]) for line_no in sorted(line_numbers)
+                )
+            for line_no, line in numbered_lines:
+                indexes = by_line.get(line_no)
+                if indexes is None:
+                    indexes = always
+                else:
+                    indexes = sorted(indexes + always)
+                if line_ranges is not None and not is_in_ranges(line_ranges, line_no):
+                    indexes = [index for index in indexes if index in state]
+                for index in indexes:
+                    checks[index](line_no, line)
+            return total_lines
+
+        for line_no, index in sorted(found):
+            if line_no < 1 or line_no > total_lines:
+                # Matched the new lines added at start or end.
+                continue
+            if (
+                line_ranges is not None
+                and index not in state
+                and not is_in_ranges(line_ranges, line_no)
+            ):
+                continue
+            offset = found[(line_no, index)]
+            start = buffer.rfind("\n", 0, offset) + 1
+            end = buffer.find("\n", start)
+            checks[index](line_no, buffer[start:end])
+
+        return total_lines
+
     def check_conflicts(self, line_no, line):
         """Check that there are no merge conflict markers."""
         if line.startswith("<" * 7) or line.startswith(">" * 7):
@@ -465,9 +1388,11 @@ class AnyTextMixin:
 
         This can be used for custom checks.
         """
-        regex_line = self.options.get("regex_line", self.file_path)
-        for pattern, message in regex_line:
-            if re.search(pattern, line):
+        matcher = self.regex_line_matcher
+        if matcher.prefilter is not None and not matcher.prefilter.search(line):
+            return
+        for pattern, message in matcher.rules:
+            if pattern.search(line):
                 self.message(
                     line_no,
                     "Line contains flagged text. %s" % (message),
@@ -481,13 +1406,12 @@ class AnyTextChecker(BaseChecker, AnyTextMixin):
 
     def check(self):
         """Call each line_method for each line in text."""
-        for line_no, line in enumerate(self.text.splitlines()):
-            line_no += 1
-            self.check_length(line_no, line)
-            self.check_trailing_whitespace(line_no, line)
-            self.check_conflicts(line_no, line)
-            self.check_regex_line(line_no, line)
-
+        self.check_text_lines(
+            self.check_length,
+            self.check_trailing_whitespace,
+            self.check_conflicts,
+            self.check_regex_line,
+        )
         self.check_windows_endlines()
 
 
@@ -498,92 +1422,17 @@ class SQLChecker(BaseChecker, AnyTextMixin):
         """Call each line_method for each line in text."""
         # Consider http://code.google.com/p/python-sqlparse/ to verify
         # keywords and reformatting.
-        for line_no, line in enumerate(self.text.splitlines()):
-            line_no += 1
-            self.check_trailing_whitespace(line_no, line)
-            self.check_tab(line_no, line)
-            self.check_conflicts(line_no, line)
-            self.check_regex_line(line_no, line)
-
+        self.check_text_lines(
+            self.check_trailing_whitespace,
+            self.check_tab,
+            self.check_conflicts,
+            self.check_regex_line,
+        )
         self.check_windows_endlines()
 
 
-class FastTreeBuilder(ElementTree.TreeBuilder):
-    def _flush(self):
-        if self._data:
-            if self._last is not None:
-                # Ensure all text is ascii; the data is never written back.
-                text = "".join([b for b in str(self._data) if ord(b) < 128])
-                if self._tail:
-                    assert self._last.tail is None, "internal error (tail)"
-                    self._last.tail = text
-                else:
-                    assert self._last.text is None, "internal error (text)"
-                    self._last.text = text
-            self._data = []
-
-
-class FastParser:
-    """A simple and pure-python parser that checks well-formedness.
-
-    This parser works in py 2 and 3. It handles entities and ignores
-    namespaces. This parser works with python ElementTree.
-    """
-
-    def __init__(self, html=0, target=None, encoding=None):
-        parser = expat.ParserCreate(encoding, None)
-        target = FastTreeBuilder()
-        self.parser = parser
-        self.target = target
-        self._error = expat.error
-        self._names = {}  # Name memo cache
-        parser.DefaultHandlerExpand = self._default
-        parser.StartElementHandler = target.start
-        parser.EndElementHandler = target.end
-        parser.CharacterDataHandler = target.data
-        parser.buffer_text = 1
-        # Py3, but not Py2.
-        # parser.ordered_attributes = 1
-        # parser.specified_attributes = 1
-        self._doctype = None
-        self.entity = dict(entitydefs)
-        self.version = "Expat %d.%d.%d" % expat.version_info
-
-    def _default(self, text):
-        prefix = text[:1]
-        if prefix == "&":
-            # Deal with undefined entities.
-            data_handler = self.target.data
-            try:
-                data_handler(self.entity[text[1:-1]])
-            except KeyError:
-                err = expat.error(
-                    "undefined entity %s: line %d, column %d"
-                    % (text, self.parser.ErrorLineNumber, self.parser.ErrorColumnNumber)
-                )
-                err.code = 11  # XML_ERROR_UNDEFINED_ENTITY
-                err.lineno = self.parser.ErrorLineNumber
-                err.offset = self.parser.ErrorColumnNumber
-                raise err
-
-    def _raiseerror(self, value):
-        err = ParseError(value)
-        err.code = value.code
-        err.position = value.lineno, value.offset
-        raise err
-
-    def feed(self, data):
-        try:
-            self.parser.Parse(data, 0)
-        except self._error as v:
-            self._raiseerror(v)
-
-    def close(self):
-        try:
-            self.parser.Parse("", 1)  # End of data.
-        except self._error as v:
-            self._raiseerror(v)
-        self.target.close()
+# Number of characters fed to the XML parser at once.
+XML_CHUNK_SIZE = 64 * 1024
 
 
 class XMLChecker(BaseChecker, AnyTextMixin):
@@ -601,25 +1450,26 @@ class XMLChecker(BaseChecker, AnyTextMixin):
         # Reconcile the text and Expat checker text requriements.
         if self.text == "":
             return
-        parser = FastParser()
+
+        with _timed_import("xml"):
+            from xml.etree.ElementTree import ParseError
+            from xml.parsers import expat
+
+            from scame.xmlparser import ValidatingParser
+
+        parser = ValidatingParser()
         offset = 0
-        # The expat parser seems to be assuming ascii even when
-        # XMLParser(encoding='utf-8') is used above.
-        text = self.text.encode("utf-8").decode("ascii", "ignore")
-        if text.find("<!DOCTYPE") == -1:
-            # Expat requires a doctype to honour parser.entity.
-            offset = 1
-            match = self.xml_decl_pattern.search(text)
-            if match is None:
-                text = self.xhtml_doctype + "\n" + text
-            else:
-                start, end = match.span(0)
-                text = text[:start] + self.xhtml_doctype + "\n" + text[end:]
-        elif text.find("<!DOCTYPE html>") != -1:
-            text = text.replace("<!DOCTYPE html>", self.xhtml_doctype)
         try:
-            ElementTree.parse(StringIO(text), parser)
+            for chunk in self._get_xml_chunks():
+                # Only the ASCII characters are checked, as the declared
+                # encoding might not match the text. The parser always
+                # uses UTF-8, which is compatible with them.
+                parser.feed(chunk.encode("ascii", "ignore"))
+            parser.close()
         except (expat.ExpatError, ParseError) as error:
+            if self.text.find("<!DOCTYPE") == -1:
+                # A doctype line was added before the document.
+                offset = 1
             if hasattr(error, "code"):
                 error_message = expat.ErrorString(error.code)
                 if hasattr(error, "position") and error.position:
@@ -642,12 +1492,46 @@ class XMLChecker(BaseChecker, AnyTextMixin):
         self.check_text()
         self.check_windows_endlines()
 
+    def _get_xml_chunks(self):
+        """
+        Generate the parts of the text fed to expat, of at most
+        `XML_CHUNK_SIZE` characters.
+
+        Expat requires a doctype to honour parser.entity, so the XHTML
+        doctype is fed instead of the XML declaration or the HTML5
+        doctype, or before the text when there is no doctype.
+        """
+        text = self.text
+        start = 0
+        end = 0
+        if text.find("<!DOCTYPE") == -1:
+            match = self.xml_decl_pattern.search(text)
+            if match is not None:
+                start, end = match.span(0)
+            yield from self._get_text_chunks(0, start)
+            yield self.xhtml_doctype + "\n"
+        else:
+            html5_doctype = "<!DOCTYPE html>"
+            index = text.find(html5_doctype)
+            if index != -1:
+                yield from self._get_text_chunks(0, index)
+                yield self.xhtml_doctype
+                end = index + len(html5_doctype)
+        yield from self._get_text_chunks(end, len(text))
+
+    def _get_text_chunks(self, start, end):
+        """
+        Generate the text from `start` to `end` in chunks.
+        """
+        for index in range(start, end, XML_CHUNK_SIZE):
+            yield self.text[index : min(index + XML_CHUNK_SIZE, end)]
+
     def check_text(self):
-        for line_no, line in enumerate(self.text.splitlines()):
-            line_no += 1
-            self.check_trailing_whitespace(line_no, line)
-            self.check_conflicts(line_no, line)
-            self.check_regex_line(line_no, line)
+        self.check_text_lines(
+            self.check_trailing_whitespace,
+            self.check_conflicts,
+            self.check_regex_line,
+        )
 
 
 class BanditPocketLintConfig:
@@ -659,6 +1543,156 @@ class BanditPocketLintConfig:
         return None
 
 
+class PythonSource:
+    """
+    The source of a Python file, parsed only once and shared by all the
+    Python checkers.
+    """
+
+    def __init__(self, file_path, text, encoding="ascii"):
+        self.file_path = file_path
+        self.text = text
+        self.encoding = encoding
+        self._astroid_trees = {}
+
+    @cached_property
+    def lines(self):
+        """
+        The lines of the source, with the line endings.
+        """
+        return self.text.splitlines(True)
+
+    @cached_property
+    def tree(self):
+        """
+        The AST of the source.
+
+        Raises SyntaxError when the source can't be compiled, also when it
+        can't be encoded using its encoding.
+        """
+        try:
+            source = self.text.encode(self.encoding)
+        except LookupError:
+            raise SyntaxError("unknown encoding: %s" % (self.encoding,))
+        except UnicodeEncodeError as error:
+            line_no = self.text.count("\n", 0, error.start) + 1
+            raise SyntaxError(
+                "character not valid for the %s encoding" % (self.encoding,),
+                (self.file_path, line_no, None, self.lines[line_no - 1]),
+            )
+        return compile(source, self.file_path, "exec", _ast.PyCF_ONLY_AST)
+
+    def get_astroid(self, module_name):
+        """
+        Return the astroid tree for the source as `module_name`, without
+        reading the file from the disk.
+        """
+        tree = self._astroid_trees.get(module_name)
+        if tree is None:
+            from astroid import MANAGER
+            from astroid.builder import AstroidBuilder
+
+            tree = AstroidBuilder(MANAGER).string_build(
+                self.text, module_name, self.file_path
+            )
+            self._astroid_trees[module_name] = tree
+        return tree
+
+
+def _get_options_key(options):
+    """
+    Return a hashable key for the `options` dictionary of a checker.
+    """
+    return tuple(
+        sorted(
+            (name, tuple(value) if isinstance(value, list) else value)
+            for name, value in options.items()
+        )
+    )
+
+
+@lru_cache(maxsize=8)
+def _get_pycodestyle_style(options_key):
+    """
+    Return (options, report class) for the pycodestyle `options_key`.
+
+    The style guide is created only once for each set of options, as it
+    also parses the pycodestyle configuration files.
+    """
+    import pycodestyle
+
+    class PyCodeStyleReport(pycodestyle.StandardReport):
+        """
+        Forward all errors to the main reporter.
+        """
+
+        def __init__(self, options, message_function):
+            super().__init__(options)
+            self.message = message_function
+
+        def error(self, line_no, offset, message, check):
+            self.message(
+                line_no,
+                message,
+                category="pycodestyle",
+                icon="info",
+                code=message.split(" ", 1)[0],
+            )
+
+    style = pycodestyle.StyleGuide(**dict(options_key))
+    return style.options, PyCodeStyleReport
+
+
+@lru_cache(maxsize=8)
+def _get_pylint_linter(options_key):
+    """
+    Return the pylint linter configured for the pylint `options_key`.
+
+    The linter is created only once for each set of options, as loading
+    the plugins and the configuration is slower than checking a file.
+    Set `scame_source` to the `PythonSource` of the checked file before
+    using it.
+    """
+    from astroid import AstroidError
+    from pylint.lint import PyLinter
+
+    class SourceLinter(PyLinter):
+        """
+        Use the already read source instead of reading the file again.
+        """
+
+        scame_source = None
+
+        def get_ast(self, filepath, modname, *args, **kwargs):
+            source = self.scame_source
+            if source is not None and filepath == source.file_path:
+                try:
+                    return source.get_astroid(modname)
+                except AstroidError:
+                    # Let pylint report the error.
+                    pass
+            return super().get_ast(filepath, modname, *args, **kwargs)
+
+    options = dict(options_key)
+    linter = SourceLinter()
+    linter.load_default_plugins()
+
+    if options.pop("py3k"):
+        linter.python3_porting_mode()
+
+    rcfile = options.pop("rcfile", None)
+    if rcfile:
+        linter.read_config_file(config_file=rcfile)
+        linter.load_config_file()
+    else:
+        options = {
+            name: list(value) if isinstance(value, tuple) else value
+            for name, value in options.items()
+        }
+        linter.load_configuration_from_config(options)
+    return linter
+
+
 class PythonChecker(BaseChecker, AnyTextMixin):
     """Check python source code."""
 
@@ -666,10 +1700,14 @@ class PythonChecker(BaseChecker, AnyTextMixin):
 
     # This regex is taken from PEP 0263.
     encoding_pattern = re.compile(r"coding[:=]\s*([-\w.]+)")
+    pdb_pattern = ("pdb." + "set_trace",)
+    non_ascii_pattern = re.compile(r"[^\x00-\x7f]")
+    state_checks = ("check_encoding",)
 
     def __init__(self, file_path, text, reporter=None, options=None):
         super().__init__(file_path, text, reporter, options)
         self.encoding = "ascii"
+        self._source = None
         # Last compiled tree.
         self._compiled_tree = None
         # Placeholder config for bandit. Does nothing special for now.
@@ -679,16 +1717,15 @@ class PythonChecker(BaseChecker, AnyTextMixin):
         """Check the syntax of the python code."""
         if self.text == "":
             return
-        self.check_text()
+        self._timed("PythonChecker.check_text", self.check_text)
         self.check_windows_endlines()
 
+        # The encoding is known only after checking the text.
+        self._source = None
         try:
             # Compile the source code only once.
-            self._compiled_tree = compile(
-                self.text.encode(self.encoding),
-                self.file_path,
-                "exec",
-                _ast.PyCF_ONLY_AST,
+            self._compiled_tree = self._timed(
+                "PythonChecker.compile", lambda: self.source.tree
             )
         except (SyntaxError, IndentationError) as exc:
             # Failed to compile the source code.
@@ -700,14 +1737,27 @@ class PythonChecker(BaseChecker, AnyTextMixin):
             self._compiled_tree = None
 
         # pyflakes should be first as it will try to compile
-        self.check_flakes()
-        self.check_pycodestyle()
-        self.check_bandit()
-        self.check_pylint()
-        self.check_complexity()
+        for check in (
+            self.check_flakes,
+            self.check_pycodestyle,
+            self.check_bandit,
+            self.check_pylint,
+            self.check_complexity,
+        ):
+            self._timed("PythonChecker." + check.__name__, check)
 
         # Reset the tree.
         self._compiled_tree = None
+        self._source = None
+
+    @property
+    def source(self):
+        """
+        The parsed source shared by all the checkers.
+        """
+        if self._source is None:
+            self._source = PythonSource(self.file_path, self.text, self.encoding)
+        return self._source
 
     def check_flakes(self):
         """Check compilation and syntax."""
@@ -718,6 +1768,9 @@ class PythonChecker(BaseChecker, AnyTextMixin):
         if not options["enabled"]:
             return
 
+        with _timed_import("pyflakes"):
+            from scame.pyflakes_checker import PocketLintPyFlakesChecker
+
         warnings = PocketLintPyFlakesChecker(
             self._compiled_tree, file_path=self.file_path, text=self.text
         )
@@ -736,36 +1789,19 @@ class PythonChecker(BaseChecker, AnyTextMixin):
         if not options["enabled"]:
             return
 
-        import pycodestyle
-
-        class PyCodeStyleReport(pycodestyle.StandardReport):
-            """
-            Forward all errors to the main reporter.
-            """
-
-            def __init__(self, options, message_function):
-                super().__init__(options)
-                self.message = message_function
-
-            def error(self, line_no, offset, message, check):
-                self.message(
-                    line_no,
-                    message,
-                    category="pycodestyle",
-                    icon="info",
-                )
-
         # Enabled is only used internally.
         del options["enabled"]
 
-        style_options = pycodestyle.StyleGuide(**options)
-        pycodestyle_options = style_options.options
-        pycodestyle_report = PyCodeStyleReport(pycodestyle_options, self.message)
+        with _timed_import("pycodestyle"):
+            import pycodestyle
+
+        style_options, report_class = _get_pycodestyle_style(_get_options_key(options))
+        pycodestyle_report = report_class(style_options, self.message)
         try:
             pycodestyle_checker = pycodestyle.Checker(
                 filename=self.file_path,
-                lines=self.text.splitlines(True),
-                options=pycodestyle_options,
+                lines=self.source.lines,
+                options=style_options,
                 report=pycodestyle_report,
             )
             pycodestyle_checker.check_all()
@@ -789,13 +1825,20 @@ class PythonChecker(BaseChecker, AnyTextMixin):
             # We failed to compile the tree.
             return
 
-        from mccabe import McCabeChecker
+        with _timed_import("mccabe"):
+            from mccabe import McCabeChecker
 
         McCabeChecker.max_complexity = options["max_complexity"]
 
         result = McCabeChecker(self._compiled_tree, "-").run()
         for lineno, offset, text, check in result:
-            self.message(lineno, text, icon="info", category="mccabe")
+            self.message(
+                lineno,
+                text,
+                icon="info",
+                category="mccabe",
+                code=text.split(" ", 1)[0],
+            )
 
     def check_bandit(self):
         """
@@ -809,10 +1852,11 @@ class PythonChecker(BaseChecker, AnyTextMixin):
             # We failed to compile the tree.
             return
 
-        from bandit.core.meta_ast import BanditMetaAst
-        from bandit.core.metrics import Metrics
-        from bandit.core.node_visitor import BanditNodeVisitor
-        from bandit.core.test_set import BanditTestSet
+        with _timed_import("bandit"):
+            from bandit.core.meta_ast import BanditMetaAst
+            from bandit.core.metrics import Metrics
+            from bandit.core.node_visitor import BanditNodeVisitor
+            from bandit.core.test_set import BanditTestSet
 
         result = BanditNodeVisitor(
             fname=self.file_path,
@@ -826,6 +1870,8 @@ class PythonChecker(BaseChecker, AnyTextMixin):
         result.process(self._compiled_tree)
 
         for issue in result.tester.results:
+            if self.is_suppressed(issue.lineno, "bandit", issue.test_id):
+                continue
             self.message(
                 issue.lineno,
                 "{} {}".format(
@@ -850,32 +1896,25 @@ class PythonChecker(BaseChecker, AnyTextMixin):
             # We failed to compile the tree.
             return
 
-        from pylint.lint import PyLinter, fix_import_path
-        from pylint.reporters import CollectingReporter
+        with _timed_import("pylint"):
+            from pylint.lint import fix_import_path
+            from pylint.reporters import CollectingReporter
 
-        linter = PyLinter()
-        linter.load_default_plugins()
+        linter = _get_pylint_linter(_get_options_key(options))
         linter.set_reporter(CollectingReporter())
+        linter.scame_source = self.source
 
-        if options["py3k"]:
-            linter.python3_porting_mode()
-        del options["py3k"]
-
-        rcfile = options.get("rcfile", None)
-        del options["rcfile"]
-
-        if rcfile:
-            linter.read_config_file(config_file=rcfile)
-            linter.load_config_file()
-        else:
-            linter.load_configuration_from_config(options)
-
-        # PyLint does its own import and parsing, so we only pass the file
-        # name and the precompiled tree.
-        with fix_import_path(self.file_path):
-            linter.check(self.file_path)
+        # PyLint does its own import for the dependencies, but the checked
+        # file is parsed from the shared source.
+        try:
+            with fix_import_path(self.file_path):
+                linter.check(self.file_path)
+        finally:
+            linter.scame_source = None
 
         for message in linter.reporter.messages:
+            if self.is_suppressed(message.line, "pylint", message.msg_id):
+                continue
             self.message(
                 message.line,
                 "{}:{} {}".format(
@@ -890,16 +1929,34 @@ class PythonChecker(BaseChecker, AnyTextMixin):
 
     def check_text(self):
         """Call each line_method for each line in text."""
-        for line_no, line in enumerate(self.text.splitlines()):
-            line_no += 1
-            if line_no in (1, 2):
-                match = self.encoding_pattern.search(line)
-                if match:
-                    self.encoding = match.group(1).lower()
-            self.check_pdb(line_no, line)
-            self.check_conflicts(line_no, line)
-            self.check_regex_line(line_no, line)
-            self.check_ascii(line_no, line)
+        self.check_text_lines(
+            self.check_encoding,
+            self.check_pdb,
+            self.check_conflicts,
+            self.check_regex_line,
+            self.check_ascii,
+        )
+
+    def get_line_candidates(self, check):
+        """See `AnyTextMixin`."""
+        name = check.__name__
+        if name == "check_encoding":
+            return self.encoding_pattern
+        if name == "check_pdb":
+            return self.pdb_pattern
+        if name == "check_ascii":
+            if self.text.isascii():
+                return False
+            return self.non_ascii_pattern
+        return super().get_line_candidates(check)
+
+    def check_encoding(self, line_no, line):
+        """Set the source encoding from the first 2 lines."""
+        if line_no not in (1, 2):
+            return
+        match = self.encoding_pattern.search(line)
+        if match:
+            self.encoding = match.group(1).lower()
 
     def check_pdb(self, line_no, line):
         """Check for pdb breakpoints."""
@@ -916,8 +1973,9 @@ class PythonChecker(BaseChecker, AnyTextMixin):
     @property
     def check_length_filter(self):
         # The pycodestyle lib counts from 0.
-        if self.options.max_line_length:
-            return self.options.max_line_length - 1
+        max_line_length = self.options.get("max_line_length", self.file_path)
+        if max_line_length:
+            return max_line_length - 1
         else:
             return DEFAULT_MAX_LENGTH
 
@@ -938,6 +1996,8 @@ class PythonChecker(BaseChecker, AnyTextMixin):
 class JavascriptChecker(BaseChecker, AnyTextMixin):
     """Check JavaScript source code."""
 
+    debugger_pattern = ("debugger;",)
+
     def check(self):
         """Check the syntax of the JavaScript code."""
         self.check_text()
@@ -951,14 +2011,25 @@ class JavascriptChecker(BaseChecker, AnyTextMixin):
 
     def check_text(self):
         """Call each line_method for each line in text."""
-        for line_no, line in enumerate(self.text.splitlines()):
-            line_no += 1
-            self.check_debugger(line_no, line)
-            self.check_length(line_no, line)
-            self.check_trailing_whitespace(line_no, line)
-            self.check_conflicts(line_no, line)
-            self.check_regex_line(line_no, line)
-            self.check_tab(line_no, line)
+        self.check_text_lines(
+            self.check_debugger,
+            self.check_length,
+            self.check_trailing_whitespace,
+            self.check_conflicts,
+            self.check_regex_line,
+            self.check_tab,
+        )
+
+    def get_line_candidates(self, check):
+        """See `AnyTextMixin`."""
+        if check.__name__ == "check_debugger":
+            return self.debugger_pattern
+        return super().get_line_candidates(check)
+
+
+# JSON documents with at least this number of characters are validated
+# without creating the values, as they would use too much memory.
+JSON_VALIDATOR_MIN_SIZE = 16 * 1024 * 1024
 
 
 class JSONChecker(BaseChecker, AnyTextMixin):
@@ -970,13 +2041,12 @@ class JSONChecker(BaseChecker, AnyTextMixin):
             return
 
         # Line independent checks.
-        for line_no, line in enumerate(self.text.splitlines()):
-            line_no += 1
-            self.check_trailing_whitespace(line_no, line)
-            self.check_conflicts(line_no, line)
-            self.check_regex_line(line_no, line)
-            self.check_tab(line_no, line)
-        last_lineno = line_no
+        last_lineno = self.check_text_lines(
+            self.check_trailing_whitespace,
+            self.check_conflicts,
+            self.check_regex_line,
+            self.check_tab,
+        )
         self.check_load()
         self.check_empty_last_line(last_lineno)
 
@@ -985,21 +2055,64 @@ class JSONChecker(BaseChecker, AnyTextMixin):
         return
 
     def check_load(self):
-        """Check that JSON can be deserialized/loaded."""
-        try:
-            json.loads(self.text)
-        except ValueError as error:
-            line_number = 0
-            message = str(error)
-            match = re.search(r"(.*): line (\d+)", message)
-            if match:
-                try:
-                    line_number = int(match.group(2))
-                except Exception:
-                    # If we can not find the line number,
-                    # just fall back to default.
-                    line_number = 0
-            self.message(line_number, message, icon="error")
+        """
+        Check that JSON can be deserialized/loaded.
+
+        The large documents are only validated, without creating the
+        values, as are the documents for which the duplicate keys or the
+        nesting depth are checked.
+        """
+        options = self.options.get("json", self.file_path)
+        if (
+            len(self.text) < JSON_VALIDATOR_MIN_SIZE
+            and not options["duplicate_keys"]
+            and not options["max_depth"]
+        ):
+            import json
+
+            try:
+                json.loads(self.text)
+            except ValueError as error:
+                self.message(getattr(error, "lineno", 0), str(error), icon="error")
+                return
+            except RecursionError:
+                # Too deeply nested for the json module.
+                pass
+            else:
+                return
+        self.check_validate(options)
+
+    def check_validate(self, options):
+        """
+        Check the JSON syntax using `validate_json`, with the `json`
+        options.
+        """
+        from scame.jsonvalidator import validate_json
+
+        problems, error = validate_json(
+            self.text,
+            duplicate_keys=options["duplicate_keys"],
+            max_depth=options["max_depth"],
+        )
+        for position, message in problems:
+            self.message(
+                self.buffer.get_line_no(position),
+                message,
+                category="json",
+                icon="info",
+            )
+
+        if error is not None:
+            position, message = error
+            line_no = self.buffer.get_line_no(position)
+            column = position - self.buffer.line_starts[line_no - 1] + 1
+            # The same details as for the json module.
+            self.message(
+                line_no,
+                "%s: line %d column %d (char %d)"
+                % (message, line_no, column, position),
+                icon="error",
+            )
 
 
 class ReStructuredTextChecker(BaseChecker, AnyTextMixin):
@@ -1022,10 +2135,32 @@ class ReStructuredTextChecker(BaseChecker, AnyTextMixin):
         "<",
         ">",
     ]
+    # Lines starting with at least 3 delimiter characters.
+    marker_pattern = re.compile(
+        r"\n([%s])\1\1" % (re.escape("".join(delimiter_characters)),)
+    )
 
-    def __init__(self, file_path, text, reporter=None, options=None):
-        super().__init__(file_path, text, reporter, options)
-        self.lines = self.text.splitlines()
+    # Flags for the kind of a line, the other lines are text.
+    LINE_BLANK = 1
+    # A custom anchor, as `.. _link:`.
+    LINE_ANCHOR = 2
+    # Starting with 3 delimiter characters, without spaces.
+    LINE_DELIMITER = 4
+    # Starting with 4 delimiter characters, a transition when it is
+    # bounded by empty lines.
+    LINE_MARKER = 8
+    # The groups are the anchors and the markers.
+    line_kind_pattern = re.compile(
+        r"^(?:(\.\. _)|([%s])\2\2)" % (re.escape("".join(delimiter_characters)),),
+        re.MULTILINE,
+    )
+
+    @property
+    def lines(self):
+        """
+        The lines of the text.
+        """
+        return self.buffer.lines
 
     def message(self, *args, **kwargs):
         """
@@ -1046,50 +2181,104 @@ class ReStructuredTextChecker(BaseChecker, AnyTextMixin):
 
     def check_lines(self):
         """Call each line checker for each line in text."""
-        for line_no, line in enumerate(self.lines):
-            line_no += 1
-            self.check_length(line_no, line)
-            self.check_trailing_whitespace(line_no, line)
-            self.check_tab(line_no, line)
-            self.check_conflicts(line_no, line)
-            self.check_regex_line(line_no, line)
-
-            if self.isTransition(line_no - 1):
-                self.check_transition(line_no - 1)
-            elif self.isSectionDelimiter(line_no - 1):
-                self.check_section_delimiter(line_no - 1)
-            else:
-                pass
+        self.check_text_lines(
+            self.check_length,
+            self.check_trailing_whitespace,
+            self.check_tab,
+            self.check_conflicts,
+            self.check_regex_line,
+            self.check_markers,
+        )
 
-    def isTransition(self, line_number):
-        """Return True if the current line is a line transition."""
-        line = self.lines[line_number]
-        if len(line) < 4:
-            return False
+    def get_line_candidates(self, check):
+        """See `AnyTextMixin`."""
+        if check.__name__ == "check_markers":
+            return self.marker_pattern
+        return super().get_line_candidates(check)
 
-        if len(self.lines) < 3:
-            return False
+    def check_markers(self, line_no, line):
+        """
+        Check the transition and section markers.
 
-        succesive_characters = (
-            line[0] == line[1] == line[2] == line[3]
-            and line[0] in self.delimiter_characters
-        )
+        The same as `isTransition` and `isSectionDelimiter`, using the
+        `line_kinds`.
+        """
+        kinds = self.line_kinds
+        if len(kinds) < 3:
+            return
+        line_number = line_no - 1
+        kind = kinds[line_number]
+        if (
+            kind & self.LINE_MARKER
+            and kinds[line_number - 1] & self.LINE_BLANK
+            and line_number + 1 < len(kinds)
+            and kinds[line_number + 1] & self.LINE_BLANK
+        ):
+            self.check_transition(line_number)
+        elif kind & self.LINE_DELIMITER:
+            self.check_section_delimiter(line_number)
+
+    @cached_property
+    def line_kinds(self):
+        """
+        A `bytearray` with the `LINE_*` flags for each line.
 
-        if not succesive_characters:
-            return False
+        The lines are classified in a single pass over the text, so that
+        the section and transition rules don't examine the lines around
+        the markers again to find their kind.
+        """
+        text_buffer = self.buffer
+        lines = text_buffer.lines
+        if text_buffer.has_other_line_breaks:
+            # Only use new lines to separate the lines.
+            text = "\n".join(lines)
+        else:
+            text = self.text
+
+        # The empty lines are LINE_BLANK.
+        kinds = bytearray(map(operator.not_, lines))
+        line_no = 0
+        position = 0
+        for match in self.line_kind_pattern.finditer(text):
+            offset = match.start()
+            line_no += text.count("\n", position, offset)
+            position = offset
+            if match.lastindex == 1:
+                kinds[line_no] = self.LINE_ANCHOR
+                continue
+            line = lines[line_no]
+            kind = 0
+            if " " not in line:
+                kind |= self.LINE_DELIMITER
+            if len(line) > 3 and line[3] == line[0]:
+                kind |= self.LINE_MARKER
+            kinds[line_no] = kind
+        return kinds
+
+    def _isBlank(self, line_number):
+        """
+        Return True if the line exists and is empty.
 
-        emply_lines_bounded = (
-            self.lines[line_number - 1] == "" and self.lines[line_number + 1] == ""
+        As for the list of lines, the negative numbers are from the end.
+        """
+        kinds = self.line_kinds
+        return -len(kinds) <= line_number < len(kinds) and bool(
+            kinds[line_number] & self.LINE_BLANK
         )
 
-        if not emply_lines_bounded:
+    def isTransition(self, line_number):
+        """Return True if the current line is a line transition."""
+        if not self.line_kinds[line_number] & self.LINE_MARKER:
             return False
 
-        return True
+        if len(self.lines) < 3:
+            return False
+
+        return self._isBlank(line_number - 1) and self._isBlank(line_number + 1)
 
     def check_transition(self, line_number):
         """Transitions should be delimited by a single empty line."""
-        if self.lines[line_number - 2] == "" or self.lines[line_number + 2] == "":
+        if self._isBlank(line_number - 2) or self._isBlank(line_number + 2):
             self.message(
                 line_number + 1,
                 "Transition markers should be bounded by single empty lines.",
@@ -1104,18 +2293,7 @@ class ReStructuredTextChecker(BaseChecker, AnyTextMixin):
         if line_number >= len(self.lines):
             return False
 
-        line = self.lines[line_number]
-        if len(line) < 3:
-            return False
-
-        if line[0] == line[1] == line[2] and line[0] in self.delimiter_characters:
-            if " " in line:
-                # We have a table header.
-                return False
-            else:
-                return True
-
-        return False
+        return bool(self.line_kinds[line_number] & self.LINE_DELIMITER)
 
     def check_section_delimiter(self, line_number):
         """Checks for section delimiter.
@@ -1153,16 +2331,15 @@ class ReStructuredTextChecker(BaseChecker, AnyTextMixin):
         marker.
         """
         human_line_number = line_number + 1
-        current_line = self.lines[line_number]
+        lines = self.lines
+        current_line = lines[line_number]
 
         # Skip test if we have both top and bottom markers and we are
         # at the bottom marker.
-        if line_number > 1 and current_line == self.lines[line_number - 2]:
+        if line_number > 1 and current_line == lines[line_number - 2]:
             return
 
-        if (line_number + 2) < len(self.lines) and current_line == self.lines[
-            line_number + 2
-        ]:
+        if (line_number + 2) < len(lines) and current_line == lines[line_number + 2]:
             # We have both top and bottom markers and we are currently at
             # the top marker.
             top_marker = line_number
@@ -1181,7 +2358,7 @@ class ReStructuredTextChecker(BaseChecker, AnyTextMixin):
 
         # Check underline length for bottom marker,
         # since top marker can be the same as text line.
-        if len(self.lines[bottom_marker]) != len(self.lines[text_line]):
+        if len(lines[bottom_marker]) != len(lines[text_line]):
             self.message(
                 human_line_number,
                 "Section marker has wrong length.",
@@ -1206,15 +2383,14 @@ class ReStructuredTextChecker(BaseChecker, AnyTextMixin):
         if (top_marker - 2) < 0:
             return False
 
-        if self.lines[top_marker - 2].startswith(".. _"):
-            return True
-
-        return False
+        return bool(self.line_kinds[top_marker - 2] & self.LINE_ANCHOR)
 
     def _haveGoodSpacingBeforeSection(self, top_marker):
         """Return True if we have good spacing before the section."""
+        kinds = self.line_kinds
+        blank = self.LINE_BLANK
         if top_marker > 0:
-            if self.lines[top_marker - 1] != "":
+            if not kinds[top_marker - 1] & blank:
                 return False
 
         # If we are on the second line, there is no space for 2 empty lines
@@ -1223,25 +2399,26 @@ class ReStructuredTextChecker(BaseChecker, AnyTextMixin):
             return False
 
         if top_marker > 1:
-            if self.lines[top_marker - 2] != "":
+            if not kinds[top_marker - 2] & blank:
                 return False
 
         if top_marker > 2:
-            if self.lines[top_marker - 3] == "":
+            if kinds[top_marker - 3] & blank:
                 return False
 
         return True
 
     def _haveGoodSpacingAfterSection(self, bottom_marker):
         """Return True if we have good spacing after the section."""
-        lines_count = len(self.lines)
+        kinds = self.line_kinds
+        lines_count = len(kinds)
 
         if bottom_marker < lines_count - 1:
-            if self.lines[bottom_marker + 1] != "":
+            if not kinds[bottom_marker + 1] & self.LINE_BLANK:
                 return False
 
         if bottom_marker < lines_count - 2:
-            if self.lines[bottom_marker + 2] == "":
+            if kinds[bottom_marker + 2] & self.LINE_BLANK:
                 # If the section is followed by 2 empty spaces and then
                 # followed by a section delimiter, the section delimiter
                 # rules will take priority
@@ -0,0 +1,213 @@
+"""
+Syntax validation for JSON documents.
+
+The document is scanned token by token, without creating the Python
+objects for the values, so that the memory used does not depend on the
+size of the document.
+The error messages are the ones of the `json` module.
+"""
+
+__all__ = [
+    "validate_json",
+]
+
+import re
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# Linear matching for the valid strings, the errors are found by
+# `_get_string_error`.
+_STRING = re.compile(
+    r'"[^"\\\x00-\x1f]*(?:\\(?:["\\/bfnrt]|u[0-9a-fA-F]{4})[^"\\\x00-\x1f]*)*"'
+)
+_STRING_CHARS = re.compile(r'[^"\\\x00-\x1f]*')
+_HEX = re.compile(r"[0-9a-fA-F]{4}")
+# Numbers and the literals accepted by `json.loads`.
+_SCALAR = re.compile(
+    r"-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?"
+    r"|true|false|null|NaN|-?Infinity"
+)
+
+# Runs of array items and object members with a string or scalar value,
+# each followed by a comma, validated by a single match.
+# `(?=(...))\1` matches the value without backtracking into it, when
+# the run ends with a value not followed by a comma.
+_ITEMS = re.compile(
+    r"(?:(?=(%s|%s))\1[ \t\n\r]*,[ \t\n\r]*)*" % (_STRING.pattern, _SCALAR.pattern)
+)
+_MEMBERS = re.compile(
+    r"(?:(?=(%s))\1[ \t\n\r]*:[ \t\n\r]*(?=(%s|%s))\2[ \t\n\r]*,[ \t\n\r]*)*"
+    % (_STRING.pattern, _STRING.pattern, _SCALAR.pattern)
+)
+
+# Marker for the arrays in the stack of open containers.
+_ARRAY = object()
+
+
+class _SyntaxError(Exception):
+    """
+    The document is not valid at `position`.
+    """
+
+    def __init__(self, message, position):
+        super().__init__(message)
+        self.message = message
+        self.position = position
+
+
+def _get_string_error(text, start):
+    """
+    Return (message, position) for the invalid string starting at `start`.
+    """
+    position = start + 1
+    while True:
+        position = _STRING_CHARS.match(text, position).end()
+        if position >= len(text):
+            return "Unterminated string starting at", start
+        if text[position] != "\\":
+            # An ending quote is matched by `_STRING`.
+            return "Invalid control character at", position
+
+        escape = text[position + 1 : position + 2]
+        if not escape:
+            return "Unterminated string starting at", start
+        if escape == "u":
+            # The json module also needs the string to continue.
+            if not _HEX.match(text, position + 2) or position + 6 >= len(text):
+                return "Invalid \\uXXXX escape", position + 1
+            position += 6
+        elif escape in '"\\/bfnrt':
+            position += 2
+        else:
+            return "Invalid \\escape", position
+
+
+def _read_string(text, position):
+    """
+    Return the end of the string starting at `position`.
+    """
+    match = _STRING.match(text, position)
+    if match is None:
+        raise _SyntaxError(*_get_string_error(text, position))
+    return match.end()
+
+
+def validate_json(text, duplicate_keys=False, max_depth=0):
+    """
+    Return (problems, error) for the JSON document from `text`.
+
+    `problems` is a list of (position, message) and `error` is the
+    (position, message) of the syntax error or `None`.
+    The document is not checked after the syntax error.
+    With `duplicate_keys`, the keys found multiple times in an object are
+    reported.
+    When `max_depth` is not 0, the containers nested deeper than
+    `max_depth` levels are reported.
+    """
+    problems = []
+    try:
+        _validate(text, problems, duplicate_keys, max_depth)
+    except _SyntaxError as error:
+        return problems, (error.position, error.message)
+    return problems, None
+
+
+def _read_key(text, position, keys, problems):
+    """
+    Return the position of the value for the key at `position`.
+
+    The key is added to `keys`, unless `keys` is `None`.
+    """
+    if text[position : position + 1] != '"':
+        raise _SyntaxError(
+            "Expecting property name enclosed in double quotes", position
+        )
+    end = _read_string(text, position)
+    if keys is not None:
+        key = text[position:end]
+        if "\\" in key:
+            import json
+
+            key = json.dumps(json.loads(key), ensure_ascii=False)
+        if key in keys:
+            problems.append((position, "Duplicate key %s." % (key,)))
+        else:
+            keys.add(key)
+
+    position = _WHITESPACE.match(text, end).end()
+    if text[position : position + 1] != ":":
+        raise _SyntaxError("Expecting ':' delimiter", position)
+    return _WHITESPACE.match(text, position + 1).end()
+
+
+def _validate(text, problems, duplicate_keys, max_depth):
+    """
+    Add the problems of `text` to `problems` and raise `_SyntaxError` for
+    the first syntax error.
+    """
+    if text.startswith("\ufeff"):
+        raise _SyntaxError("Unexpected UTF-8 BOM (decode using utf-8-sig)", 0)
+
+    end = len(text)
+    # The keys of each open object, or `_ARRAY` for the arrays.
+    stack = []
+    position = _WHITESPACE.match(text, 0).end()
+    while True:
+        # A value is expected at `position`.
+        char = text[position : position + 1]
+        if char == "{" or char == "[":
+            if max_depth and len(stack) == max_depth:
+                problems.append(
+                    (position, "Nesting deeper than %d levels." % (max_depth,))
+                )
+            position = _WHITESPACE.match(text, position + 1).end()
+            if char == "{":
+                keys = set() if duplicate_keys else None
+                stack.append(keys)
+                if text[position : position + 1] == "}":
+                    position += 1
+                    stack.pop()
+                else:
+                    if keys is None:
+                        position = _MEMBERS.match(text, position).end()
+                    position = _read_key(text, position, keys, problems)
+                    continue
+            else:
+                stack.append(_ARRAY)
+                if text[position : position + 1] == "]":
+                    position += 1
+                    stack.pop()
+                else:
+                    position = _ITEMS.match(text, position).end()
+                    continue
+        elif char == '"':
+            position = _read_string(text, position)
+        else:
+            match = _SCALAR.match(text, position)
+            if match is None:
+                raise _SyntaxError("Expecting value", position)
+            position = match.end()
+
+        # After a value, close the containers until a new value is expected.
+        while True:
+            position = _WHITESPACE.match(text, position).end()
+            if not stack:
+                if position != end:
+                    raise _SyntaxError("Extra data", position)
+                return
+
+            top = stack[-1]
+            char = text[position : position + 1]
+            if char == ",":
+                position = _WHITESPACE.match(text, position + 1).end()
+                if top is _ARRAY:
+                    position = _ITEMS.match(text, position).end()
+                else:
+                    if top is None:
+                        position = _MEMBERS.match(text, position).end()
+                    position = _read_key(text, position, top, problems)
+                break
+            if char == ("]" if top is _ARRAY else "}"):
+                position += 1
+                stack.pop()
+                continue
+            raise _SyntaxError("Expecting ',' delimiter", position)
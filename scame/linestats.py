@@ -0,0 +1,54 @@
+"""
+Line statistics for large texts, computed using NumPy.
+
+This is a separate module, so that numpy is only imported when a large
+text is checked. Importing it fails when numpy is not installed.
+"""
+
+__all__ = [
+    "get_line_offsets",
+]
+
+import numpy
+
+_NEW_LINE = ord("\n")
+_SPACE = ord(" ")
+_TAB = ord("\t")
+
+
+def _get_offsets(indexes, starts):
+    """
+    Return a dictionary with the offset of the start of each line from
+    `indexes`, for the line numbers starting from 1.
+    """
+    return dict(zip((indexes + 1).tolist(), starts[indexes].tolist()))
+
+
+def get_line_offsets(text, max_length):
+    """
+    Return a dictionary with the lines which fail each of the line
+    checks, for the ASCII `text` with the lines separated by new lines.
+
+    The lines are dictionaries with the offset in `text` of the start of
+    the line, for each line number, starting from 1.
+    """
+    data = numpy.frombuffer(text.encode("ascii"), dtype=numpy.uint8)
+    new_lines = numpy.flatnonzero(data == _NEW_LINE)
+    starts = numpy.concatenate(([0], new_lines + 1))
+    ends = numpy.concatenate((new_lines, [len(data)]))
+    lengths = ends - starts
+
+    long_lines = numpy.flatnonzero(lengths > max_length)
+
+    not_empty = numpy.flatnonzero(lengths)
+    trailing_spaces = not_empty[data[ends[not_empty] - 1] == _SPACE]
+
+    # The number of new lines before a tab is the index of its line.
+    tabs = numpy.flatnonzero(data == _TAB)
+    tab_lines = numpy.unique(numpy.searchsorted(new_lines, tabs))
+
+    return {
+        "check_length": _get_offsets(long_lines, starts),
+        "check_trailing_whitespace": _get_offsets(trailing_spaces, starts),
+        "check_tab": _get_offsets(tab_lines, starts),
+    }
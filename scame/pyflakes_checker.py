@@ -0,0 +1,49 @@
+# Copyright (C) 2009-2013 - Curtis Hovey <sinzui.is at verizon.net>
+# This software is licensed under the MIT license (see the file COPYING).
+"""
+Pyflakes integration.
+
+This is a separate module, so that pyflakes is only imported when
+Python files are checked.
+"""
+
+__all__ = [
+    "PocketLintPyFlakesChecker",
+]
+
+from functools import cached_property
+
+from pyflakes.checker import Checker as PyFlakesChecker
+
+
+class PocketLintPyFlakesChecker(PyFlakesChecker):
+    """PocketLint checker for pyflakes.
+
+    This is here to work around some of the pyflakes problems.
+    """
+
+    def __init__(self, tree, file_path="(none)", text=None):
+        self._text = text
+        super().__init__(tree=tree, filename=file_path)
+
+    @cached_property
+    def text(self):
+        """The lines of the checked text, split only when used."""
+        if self._text:
+            return self._text.split("\n")
+        return self._text
+
+    @property
+    def file_path(self):
+        """Alias for consistency with the rest of pocketlint."""
+        return self.filename
+
+    def report(self, messageClass, *args, **kwargs):
+        """Filter some errors not used in our project."""
+        self.messages.append(messageClass(self.file_path, *args, **kwargs))
+
+    def NAME(self, node):
+        """Locate name. Ignore WindowsErrors."""
+        if node.id == "WindowsError":
+            return
+        return super().NAME(node)
@@ -6,10 +6,13 @@ __all__ = [
     "Reporter",
 ]
 
+import json
 import logging
 import os
 import sys
 
+from scame import __version__
+
 
 class ConsoleHandler(logging.StreamHandler):
     """A handler that logs to console."""
@@ -39,15 +42,29 @@ logger.propagate = False
 logger.addHandler(ConsoleHandler())
 
 
+# SARIF level for each message icon.
+_SARIF_LEVELS = {
+    "error": "error",
+    "info": "warning",
+}
+
+
 class Reporter:
     """Common rules for checkers."""
 
     CONSOLE = object()
     FILE_LINES = object()
     COLLECTOR = object()
+    # A JSON document on each line, for each message.
+    JSON_LINES = object()
+    # A SARIF 2.1.0 document with all the messages.
+    SARIF = object()
 
-    def __init__(self, report_type, treeview=None):
+    def __init__(self, report_type, treeview=None, stream=None):
         self.report_type = report_type
+        # Where the messages are written, default is the standard output.
+        self._stream = stream
+        self._sarif_started = False
         self.file_lines_view = treeview
         if self.file_lines_view is not None:
             self.treestore = self.file_lines_view.get_model()
@@ -57,8 +74,25 @@ class Reporter:
         self.error_only = False
         self.messages = []
 
+    @property
+    def stream(self):
+        """
+        The stream where the messages are written.
+        """
+        if self._stream is None:
+            # Resolved on each call as sys.stdout might be replaced.
+            return sys.stdout
+        return self._stream
+
     def __call__(
-        self, line_no, message, icon=None, base_dir=None, file_name=None, category=None
+        self,
+        line_no,
+        message,
+        icon=None,
+        base_dir=None,
+        file_name=None,
+        category=None,
+        code=None,
     ):
         """Report a message."""
         if self.error_only and icon != "error":
@@ -69,22 +103,103 @@ class Reporter:
             self._message_file_lines(*args)
         elif self.report_type == self.COLLECTOR:
             self._message_collector(*args)
+        elif self.report_type == self.JSON_LINES:
+            self._message_json_lines(*args, code=code)
+        elif self.report_type == self.SARIF:
+            self._message_sarif(*args, code=code)
         else:
             self._message_console(*args)
 
+    def close(self):
+        """
+        Called after all the messages were reported.
+        """
+        if self.report_type == self.SARIF:
+            self._start_sarif()
+            self.stream.write("\n  ]}]\n}\n")
+            self._sarif_started = False
+        if self.report_type in (self.CONSOLE, self.JSON_LINES, self.SARIF):
+            self.stream.flush()
+
     def _message_console(
         self, line_no, message, icon=None, base_dir=None, file_name=None, category=None
     ):
         """Print the messages to the console."""
         self._message_console_group(base_dir, file_name)
-        logger.error(f"    {line_no:>4}:{category}: {message}")
+        self.stream.write(f"    {line_no:>4}:{category}: {message}\n")
 
     def _message_console_group(self, base_dir, file_name):
         """Print the file name is it has not been seen yet."""
         source = (base_dir, file_name)
         if file_name is not None and source != self._last_file_name:
             self._last_file_name = source
-            logger.error("%s" % os.path.join("./", base_dir, file_name))
+            self.stream.write("%s\n" % os.path.join("./", base_dir, file_name))
+
+    def _message_json_lines(
+        self,
+        line_no,
+        message,
+        icon=None,
+        base_dir=None,
+        file_name=None,
+        category=None,
+        code=None,
+    ):
+        """Write the message as a JSON document on a single line."""
+        document = {
+            "file": _get_path(base_dir, file_name),
+            "line": line_no,
+            "category": category,
+            "code": code,
+            "icon": icon,
+            "message": message,
+        }
+        self.stream.write(json.dumps(document) + "\n")
+
+    def _start_sarif(self):
+        """Write the SARIF document up to the list of results."""
+        if self._sarif_started:
+            return
+        self._sarif_started = True
+        self._sarif_separator = "\n"
+        driver = {
+            "name": "scame",
+            "version": __version__,
+            "informationUri": "https://github.com/chevah/scame",
+        }
+        self.stream.write(
+            '{\n  "$schema": "https://json.schemastore.org/sarif-2.1.0.json",\n'
+            '  "version": "2.1.0",\n'
+            '  "runs": [{"tool": {"driver": %s}, "results": [' % (json.dumps(driver),)
+        )
+
+    def _message_sarif(
+        self,
+        line_no,
+        message,
+        icon=None,
+        base_dir=None,
+        file_name=None,
+        category=None,
+        code=None,
+    ):
+        """Write the message as a SARIF result."""
+        self._start_sarif()
+
+        location = {"artifactLocation": {"uri": _get_path(base_dir, file_name)}}
+        if line_no and line_no > 0:
+            location["region"] = {"startLine": line_no}
+        result = {
+            "level": _SARIF_LEVELS.get(icon, "note"),
+            "message": {"text": message},
+            "locations": [{"physicalLocation": location}],
+        }
+        rule_id = "/".join(str(part) for part in (category, code) if part)
+        if rule_id:
+            result["ruleId"] = rule_id
+
+        self.stream.write(self._sarif_separator + "    " + json.dumps(result))
+        self._sarif_separator = ",\n"
 
     def _message_file_lines(
         self, line_no, message, icon=None, base_dir=None, file_name=None, category=None
@@ -102,3 +217,13 @@ class Reporter:
     ):
         self._last_file_name = (base_dir, file_name)
         self.messages.append((line_no, message))
+
+
+def _get_path(base_dir, file_name):
+    """
+    Return the path with forward slashes for the reported file.
+    """
+    if file_name is None:
+        return None
+    path = os.path.join(base_dir or "", file_name)
+    return path.replace(os.sep, "/")
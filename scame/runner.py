@@ -0,0 +1,292 @@
+"""
+Check the files and collect the reported messages.
+
+The messages are taken from the cache when available, and the files are
+checked in this process or in a pool of worker processes.
+"""
+
+__all__ = [
+    "MessageRecorder",
+    "check_file",
+    "get_results",
+    "read_file",
+]
+
+import locale
+import os
+import time
+
+from scame.cache import ResultCache
+from scame.formatcheck import Language, UniversalChecker
+
+
+class MessageRecorder:
+    """
+    A reporter which only records the messages.
+
+    The messages are stored as tuples with the reporter call arguments so
+    that they can be sent between processes and replayed later into the
+    real reporter.
+    """
+
+    def __init__(self):
+        self.messages = []
+
+    def __call__(
+        self,
+        line_no,
+        message,
+        icon=None,
+        base_dir=None,
+        file_name=None,
+        category=None,
+        code=None,
+    ):
+        self.messages.append(
+            (line_no, message, icon, base_dir, file_name, category, code)
+        )
+
+
+# Files larger than this number of bytes are mapped in memory instead of
+# being read.
+_MMAP_SIZE = 1024 * 1024
+# Number of bytes from the start of a file used to detect binary files.
+_BINARY_SAMPLE_SIZE = 8192
+
+
+def read_file(file_path, max_size=0):
+    """
+    Return (text, problem) for the file at `file_path`.
+
+    The text is `None` when the file should not be checked, and `problem`
+    explains why.
+    The file is decoded as done by `open(file_path, "rt")`, but the binary
+    files and the files larger than `max_size` bytes are detected before
+    decoding them.
+    """
+    with open(file_path, "rb") as stream:
+        size = os.fstat(stream.fileno()).st_size
+        if max_size and size > max_size:
+            return None, "File is larger than %d bytes and was not checked." % (
+                max_size,
+            )
+
+        if size < _MMAP_SIZE:
+            content = stream.read()
+        else:
+            import mmap
+
+            content = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            if b"\0" in content[:_BINARY_SAMPLE_SIZE]:
+                return None, "File is binary and was not checked."
+            # Decoded directly from the mapped memory.
+            text = str(content, locale.getpreferredencoding(False))
+        finally:
+            if not isinstance(content, bytes):
+                content.close()
+
+    if "\r" in text:
+        # Universal new lines, as for the text mode.
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text, None
+
+
+def check_file(file_path, options, text=None, timings=None):
+    """
+    Check `text` or the content of `file_path` and return the list of
+    reported messages.
+
+    When `timings` is a dictionary, the seconds spent in each checker are
+    added to it.
+    """
+    language = Language.get_language(file_path, options.extensions)
+    if not UniversalChecker.registry.get_checkers(language):
+        # Not checked, so it is not read.
+        return []
+
+    recorder = MessageRecorder()
+    if text is None:
+        text, problem = read_file(file_path, options.max_file_size)
+        if text is None:
+            recorder(
+                0,
+                problem,
+                icon="info",
+                base_dir=os.path.dirname(file_path),
+                file_name=os.path.basename(file_path),
+                category="text",
+            )
+            return recorder.messages
+
+    checker = UniversalChecker(file_path, text, language, recorder, options=options)
+    checker.timings = timings
+    checker.check()
+    return recorder.messages
+
+
+def _check_file_timed(file_path, options, text=None):
+    """
+    Check the file and return (messages, seconds, checker timings).
+    """
+    timings = {}
+    start = time.perf_counter()
+    messages = check_file(file_path, options, text, timings)
+    return messages, time.perf_counter() - start, timings
+
+
+# Options used by the current worker process.
+_worker_options = None
+# Whether the current worker process returns the timings.
+_worker_timed = False
+
+
+def _initialize_worker(options, timed=False):
+    """
+    Called in each worker process to receive the options only once.
+    """
+    global _worker_options, _worker_timed
+    _worker_options = options
+    _worker_timed = timed
+
+
+def _check_file_in_worker(file_path):
+    """
+    Called in a worker process to check a single file.
+    """
+    if _worker_timed:
+        return _check_file_timed(file_path, _worker_options)
+    return check_file(file_path, _worker_options)
+
+
+def _get_cached_entries(file_paths, cache, buffers, options):
+    """
+    Generate (file_path, cache_key, messages) for each file, with `None`
+    messages for the files which are not in the cache.
+    """
+    changed_lines = options.changed_lines
+    for file_path in file_paths:
+        line_ranges = None
+        if changed_lines is not None:
+            line_ranges = changed_lines.get(os.path.normpath(file_path), ())
+        key = cache.get_key(file_path, buffers.get(file_path), line_ranges)
+        yield file_path, key, cache.get(key)
+
+
+def get_results(file_paths, options, buffers=None, stats=None):
+    """
+    Generate (file_path, messages) for each file from `file_paths`.
+
+    `buffers` is a dictionary with the text to check instead of the
+    file content.
+    When `stats` is a `CheckStats`, each file is added to it.
+
+    Messages are taken from the cache when available, and the other files
+    are checked in this process or in a pool of `options.jobs` processes.
+    The enabled external linters run in the background, while the files
+    are checked.
+    """
+    if buffers is None:
+        buffers = {}
+
+    cache = None
+    if options.cache["enabled"]:
+        cache = ResultCache(
+            options.cache["path"], options, max_size=options.cache["max_size"]
+        )
+
+    if cache is None:
+        entries = ((file_path, None, None) for file_path in file_paths)
+    else:
+        entries = _get_cached_entries(file_paths, cache, buffers, options)
+
+    runner = None
+    linters = _get_external_linters(options)
+    if linters:
+        from scame.external import ExternalRunner
+
+        # All paths are needed to start the external linters.
+        entries = list(entries)
+        runner = ExternalRunner(
+            linters,
+            options,
+            jobs=options.external["jobs"],
+            batch_size=options.external["batch_size"],
+        )
+        runner.start(
+            [
+                file_path
+                for file_path, _, messages in entries
+                if messages is None and file_path not in buffers
+            ]
+        )
+
+    executor = None
+    if options.jobs > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        # All paths are needed to distribute them to the workers.
+        entries = list(entries)
+        executor = ProcessPoolExecutor(
+            max_workers=options.jobs,
+            initializer=_initialize_worker,
+            initargs=(options, stats is not None),
+        )
+        results = executor.map(
+            _check_file_in_worker,
+            [
+                file_path
+                for file_path, _, messages in entries
+                if messages is None and file_path not in buffers
+            ],
+            chunksize=4,
+        )
+
+    try:
+        for file_path, key, messages in entries:
+            seconds = timings = None
+            if messages is None:
+                if executor is None or file_path in buffers:
+                    if stats is None:
+                        messages = check_file(
+                            file_path, options, buffers.get(file_path)
+                        )
+                    else:
+                        messages, seconds, timings = _check_file_timed(
+                            file_path, options, buffers.get(file_path)
+                        )
+                elif stats is None:
+                    messages = next(results)
+                else:
+                    messages, seconds, timings = next(results)
+                if runner is not None and file_path not in buffers:
+                    messages = messages + runner.get_messages(file_path, options)
+                if cache is not None:
+                    cache.set(key, messages)
+            if stats is not None:
+                stats.add_file(file_path, messages, seconds, timings)
+            yield file_path, messages
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        if runner is not None:
+            runner.close()
+        if cache is not None:
+            cache.close()
+
+
+def _get_external_linters(options):
+    """
+    Return the external linters enabled by `options`.
+
+    The module is imported only when a linter is enabled.
+    """
+    if not any(
+        options.get(name)["enabled"] for name in ("shellcheck", "chevah_js_linter")
+    ):
+        return []
+
+    from scame.external import get_enabled_linters
+
+    return get_enabled_linters(options)
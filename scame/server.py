@@ -0,0 +1,265 @@
+"""
+Long running process which checks the files for thin clients.
+
+The server keeps the checkers imported and the options parsed, so that
+editors and hooks don't pay the startup cost for each check.
+
+The requests and responses are sent over a Unix domain socket as JSON
+documents, one for each line.
+
+A request is sent for each connection::
+
+    {
+        "cwd": "/path/to/project",
+        "args": ["--pycodestyle", "src/"],
+        "files": [
+            {"path": "src/a.py"},
+            {"path": "src/b.py", "text": "unsaved buffer content"},
+        ],
+    }
+
+For each file, in the order from the request, the server sends::
+
+    {"path": "src/a.py", "messages": [[line_no, message, icon, ...], ...]}
+
+The response ends with `{"done": true}` or with `{"error": "details"}`.
+"""
+
+__all__ = [
+    "ServerError",
+    "create_server",
+    "get_default_socket_path",
+    "get_results",
+    "serve",
+]
+
+import json
+import os
+import socket
+import socketserver
+import sys
+import tempfile
+
+
+class ServerError(Exception):
+    """
+    The server failed to check the files.
+    """
+
+
+def get_default_socket_path():
+    """
+    Return the path of the socket used when none is configured.
+
+    The socket is in the per-user runtime folder or in a private folder
+    from the temporary folder, which is created by the server.
+    """
+    folder = os.environ.get("XDG_RUNTIME_DIR")
+    if not folder or not os.path.isdir(folder):
+        if hasattr(os, "getuid"):
+            name = "scame-%s" % (os.getuid(),)
+        else:
+            name = "scame"
+        folder = os.path.join(tempfile.gettempdir(), name)
+    return os.path.join(folder, "scame.sock")
+
+
+def _check_owner(path):
+    """
+    Raise `ServerError` when `path` is not owned by the current user or,
+    for a folder, when other users can change it.
+    """
+    if not hasattr(os, "getuid"):
+        return
+    stat = os.stat(path)
+    if stat.st_uid != os.getuid():
+        raise ServerError("%s is not owned by the current user." % (path,))
+    if os.path.isdir(path) and stat.st_mode & 0o022:
+        raise ServerError("%s is writable by other users." % (path,))
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """
+    Handles a single request for the server.
+    """
+
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+            cwd = request["cwd"]
+            args = request["args"]
+            files = request["files"]
+        except (ValueError, KeyError, TypeError) as error:
+            self._send({"error": "Invalid request: %s" % (error,)})
+            return
+
+        initial_cwd = os.getcwd()
+        try:
+            os.chdir(cwd)
+            self._check(args, files)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client is gone.
+            pass
+        except Exception as error:
+            self._send({"error": "%s: %s" % (error.__class__.__name__, error)})
+        finally:
+            os.chdir(initial_cwd)
+
+    def _check(self, args, files):
+        """
+        Check the `files` using the options for command line `args`.
+        """
+        from scame import runner
+
+        options = self._get_options(args)
+        buffers = {entry["path"]: entry["text"] for entry in files if "text" in entry}
+        file_paths = [entry["path"] for entry in files]
+        for file_path, messages in runner.get_results(file_paths, options, buffers):
+            self._send({"path": file_path, "messages": messages})
+        self._send({"done": True})
+
+    def _get_options(self, args):
+        """
+        Return the options for the command line `args`, parsing them only
+        once.
+        """
+        from scame.commandline import parse_command_line
+
+        key = tuple(args)
+        options = self.server.scame_options.get(key)
+        if options is None:
+            try:
+                options = parse_command_line(list(args))
+            except SystemExit:
+                raise ServerError("Invalid arguments: %s" % (" ".join(args),))
+            self.server.scame_options[key] = options
+        return options
+
+    def _send(self, response):
+        self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+def create_server(socket_path):
+    """
+    Return a server listening on `socket_path`.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        raise ServerError("Unix domain sockets are not supported.")
+
+    folder = os.path.dirname(os.path.abspath(socket_path))
+    try:
+        os.makedirs(folder, mode=0o700, exist_ok=True)
+        _check_owner(folder)
+        if os.path.exists(socket_path):
+            _check_owner(socket_path)
+    except OSError as error:
+        raise ServerError("Can't use %s: %s" % (socket_path, error))
+
+    if os.path.exists(socket_path):
+        client = _connect(socket_path)
+        if client is not None:
+            client.close()
+            raise ServerError("A server is already running at %s" % (socket_path,))
+        # Left by a server which was not stopped cleanly.
+        os.remove(socket_path)
+
+    server = socketserver.UnixStreamServer(socket_path, _RequestHandler)
+    # Options parsed for each set of command line arguments.
+    server.scame_options = {}
+    return server
+
+
+def serve(socket_path):
+    """
+    Check the files requested via `socket_path` until interrupted.
+    """
+    server = create_server(socket_path)
+    sys.stderr.write("Serving on %s\n" % (socket_path,))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        try:
+            os.remove(socket_path)
+        except OSError:
+            pass
+
+
+def _connect(socket_path):
+    """
+    Return a socket connected to the server or `None` when no server is
+    running.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(socket_path)
+    except OSError:
+        client.close()
+        return None
+    return client
+
+
+def get_results(socket_path, args, file_paths, buffers=None):
+    """
+    Return a generator of (file_path, messages) for `file_paths` checked
+    by the server using the options for command line `args`.
+
+    `buffers` is a dictionary with the text to check instead of the
+    file content.
+
+    Return `None` when the server is not running.
+    Raise `ServerError` when the socket or its folder is not private to
+    the current user, and from the generator when the server fails.
+    """
+    try:
+        _check_owner(os.path.dirname(os.path.abspath(socket_path)))
+        _check_owner(socket_path)
+    except FileNotFoundError:
+        return None
+    except OSError as error:
+        raise ServerError("Can't use %s: %s" % (socket_path, error))
+
+    client = _connect(socket_path)
+    if client is None:
+        return None
+
+    if buffers is None:
+        buffers = {}
+
+    files = []
+    for file_path in file_paths:
+        entry = {"path": file_path}
+        if file_path in buffers:
+            entry["text"] = buffers[file_path]
+        files.append(entry)
+    request = {"cwd": os.getcwd(), "args": list(args), "files": files}
+
+    try:
+        client.sendall(json.dumps(request).encode("utf-8") + b"\n")
+    except OSError:
+        client.close()
+        return None
+
+    return _read_results(client)
+
+
+def _read_results(client):
+    """
+    Generate the (file_path, messages) sent by the server.
+    """
+    with client, client.makefile("rb") as stream:
+        for line in stream:
+            response = json.loads(line)
+            if "error" in response:
+                raise ServerError(response["error"])
+            if response.get("done"):
+                return
+            messages = [tuple(message) for message in response["messages"]]
+            yield response["path"], messages
+
+    raise ServerError("Connection closed by the server.")
@@ -0,0 +1,100 @@
+"""
+Time spent and messages reported while checking the files.
+"""
+
+__all__ = [
+    "CheckStats",
+    "FileStats",
+]
+
+from collections import namedtuple
+
+# `checkers` is a dictionary with the seconds spent in each checker.
+# `seconds` and `checkers` are `None` when the messages were not produced
+# by this run, as for the cached files.
+FileStats = namedtuple(
+    "FileStats", ["path", "seconds", "checkers", "messages", "cached"]
+)
+
+
+class CheckStats:
+    """
+    Collects the statistics for the checked files.
+
+    Each of the `hooks` is called with the `FileStats` of each file, as
+    soon as the file is checked, so that the values can be sent to other
+    metric systems.
+    """
+
+    def __init__(self, hooks=()):
+        self.hooks = list(hooks)
+        self.files = []
+        # Seconds spent in each checker, for all files.
+        self.checkers = {}
+        # Number of messages for each category.
+        self.categories = {}
+        # Seconds spent by `check_sources`.
+        self.seconds = 0
+
+    def add_file(self, path, messages, seconds=None, checkers=None):
+        """
+        Record the `messages` reported for `path` after `seconds` spent in
+        `checkers`.
+        """
+        stats = FileStats(
+            path=path,
+            seconds=seconds,
+            checkers=checkers,
+            messages=len(messages),
+            cached=seconds is None,
+        )
+        self.files.append(stats)
+        for name, duration in (checkers or {}).items():
+            self.checkers[name] = self.checkers.get(name, 0) + duration
+        for message in messages:
+            # See `MessageRecorder` for the message fields.
+            category = message[5]
+            self.categories[category] = self.categories.get(category, 0) + 1
+
+        for hook in self.hooks:
+            hook(stats)
+
+    def get_slowest(self, count):
+        """
+        Return the `FileStats` of the `count` slowest checked files.
+        """
+        checked = [stats for stats in self.files if not stats.cached]
+        checked.sort(key=lambda stats: stats.seconds, reverse=True)
+        return checked[:count]
+
+    def write_report(self, stream, top=10):
+        """
+        Write to `stream` the `top` slowest files and the time spent in
+        each checker.
+        """
+        cached = sum(1 for stats in self.files if stats.cached)
+        lines = [
+            "Check statistics:",
+            "  %-40s %8.3f" % ("total seconds", self.seconds),
+            "  %-40s %8d" % ("files", len(self.files)),
+            "  %-40s %8d" % ("cached files", cached),
+            "  %-40s %8d" % ("messages", sum(stats.messages for stats in self.files)),
+            "Slowest files (seconds, messages):",
+        ]
+        for stats in self.get_slowest(top):
+            lines.append(
+                "  %-40s %8.3f %8d" % (stats.path, stats.seconds, stats.messages)
+            )
+
+        lines.append("Checkers (seconds):")
+        for name, duration in sorted(
+            self.checkers.items(), key=lambda item: item[1], reverse=True
+        ):
+            lines.append("  %-40s %8.3f" % (name, duration))
+
+        lines.append("Messages by category:")
+        for category, count in sorted(
+            self.categories.items(), key=lambda item: str(item[0])
+        ):
+            lines.append("  %-40s %8d" % (category, count))
+        stream.write("\n".join(lines) + "\n")
@@ -0,0 +1,125 @@
+"""
+Tests for the benchmarks.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from importlib.util import find_spec
+
+from scame.benchmarks.__main__ import _run_isolated, compare_results, run_benchmarks
+from scame.benchmarks.corpus import create_corpus
+from scame.benchmarks.measure import benchmark_checker, get_peak_rss
+from scame.formatcheck import AnyTextChecker, JSONChecker, XMLChecker
+
+
+class TestBenchmarks(unittest.TestCase):
+    """
+    Verify the benchmarks using a small corpus.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.base_dir = tempfile.mkdtemp(prefix="scame_")
+        self.addCleanup(shutil.rmtree, self.base_dir)
+
+    def test_create_corpus(self):
+        """
+        The same files are created for the same scale.
+        """
+        first = create_corpus(os.path.join(self.base_dir, "first"), scale=0.01)
+        second = create_corpus(os.path.join(self.base_dir, "second"), scale=0.01)
+
+        self.assertEqual(20, len(first["python"]))
+        self.assertEqual(5, len(first["text"]))
+        for kind in ("rst", "json", "xml"):
+            self.assertEqual(1, len(first[kind]))
+        with open(first["python"][3]) as stream:
+            content = stream.read()
+        with open(second["python"][3]) as stream:
+            self.assertEqual(content, stream.read())
+
+    def test_benchmark_checker(self):
+        """
+        The generated JSON and XML files are valid.
+        """
+        corpus = create_corpus(self.base_dir, scale=0.01)
+
+        result = benchmark_checker(AnyTextChecker, corpus["text"])
+
+        self.assertEqual(5, result["files"])
+        self.assertGreater(result["lines"], 0)
+        self.assertGreater(result["lines_per_second"], 0)
+        for checker_class, kind in ((JSONChecker, "json"), (XMLChecker, "xml")):
+            result = benchmark_checker(checker_class, corpus[kind])
+            self.assertEqual(1, result["files"])
+
+    @unittest.skipIf(get_peak_rss() is None, "The peak memory is not available.")
+    def test_peak_rss_isolated(self):
+        """
+        The peak memory of a benchmark does not include the memory used
+        before it.
+        """
+        corpus = create_corpus(self.base_dir, scale=0.01)
+        used = b"x" * (200 * 1024 * 1024)
+
+        result = _run_isolated(benchmark_checker, AnyTextChecker, corpus["text"])
+
+        self.assertEqual(5, result["files"])
+        self.assertLess(result["peak_rss"], len(used))
+        self.assertGreater(get_peak_rss(), len(used))
+
+    @unittest.skipUnless(find_spec("pyflakes"), "pyflakes is not installed.")
+    def test_run_benchmarks(self):
+        results = run_benchmarks(self.base_dir, scale=0.01)
+
+        self.assertEqual(
+            [
+                "AnyTextChecker",
+                "JSONChecker",
+                "PythonChecker",
+                "ReStructuredTextChecker",
+                "XMLChecker",
+                "check_sources",
+            ],
+            sorted(results["benchmarks"]),
+        )
+        self.assertEqual(28, results["benchmarks"]["check_sources"]["files"])
+
+    def test_compare_results(self):
+        """
+        Slower rates or more memory than the threshold are regressions.
+        """
+        baseline = {
+            "benchmarks": {
+                "check_sources": {
+                    "files_per_second": 100.0,
+                    "lines_per_second": 1000.0,
+                    "peak_rss": 1000,
+                },
+                "removed": {
+                    "files_per_second": 1.0,
+                    "lines_per_second": 1.0,
+                    "peak_rss": None,
+                },
+            }
+        }
+        results = {
+            "benchmarks": {
+                "check_sources": {
+                    "files_per_second": 85.0,
+                    "lines_per_second": 700.0,
+                    "peak_rss": 1300,
+                },
+            }
+        }
+
+        self.assertEqual(
+            [
+                "check_sources lines_per_second: 700.0, baseline 1000.0",
+                "check_sources peak_rss: 1300, baseline 1000",
+            ],
+            compare_results(results, baseline, 0.2),
+        )
+        self.assertEqual([], compare_results(results, baseline, 0.5))
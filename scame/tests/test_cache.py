@@ -0,0 +1,95 @@
+"""
+Tests for the persistent cache of messages.
+"""
+
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from scame.cache import get_fingerprint
+from scame.formatcheck import ScameOptions
+
+
+class TestGetFingerprint(unittest.TestCase):
+    """
+    Verify the fingerprint of the things changing the messages.
+    """
+
+    def setUp(self):
+        self.base_dir = tempfile.mkdtemp(prefix="scame_")
+        self.addCleanup(shutil.rmtree, self.base_dir)
+
+    def write_file(self, name, content):
+        path = os.path.join(self.base_dir, name)
+        with open(path, "w") as stream:
+            stream.write(content)
+        return path
+
+    def test_pylint_rcfile(self):
+        """
+        The fingerprint is changed by the content of the pylint rcfile.
+        """
+        options = ScameOptions()
+        options.pylint["rcfile"] = self.write_file("pylintrc", "[MASTER]\n")
+        fingerprint = get_fingerprint(options)
+
+        self.write_file("pylintrc", "[MASTER]\njobs=2\n")
+
+        self.assertNotEqual(fingerprint, get_fingerprint(options))
+
+    def test_path_options_rcfile(self):
+        """
+        The pylint rcfile from the path options is also used.
+        """
+        options = ScameOptions()
+        path = self.write_file("pylintrc", "[MASTER]\n")
+        options.path_options = [("b", {"pylint": {"rcfile": path}})]
+        fingerprint = get_fingerprint(options)
+
+        self.write_file("pylintrc", "[MASTER]\njobs=2\n")
+
+        self.assertNotEqual(fingerprint, get_fingerprint(options))
+
+    def test_pycodestyle_config(self):
+        """
+        The fingerprint is changed by the pycodestyle configuration files
+        from the current folder.
+        """
+        options = ScameOptions()
+        initial_dir = os.getcwd()
+        os.chdir(self.base_dir)
+        self.addCleanup(os.chdir, initial_dir)
+        fingerprint = get_fingerprint(options)
+
+        self.write_file("setup.cfg", "[pycodestyle]\nmax-line-length = 100\n")
+
+        self.assertNotEqual(fingerprint, get_fingerprint(options))
+
+    def test_external_linter_program(self):
+        """
+        The fingerprint is changed when the program of an enabled
+        external linter is changed.
+        """
+        path = self.write_file("fake-shellcheck", "#!/bin/sh\n")
+        os.chmod(path, stat.S_IRWXU)
+        options = ScameOptions()
+        options.shellcheck["enabled"] = True
+        options.shellcheck["command"] = "fake-shellcheck"
+
+        with patch.dict(os.environ, {"PATH": self.base_dir}):
+            fingerprint = get_fingerprint(options)
+            self.write_file("fake-shellcheck", "#!/bin/sh\nexit 0\n")
+
+            self.assertNotEqual(fingerprint, get_fingerprint(options))
+
+    def test_unchanged(self):
+        """
+        The fingerprint is the same for the same options and files.
+        """
+        options = ScameOptions()
+        options.pylint["rcfile"] = self.write_file("pylintrc", "[MASTER]\n")
+
+        self.assertEqual(get_fingerprint(options), get_fingerprint(options))
@@ -0,0 +1,195 @@
+"""
+Tests for the external linters.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from scame.external import (
+    ChevahJSLinter,
+    ExternalLinter,
+    ExternalRunner,
+    ShellCheckLinter,
+)
+from scame.formatcheck import Language, ScameOptions
+
+# Reports a problem on the first line of each file.
+_FAKE_LINTER = (
+    "import sys\n"
+    "for path in sys.argv[1:]:\n"
+    "    print('%s:1:1: warning: Bad start. [SC1]' % (path,))\n"
+)
+
+# Reports a problem for the first file and fails for the others.
+_FAILING_LINTER = (
+    "import sys\n"
+    "print('%s:1:1: warning: Bad start. [SC1]' % (sys.argv[1],))\n"
+    "sys.stderr.write('Bad file: %s\\n' % (sys.argv[2],))\n"
+    "sys.exit(2)\n"
+)
+
+
+class FakeLinter(ShellCheckLinter):
+    """
+    A shellcheck output produced by a Python script.
+    """
+
+    def __init__(self, command=None, script=_FAKE_LINTER):
+        self.command = command
+        self.script = script
+
+    def get_command(self, options, paths):
+        if self.command:
+            return [self.command] + list(paths)
+        return [sys.executable, "-c", self.script] + list(paths)
+
+
+class TestExternalRunner(unittest.TestCase):
+    """
+    Verify running the external linters.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.base_dir = tempfile.mkdtemp(prefix="scame_")
+        self.addCleanup(shutil.rmtree, self.base_dir)
+        self.options = ScameOptions()
+
+    def makeFile(self, name, content="echo 1\n"):
+        path = os.path.join(self.base_dir, name)
+        with open(path, "w") as stream:
+            stream.write(content)
+        return path
+
+    def getMessages(self, runner, paths):
+        runner.start(paths)
+        self.addCleanup(runner.close)
+        return [
+            [
+                message[:2] + message[5:]
+                for message in runner.get_messages(path, self.options)
+            ]
+            for path in paths
+        ]
+
+    def test_batches(self):
+        """
+        The files are checked in batches, and only the files of the
+        linter languages are checked.
+        """
+        paths = [self.makeFile("%d.sh" % (index,)) for index in range(3)]
+        other = self.makeFile("other.txt")
+        runner = ExternalRunner([FakeLinter()], self.options, jobs=2, batch_size=2)
+
+        result = self.getMessages(runner, paths + [other])
+
+        self.assertEqual(
+            [
+                [(1, "Bad start.", "shellcheck", "SC1")],
+                [(1, "Bad start.", "shellcheck", "SC1")],
+                [(1, "Bad start.", "shellcheck", "SC1")],
+                [],
+            ],
+            result,
+        )
+
+    def test_suppressed(self):
+        """
+        The lines marked with noqa are not reported.
+        """
+        path = self.makeFile("ignored.sh", "echo 1  # noqa\n")
+        runner = ExternalRunner([FakeLinter()], self.options)
+
+        self.assertEqual([[]], self.getMessages(runner, [path]))
+
+    def test_missing_program(self):
+        """
+        When the program can't be executed, an error is reported for the
+        whole file.
+        """
+        path = self.makeFile("missing.sh")
+        runner = ExternalRunner([FakeLinter("scame-no-such-program")], self.options)
+
+        result = self.getMessages(runner, [path])
+
+        self.assertEqual(1, len(result[0]))
+        line_no, message, category, code = result[0][0]
+        self.assertEqual((0, "shellcheck", None), (line_no, category, code))
+        self.assertTrue(message.startswith("Failed to execute scame-no-such-program"))
+
+    def test_program_failure(self):
+        """
+        When the program exits with a failure code, an error with the
+        program error output is reported for all the files, together with
+        the problems found before the failure.
+        """
+        paths = [self.makeFile("first.sh"), self.makeFile("second.sh")]
+        runner = ExternalRunner(
+            [FakeLinter(script=_FAILING_LINTER)], self.options, batch_size=2
+        )
+
+        result = self.getMessages(runner, paths)
+
+        message = "%s failed with exit code 2: Bad file: %s" % (
+            sys.executable,
+            paths[1],
+        )
+        self.assertEqual(
+            [
+                [
+                    (0, message, "shellcheck", None),
+                    (1, "Bad start.", "shellcheck", "SC1"),
+                ],
+                [(0, message, "shellcheck", None)],
+            ],
+            result,
+        )
+
+    def test_not_started(self):
+        """
+        There are no messages for the files which are not checked.
+        """
+        runner = ExternalRunner([FakeLinter()], self.options)
+        runner.start([])
+
+        self.assertEqual([], runner.get_messages("other.sh", self.options))
+        runner.close()
+
+
+class TestParse(unittest.TestCase):
+    """
+    Verify parsing the output of the external linters.
+    """
+
+    def test_shellcheck(self):
+        output = (
+            "a.sh:3:7: note: Double quote to prevent globbing. [SC2086]\n"
+            "a.sh:9:1: error: Couldn't parse this. [SC1073]\n"
+            "unexpected\n"
+        )
+
+        self.assertEqual(
+            [
+                ("a.sh", 3, "Double quote to prevent globbing.", "SC2086", "info"),
+                ("a.sh", 9, "Couldn't parse this.", "SC1073", "error"),
+            ],
+            list(ShellCheckLinter().parse(output, ScameOptions())),
+        )
+
+    def test_chevah_js_linter(self):
+        """
+        The ignored errors are not reported.
+        """
+        output = 'a.js:2:(0110) Line too long.\na.js:4:(0001) Extra space after "("\n'
+
+        self.assertEqual(
+            [("a.js", 4, 'Extra space after "("', "0001", "info")],
+            list(ChevahJSLinter().parse(output, ScameOptions())),
+        )
+
+    def test_languages(self):
+        self.assertEqual((Language.SH,), ShellCheckLinter.languages)
+        self.assertEqual((), ExternalLinter.languages)
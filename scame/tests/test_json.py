@@ -3,7 +3,12 @@ Tests for JSON files.
 """
 
 
-from scame.formatcheck import JSONChecker
+import json
+import unittest
+from unittest.mock import patch
+
+from scame.formatcheck import JSONChecker, ScameOptions
+from scame.jsonvalidator import validate_json
 from scame.tests import CheckerTestCase
 
 
@@ -110,3 +115,107 @@ class TestJSON(CheckerTestCase):
             self.reporter.messages,
         )
         self.assertEqual(1, self.reporter.call_count)
+
+    def test_duplicate_keys(self):
+        """
+        The keys found multiple times in the same object are reported,
+        when enabled.
+        """
+        content = '{"a": 1,\n "b": {"a": 2},\n "\\u0061": 3}\n'
+        options = ScameOptions()
+        options.json["duplicate_keys"] = True
+        checker = JSONChecker("bogus", content, self.reporter, options)
+
+        checker.check()
+
+        self.assertEqual([(3, 'Duplicate key "a".')], self.reporter.messages)
+
+    def test_max_depth(self):
+        """
+        The first container nested too deep is reported, when enabled.
+        """
+        content = '{"a": [\n[1], {"b": [[2]]}]}\n'
+        options = ScameOptions()
+        options.json["max_depth"] = 3
+        checker = JSONChecker("bogus", content, self.reporter, options)
+
+        checker.check()
+
+        self.assertEqual([(2, "Nesting deeper than 3 levels.")], self.reporter.messages)
+
+    def test_small_document_loaded(self):
+        """
+        The small documents are loaded by the json module, without the
+        validator.
+        """
+        checker = JSONChecker("bogus", '{"a": [1, 2]}\n', self.reporter)
+
+        with patch("scame.jsonvalidator.validate_json") as mock_validate:
+            checker.check()
+
+        mock_validate.assert_not_called()
+        self.assertEqual([], self.reporter.messages)
+
+    def test_large_document_validated(self):
+        """
+        The large documents are only validated, reporting the same errors
+        as the json module.
+        """
+        content = '{\n1: "something"}\n'
+        checker = JSONChecker("bogus", content, self.reporter)
+
+        with patch("scame.formatcheck.JSON_VALIDATOR_MIN_SIZE", 0):
+            checker.check()
+
+        self.assertEqual(
+            [
+                (
+                    2,
+                    "Expecting property name enclosed in double quotes: "
+                    "line 2 column 1 (char 2)",
+                )
+            ],
+            self.reporter.messages,
+        )
+
+
+class TestValidateJSON(unittest.TestCase):
+    """
+    Verify the JSON syntax validation.
+    """
+
+    def assertSameError(self, text):
+        """
+        The error for `text` is the same as for the json module.
+        """
+        with self.assertRaises(json.JSONDecodeError) as context:
+            json.loads(text)
+
+        self.assertEqual(
+            ([], (context.exception.pos, context.exception.msg)),
+            validate_json(text),
+        )
+
+    def test_valid(self):
+        text = json.dumps(
+            {"a": [1, -2.5e3, "s\u00e9\n", None, True, {}], "b": {"c": []}}
+        )
+
+        self.assertEqual(([], None), validate_json(text))
+        self.assertEqual(([], None), validate_json(" [NaN, -Infinity] "))
+
+    def test_errors(self):
+        for text in (
+            "",
+            "[1, 2",
+            '{"a" 1}',
+            '{"a": 1 "b": 2}',
+            '["a\\x"]',
+            '["a\\u12"]',
+            '["a\tb"]',
+            '["abc',
+            "[1, ]",
+            "[] []",
+            "\ufeff[]",
+        ):
+            self.assertSameError(text)
@@ -0,0 +1,513 @@
+"""
+Tests for the command line entry point.
+"""
+
+import json
+import os
+import re
+import shutil
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from scame import formatcheck
+from scame.__main__ import (
+    _get_all_files,
+    _get_source_files,
+    _PathFilter,
+    _report_startup_profile,
+    check_sources,
+    parse_command_line,
+)
+from scame.formatcheck import Language
+from scame.runner import check_file
+from scame.stats import CheckStats
+from scame.tests import Bunch, CheckerTestCase
+
+
+class TestCheckSources(CheckerTestCase):
+    """
+    Verify running the checkers for files from the disk.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.base_dir = tempfile.mkdtemp(prefix="scame_")
+        self.addCleanup(shutil.rmtree, self.base_dir)
+
+    def write_source(self, name, content):
+        """
+        Create a file in the temporary folder and return its path.
+        """
+        path = os.path.join(self.base_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as stream:
+            stream.write(content)
+        return path
+
+    def write_sources(self):
+        """
+        Create a tree with files having problems.
+        """
+        self.write_source("a.txt", "trailing \n")
+        self.write_source("b/c.txt", "good\n")
+        self.write_source("b/d.py", "import os\n")
+        self.write_source("e.rst", "tab\there \n")
+
+    def test_serial(self):
+        """
+        All files from a directory are checked.
+        """
+        self.write_sources()
+        options = parse_command_line(["--no-cache", self.base_dir])
+
+        result = check_sources(options, self.reporter)
+
+        self.assertEqual(4, result)
+        # Files are walked in the order returned by the filesystem.
+        self.assertEqual(
+            [
+                (1, "1 'os' imported but unused"),
+                (1, "Line contains a tab character."),
+                (1, "Line has trailing whitespace."),
+                (1, "Line has trailing whitespace."),
+            ],
+            sorted(self.reporter.messages),
+        )
+
+    def test_jobs_same_result(self):
+        """
+        Checking using multiple processes reports the same messages, in
+        the same order as the serial check.
+        """
+        self.write_sources()
+        for index in range(20):
+            self.write_source("many/%02d.txt" % index, "%d \n" % index)
+        options = parse_command_line(["--no-cache", self.base_dir])
+        check_sources(options, self.reporter)
+        serial_messages = self.reporter.messages
+        self.reporter.messages = []
+
+        options = parse_command_line(["--no-cache", "--jobs", "3", self.base_dir])
+        result = check_sources(options, self.reporter)
+
+        self.assertEqual(24, result)
+        self.assertEqual(serial_messages, self.reporter.messages)
+
+    def test_parse_jobs(self):
+        """
+        The number of jobs can be a number or `auto`.
+        """
+        self.assertEqual(1, parse_command_line([]).jobs)
+        self.assertEqual(4, parse_command_line(["-j", "4"]).jobs)
+        self.assertLessEqual(1, parse_command_line(["-j", "auto"]).jobs)
+
+        with self.assertRaises(SystemExit):
+            parse_command_line(["-j", "0"])
+
+    def test_cache(self):
+        """
+        The messages for unchanged files are taken from the cache.
+        """
+        path = self.write_source("a.txt", "trailing \n")
+        cache_dir = os.path.join(self.base_dir, "cache")
+        options = parse_command_line(["--cache-dir", cache_dir, path])
+        check_sources(options, self.reporter)
+        self.assertEqual([(1, "Line has trailing whitespace.")], self.reporter.messages)
+        self.reporter.messages = []
+
+        with patch("scame.runner.check_file") as mock_check_file:
+            result = check_sources(options, self.reporter)
+
+        self.assertEqual(1, result)
+        self.assertEqual([(1, "Line has trailing whitespace.")], self.reporter.messages)
+        mock_check_file.assert_not_called()
+
+        # A changed file is checked again.
+        self.write_source("a.txt", "trailing \nother \n")
+        self.reporter.messages = []
+        with patch(
+            "scame.runner.check_file", side_effect=check_file
+        ) as mock_check_file:
+            result = check_sources(options, self.reporter)
+
+        self.assertEqual(2, result)
+        mock_check_file.assert_called_once_with(path, options, None)
+
+    def test_cache_not_checked(self):
+        """
+        The files from the cache folder are not checked, also when the
+        folder is not ignored by the VCS.
+        """
+        # The cached messages are a line longer than 80 characters.
+        self.write_source("a.txt", "trailing \n" * 3)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self.base_dir)
+        for args in ([], ["--no-vcs"]):
+            options = parse_command_line(args + ["."])
+
+            for _ in range(2):
+                self.reporter.messages = []
+                result = check_sources(options, self.reporter)
+
+                self.assertEqual(3, result)
+                self.assertEqual(
+                    [
+                        (1, "Line has trailing whitespace."),
+                        (2, "Line has trailing whitespace."),
+                        (3, "Line has trailing whitespace."),
+                    ],
+                    self.reporter.messages,
+                )
+            self.assertTrue(os.listdir(".scame_cache"))
+
+    def test_report_format(self):
+        """
+        The messages can be reported as JSON Lines, with the progress
+        written to stderr to keep the output valid.
+        """
+        self.write_source("a.txt", "trailing \n")
+        options = parse_command_line(
+            ["--no-cache", "--progress", "--format", "jsonl", self.base_dir]
+        )
+        self.assertEqual("console", parse_command_line([]).report_format)
+        with self.assertRaises(SystemExit):
+            parse_command_line(["--format", "xml"])
+
+        with patch("sys.stdout", new_callable=StringIO) as stdout, patch(
+            "sys.stderr", new_callable=StringIO
+        ) as stderr:
+            result = check_sources(options)
+
+        self.assertEqual(1, result)
+        self.assertEqual(".", stderr.getvalue())
+        self.assertEqual(
+            {
+                "file": os.path.join(self.base_dir, "a.txt"),
+                "line": 1,
+                "category": "text",
+                "code": None,
+                "icon": "info",
+                "message": "Line has trailing whitespace.",
+            },
+            json.loads(stdout.getvalue()),
+        )
+
+    def test_cache_options(self):
+        """
+        The cache is enabled by default for the command line.
+        """
+        options = parse_command_line([])
+        self.assertTrue(options.cache["enabled"])
+        self.assertEqual(".scame_cache", options.cache["path"])
+
+        options = parse_command_line(["--no-cache", "--cache-dir", "other"])
+        self.assertFalse(options.cache["enabled"])
+        self.assertEqual("other", options.cache["path"])
+
+    def test_checker_import_time(self):
+        """
+        The time spent importing a checker is recorded when it is first
+        used and reported with --profile-startup.
+        """
+        self.assertFalse(parse_command_line([]).profile_startup)
+        options = parse_command_line(["--no-cache", "--profile-startup", self.base_dir])
+        self.assertTrue(options.profile_startup)
+        self.write_source("b/d.py", "import os\n")
+
+        with patch.dict(formatcheck.import_times, clear=True):
+            check_sources(options, self.reporter)
+            self.assertIn("pyflakes", formatcheck.import_times)
+
+            stream = StringIO()
+            _report_startup_profile(0.1, 0.0, 0.5, stream=stream)
+
+        output = stream.getvalue()
+        self.assertIn("startup and scame import    0.100", output)
+        self.assertIn("    pyflakes", output)
+        self.assertIn("  checking", output)
+
+    def test_stats(self):
+        """
+        The time spent for each file and checker is collected in this
+        process and in the --jobs processes, and reported with --stats.
+        """
+        self.assertFalse(parse_command_line([]).stats["enabled"])
+        self.write_source("a.txt", "trailing \n")
+        self.write_source("b/c.rst", "good\n")
+        for args, shown in (
+            (["--stats"], 2),
+            (["--stats", "--stats-top", "1", "-j", "2"], 1),
+        ):
+            options = parse_command_line(["--no-cache"] + args + [self.base_dir])
+            stats = CheckStats()
+
+            with patch("sys.stderr", new_callable=StringIO) as stderr:
+                check_sources(options, self.reporter, stats)
+
+            self.assertEqual(2, len(stats.files))
+            self.assertEqual(
+                ["AnyTextChecker", "ReStructuredTextChecker"], sorted(stats.checkers)
+            )
+            self.assertEqual({"text": 1}, stats.categories)
+            output = stderr.getvalue()
+            self.assertIn("Slowest files (seconds, messages):", output)
+            self.assertIn("  AnyTextChecker", output)
+            self.assertEqual(shown, output.count(self.base_dir))
+
+    def test_stats_disabled(self):
+        """
+        Without --stats nothing is reported, but the statistics are still
+        collected when requested.
+        """
+        path = self.write_source("a.txt", "trailing \n")
+        options = parse_command_line(["--no-cache", self.base_dir])
+        stats = CheckStats()
+
+        with patch("sys.stderr", new_callable=StringIO) as stderr:
+            check_sources(options, self.reporter, stats)
+
+        self.assertEqual("", stderr.getvalue())
+        self.assertEqual([path], [file_stats.path for file_stats in stats.files])
+
+
+class TestSourceFiles(CheckerTestCase):
+    """
+    Verify selecting the files to check.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.base_dir = tempfile.mkdtemp(prefix="scame_")
+        self.addCleanup(shutil.rmtree, self.base_dir)
+        for name in (
+            "a.py",
+            "b/c.txt",
+            "b/d/e.rst",
+            "b/f.ico",
+            "vendor/g.py",
+            "vendor/h/i.py",
+            "vendored.py",
+        ):
+            path = os.path.join(self.base_dir, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as stream:
+                stream.write("content\n")
+
+    def test_get_all_files(self):
+        """
+        The files are generated in the same order as os.walk.
+        """
+        expected = [
+            os.path.join(root, name)
+            for root, _, names in os.walk(self.base_dir)
+            for name in names
+        ]
+
+        self.assertEqual(expected, list(_get_all_files(self.base_dir)))
+
+    def test_excluded_folders_not_visited(self):
+        """
+        The folders matched by the exclude regex are not visited.
+        """
+        vendor = os.path.join(self.base_dir, "vendor")
+        path_filter = _PathFilter([], [re.escape(vendor) + "/"])
+        visited = []
+        scandir = os.scandir
+
+        def record_scandir(path):
+            visited.append(path)
+            return scandir(path)
+
+        with patch("os.scandir", side_effect=record_scandir):
+            paths = list(_get_all_files(self.base_dir, path_filter))
+
+        self.assertNotIn(vendor, visited)
+        self.assertIn(os.path.join(self.base_dir, "vendored.py"), paths)
+        self.assertNotIn(os.path.join(vendor, "g.py"), paths)
+
+    def test_path_filter(self):
+        """
+        Regex depending on the text after the match don't exclude the
+        folders.
+        """
+        path_filter = _PathFilter(["src", "other/"], ["src/build", ".*\\.log$"])
+
+        self.assertTrue(path_filter.is_excluded("src/build/a.py"))
+        self.assertTrue(path_filter.is_excluded("src/a.log"))
+        self.assertTrue(path_filter.is_excluded("third/a.py"))
+        self.assertFalse(path_filter.is_excluded("src/a.py"))
+        self.assertFalse(path_filter.is_excluded("other/a.py"))
+        self.assertTrue(path_filter.is_excluded_folder("src/build"))
+        self.assertFalse(path_filter.is_excluded_folder("src/a.log"))
+        self.assertFalse(path_filter.is_excluded_folder("src"))
+
+    def test_path_filter_not_combined(self):
+        """
+        Patterns which can not be combined are used separately.
+        """
+        path_filter = _PathFilter([], ["(?P<name>a)", "(?P<name>b)"])
+
+        self.assertTrue(path_filter.is_excluded("a.py"))
+        self.assertTrue(path_filter.is_excluded("b.py"))
+        self.assertFalse(path_filter.is_excluded("c.py"))
+
+    def test_get_source_files(self):
+        """
+        The excluded and not editable files are not checked.
+        """
+        options = parse_command_line(
+            ["--no-vcs", "--exclude", ".*vendor/", self.base_dir]
+        )
+
+        self.assertEqual(
+            [
+                os.path.join(self.base_dir, name)
+                for name in ("a.py", "b/c.txt", "b/d/e.rst", "vendored.py")
+            ],
+            sorted(_get_source_files(options)),
+        )
+
+    def test_get_source_files_diff_branch(self):
+        """
+        The changed folders, as the git submodules, and the deleted files
+        are not checked.
+        """
+        options = parse_command_line(["--diff-branch", "master"])
+        vcs = Bunch(
+            get_changed_files=lambda ref: [
+                ("m", os.path.join(self.base_dir, "a.py")),
+                ("m", os.path.join(self.base_dir, "b")),
+                ("d", os.path.join(self.base_dir, "removed.py")),
+                ("a", os.path.join(self.base_dir, "vendored.py")),
+            ]
+        )
+
+        self.assertEqual(
+            [
+                os.path.join(self.base_dir, "a.py"),
+                os.path.join(self.base_dir, "vendored.py"),
+            ],
+            list(_get_source_files(options, vcs)),
+        )
+
+
+class TestDiffLines(CheckerTestCase):
+    """
+    Verify checking only the lines changed from a branch.
+    """
+
+    def test_options(self):
+        self.assertTrue(parse_command_line([]).scope["vcs"])
+        self.assertFalse(parse_command_line(["--no-vcs"]).scope["vcs"])
+        self.assertFalse(parse_command_line([]).diff_lines)
+        options = parse_command_line(["--diff-branch", "master", "--diff-lines"])
+        self.assertTrue(options.diff_lines)
+        self.assertIsNone(options.changed_lines)
+        with self.assertRaises(SystemExit):
+            parse_command_line(["--diff-lines"])
+
+    def test_check_sources(self):
+        """
+        Only the files with changes are checked and only the problems on
+        the changed lines are reported.
+        """
+        base_dir = tempfile.mkdtemp(prefix="scame_")
+        self.addCleanup(shutil.rmtree, base_dir)
+        path = os.path.join(base_dir, "a.txt")
+        with open(path, "w") as stream:
+            stream.write("old \nnew \nold \n")
+        with open(os.path.join(base_dir, "b.txt"), "w") as stream:
+            stream.write("old \n")
+        options = parse_command_line(
+            ["--no-cache", "--diff-branch", "master", "--diff-lines"]
+        )
+        # Already known, so git is not called.
+        options.changed_lines = {path: ((2, 2),)}
+
+        result = check_sources(options, self.reporter)
+
+        self.assertEqual(1, result)
+        self.assertEqual([(2, "Line has trailing whitespace.")], self.reporter.messages)
+
+
+class TestLazyAttributes(CheckerTestCase):
+    """
+    Verify the module attributes which are resolved on first use.
+    """
+
+    def test_find_exec(self):
+        """
+        Executables are searched in PATH without running a process.
+        """
+        self.assertIsNone(formatcheck.find_exec(["scame-no-such-program"]))
+        if os.name == "posix":
+            self.assertEqual(
+                shutil.which("sh"), formatcheck.find_exec(["scame-no-such", "sh"])
+            )
+
+    def test_lazy_attributes(self):
+        """
+        The checkers helpers are available from `formatcheck`.
+        """
+        from scame.pyflakes_checker import PocketLintPyFlakesChecker
+        from scame.xmlparser import FastParser
+
+        self.assertIs(PocketLintPyFlakesChecker, formatcheck.PocketLintPyFlakesChecker)
+        self.assertIs(FastParser, formatcheck.FastParser)
+        self.assertEqual(formatcheck.find_exec(["gjs", "seed"]), formatcheck.JS)
+        with self.assertRaises(AttributeError):
+            formatcheck.NoSuchAttribute
+
+
+class TestLanguage(CheckerTestCase):
+    """
+    Verify finding the language of the files.
+    """
+
+    def test_get_language(self):
+        self.assertIs(Language.PYTHON, Language.get_language("a/b.py"))
+        self.assertIs(Language.PYTHON, Language.get_language("b.PY"))
+        self.assertIs(Language.PYTHON, Language.get_language("b.tac"))
+        self.assertIs(Language.ZPT, Language.get_language("b.pt"))
+        self.assertIs(Language.TEXT, Language.get_language("Makefile"))
+        self.assertIs(Language.TEXT, Language.get_language("b.txt.gz"))
+        self.assertIs(Language.XML, Language.get_language("b.svg"))
+        self.assertIsNone(Language.get_language("b.ico"))
+        self.assertFalse(Language.is_editable("b.ico"))
+        self.assertTrue(Language.is_editable("b.rst"))
+
+    def test_system_mime_types_once(self):
+        """
+        The system mime types are used once for each unknown extension.
+        """
+        with patch(
+            "mimetypes.guess_type", return_value=("text/x-c", None)
+        ) as guess_type:
+            self.assertIs(Language.TEXT, Language.get_language("a.scame-test"))
+            self.assertIs(Language.TEXT, Language.get_language("b.scame-test"))
+            self.assertIs(Language.PYTHON, Language.get_language("b.py"))
+
+        guess_type.assert_called_once_with("file.scame-test")
+        del Language._extension_language[".scame-test"]
+
+    def test_extensions(self):
+        """
+        The extensions from the options replace the default ones.
+        """
+        extensions = {".tpl": "text/html", ".txt": "text/x-rst"}
+
+        self.assertIs(Language.HTML, Language.get_language("a.tpl", extensions))
+        self.assertIs(
+            Language.RESTRUCTUREDTEXT, Language.get_language("a.TXT", extensions)
+        )
+        self.assertIs(Language.TEXT, Language.get_language("a.txt"))
+
+        options = parse_command_line(
+            ["--extension", ".tpl=text/html", "--extension", ".x=text/x-python"]
+        )
+        self.assertEqual(
+            {".tpl": "text/html", ".x": "text/x-python"}, options.extensions
+        )
+        with self.assertRaises(SystemExit):
+            parse_command_line(["--extension", "tpl"])
@@ -1,10 +1,17 @@
 # Copyright (C) 2011-2013 - Curtis Hovey <sinzui.is at verizon.net>
 # This software is licensed under the MIT license (see the file COPYING).
 
-
+import unittest
+from importlib.util import find_spec
 from tempfile import NamedTemporaryFile
 
-from scame.formatcheck import PythonChecker, ScameOptions
+from scame.formatcheck import (
+    PythonChecker,
+    PythonSource,
+    ScameOptions,
+    _get_options_key,
+    _get_pycodestyle_style,
+)
 from scame.tests import CheckerTestCase
 from scame.tests.test_text import AnyTextMixin
 
@@ -123,6 +130,60 @@ class TestPython(CheckerTestCase):
         self.assertEqual(expected, self.reporter.messages)
 
 
+class TestPythonSource(CheckerTestCase):
+    """Verify the source shared by the python checkers."""
+
+    def test_parsed_once(self):
+        source = PythonSource("no/such/file.py", good_python)
+
+        self.assertEqual(good_python.splitlines(True), source.lines)
+        self.assertIs(source.lines, source.lines)
+        self.assertIs(source.tree, source.tree)
+        self.assertEqual("ClassDef", source.tree.body[0].__class__.__name__)
+
+    def test_syntax_error(self):
+        source = PythonSource("bogus", bad_syntax_python)
+
+        with self.assertRaises(SyntaxError):
+            source.tree
+
+    def test_encoding_error(self):
+        """
+        A source which can't be encoded is a syntax error.
+        """
+        source = PythonSource("bogus", 'a = 1\nb = "\u272a"\n')
+
+        with self.assertRaises(SyntaxError) as context:
+            source.tree
+
+        self.assertEqual(2, context.exception.lineno)
+        self.assertEqual(
+            "character not valid for the ascii encoding", context.exception.msg
+        )
+
+        with self.assertRaises(SyntaxError):
+            PythonSource("bogus", "a = 1\n", "no-such-encoding").tree
+
+    @unittest.skipUnless(find_spec("astroid"), "astroid is not installed.")
+    def test_get_astroid(self):
+        source = PythonSource("no/such/file.py", good_python)
+
+        tree = source.get_astroid("file")
+
+        self.assertEqual("file", tree.name)
+        self.assertEqual(["example"], [node.name for node in tree.body])
+        self.assertIs(tree, source.get_astroid("file"))
+
+    def test_shared_by_checker(self):
+        checker = PythonChecker("bogus", good_python, self.reporter)
+
+        checker.check()
+
+        # Released after the check.
+        self.assertIsNone(checker._source)
+        self.assertEqual(good_python, checker.source.text)
+
+
 class TestPyflakes(CheckerTestCase):
     """Verify pyflakes integration."""
 
@@ -296,6 +357,27 @@ class TestPyCodeStyle(CheckerTestCase):
             [(1, "E501 line too long (70 > 59 characters)")], self.reporter.messages
         )
 
+    def test_style_reused(self):
+        """
+        The style guide is created once for the same options.
+        """
+        options = {"max_line_length": 78, "hang_closing": False}
+        style = _get_pycodestyle_style(_get_options_key(options))
+
+        self.assertIs(style, _get_pycodestyle_style(_get_options_key(dict(options))))
+        options["hang_closing"] = True
+        self.assertIsNot(style, _get_pycodestyle_style(_get_options_key(options)))
+
+
+class TestOptionsKey(unittest.TestCase):
+    """Verify the key of the options of a checker."""
+
+    def test_hashable(self):
+        key = _get_options_key({"enable": ["W0611"], "rcfile": None})
+
+        self.assertEqual((("enable", ("W0611",)), ("rcfile", None)), key)
+        self.assertEqual(hash(key), hash(_get_options_key(dict(key))))
+
 
 class TestText(CheckerTestCase, AnyTextMixin):
     """Verify text integration."""
@@ -361,3 +443,51 @@ class TestText(CheckerTestCase, AnyTextMixin):
         checker.check_text()
 
         self.assertEqual([], self.reporter.messages)
+
+    def test_encoding_not_changed_line(self):
+        """
+        The encoding is found even when the first lines are not changed,
+        and only the changed lines are reported.
+        """
+        content = '# -*- coding: utf-8 -*-\nx = "\u272a"\ny = "\u272a"\n'
+        options = ScameOptions()
+        options.changed_lines = {"bogus.py": ((3, 3),)}
+        checker = PythonChecker("bogus.py", content, self.reporter, options)
+
+        checker.check_text()
+
+        self.assertEqual("utf-8", checker.encoding)
+        self.assertEqual([], self.reporter.messages)
+        self.assertIsNotNone(checker.source.tree)
+
+    def test_encoding_not_changed_line_all_lines(self):
+        """
+        The encoding is found outside the changed lines also when some
+        checks are called for all the lines.
+        """
+        content = '# -*- coding: utf-8 -*-\nx = "\u272a"\ny = "\u272a"\n'
+        options = ScameOptions()
+        options.regex_line = [("x\\sy", "Multi-line.")]
+        options.changed_lines = {"bogus.py": ((3, 3),)}
+        checker = PythonChecker("bogus.py", content, self.reporter, options)
+
+        checker.check_text()
+
+        self.assertEqual("utf-8", checker.encoding)
+        self.assertEqual([], self.reporter.messages)
+
+    def test_not_ascii_changed_line(self):
+        """
+        Without an encoding, the non-ascii characters are only reported
+        for the changed lines.
+        """
+        content = 'x = "\u272a"\ny = "\u272a"\n'
+        options = ScameOptions()
+        options.changed_lines = {"bogus.py": ((2, 2),)}
+        checker = PythonChecker("bogus.py", content, self.reporter, options)
+
+        checker.check_text()
+
+        self.assertEqual(
+            [(2, "Non-ascii characer at position 6.")], self.reporter.messages
+        )
@@ -1,7 +1,10 @@
 # Copyright (C) 2012-2013 - Curtis Hovey <sinzui.is at verizon.net>
 # This software is licensed under the MIT license (see the file COPYING).
 
+import json
+from io import StringIO
 
+from scame.reporter import Reporter
 from scame.tests import CheckerTestCase
 
 
@@ -21,3 +24,102 @@ class ReporterTestCase(CheckerTestCase):
         self.assertIs(0, self.reporter.call_count)
         self.reporter(9, "test", icon="error", base_dir="./lib", file_name="eg.py")
         self.assertIs(1, self.reporter.call_count)
+
+    def test_console(self):
+        stream = StringIO()
+        reporter = Reporter(Reporter.CONSOLE, stream=stream)
+        reporter(12, "test", icon="info", base_dir="lib", file_name="eg.py")
+        reporter(13, "other", icon="error", base_dir="lib", file_name="eg.py")
+        reporter.close()
+        self.assertEqual(
+            "./lib/eg.py\n      12:None: test\n      13:None: other\n",
+            stream.getvalue(),
+        )
+
+    def test_json_lines(self):
+        stream = StringIO()
+        reporter = Reporter(Reporter.JSON_LINES, stream=stream)
+        reporter(
+            12,
+            "test",
+            icon="info",
+            base_dir="lib",
+            file_name="eg.py",
+            category="bandit",
+            code="B101",
+        )
+        reporter(1, "other", icon="error", base_dir="", file_name="eg.py")
+        reporter.close()
+        self.assertEqual(
+            [
+                {
+                    "file": "lib/eg.py",
+                    "line": 12,
+                    "category": "bandit",
+                    "code": "B101",
+                    "icon": "info",
+                    "message": "test",
+                },
+                {
+                    "file": "eg.py",
+                    "line": 1,
+                    "category": None,
+                    "code": None,
+                    "icon": "error",
+                    "message": "other",
+                },
+            ],
+            [json.loads(line) for line in stream.getvalue().splitlines()],
+        )
+
+    def test_sarif(self):
+        stream = StringIO()
+        reporter = Reporter(Reporter.SARIF, stream=stream)
+        reporter(
+            12,
+            "test",
+            icon="info",
+            base_dir="lib",
+            file_name="eg.py",
+            category="bandit",
+            code="B101",
+        )
+        reporter(0, "other", icon="error", base_dir="", file_name="eg.py")
+        reporter.close()
+
+        document = json.loads(stream.getvalue())
+        self.assertEqual("2.1.0", document["version"])
+        run = document["runs"][0]
+        self.assertEqual("scame", run["tool"]["driver"]["name"])
+        self.assertEqual(
+            [
+                {
+                    "level": "warning",
+                    "message": {"text": "test"},
+                    "locations": [
+                        {
+                            "physicalLocation": {
+                                "artifactLocation": {"uri": "lib/eg.py"},
+                                "region": {"startLine": 12},
+                            }
+                        }
+                    ],
+                    "ruleId": "bandit/B101",
+                },
+                {
+                    "level": "error",
+                    "message": {"text": "other"},
+                    "locations": [
+                        {"physicalLocation": {"artifactLocation": {"uri": "eg.py"}}}
+                    ],
+                },
+            ],
+            run["results"],
+        )
+
+    def test_sarif_empty(self):
+        stream = StringIO()
+        reporter = Reporter(Reporter.SARIF, stream=stream)
+        reporter.close()
+        document = json.loads(stream.getvalue())
+        self.assertEqual([], document["runs"][0]["results"])
@@ -149,6 +149,44 @@ class TestReStructuredTextChecker(CheckerTestCase):
         self.assertEqual(expected, self.reporter.messages)
         self.assertEqual(1, self.reporter.call_count)
 
+    def test_line_kinds(self):
+        """
+        Each line is classified once.
+        """
+        content = "Title\n=====\n\n.. _link:\n\n----\n=== ===\ntext\n"
+        checker = ReStructuredTextChecker("bogus", content, self.reporter)
+
+        self.assertEqual(
+            [
+                0,
+                checker.LINE_DELIMITER | checker.LINE_MARKER,
+                checker.LINE_BLANK,
+                checker.LINE_ANCHOR,
+                checker.LINE_BLANK,
+                checker.LINE_DELIMITER | checker.LINE_MARKER,
+                0,
+                0,
+            ],
+            list(checker.line_kinds),
+        )
+
+    def test_transition_at_end(self):
+        """
+        A marker at the end of the file is not a transition.
+        """
+        content = "some\n\n----\n"
+        checker = ReStructuredTextChecker("bogus", content, self.reporter)
+
+        checker.check()
+
+        self.assertEqual(
+            [
+                (3, "Section marker has wrong length."),
+                (3, "Section should be divided by 2 empty lines."),
+            ],
+            self.reporter.messages,
+        )
+
     def test_isTransition_good(self):
         content = "\n" "----\n" "\n"
         checker = ReStructuredTextChecker("bogus", content, self.reporter)
@@ -0,0 +1,89 @@
+"""
+Tests for checking the files and collecting the messages.
+"""
+
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from scame.__main__ import parse_command_line
+from scame.runner import check_file, read_file
+from scame.tests import CheckerTestCase
+
+
+class TestReadFile(CheckerTestCase):
+    """
+    Verify reading the files to check.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.base_dir = tempfile.mkdtemp(prefix="scame_")
+        self.addCleanup(shutil.rmtree, self.base_dir)
+
+    def write_bytes(self, name, content):
+        path = os.path.join(self.base_dir, name)
+        with open(path, "wb") as stream:
+            stream.write(content)
+        return path
+
+    def test_text_mode(self):
+        """
+        The content is the same as when read in text mode, also when
+        mapped in memory.
+        """
+        content = "first\r\nsecond\rthird\n\u021b\n".encode("utf-8")
+        path = self.write_bytes("a.txt", content)
+        with open(path, "rt") as stream:
+            expected = stream.read()
+
+        self.assertEqual((expected, None), read_file(path))
+        with patch("scame.runner._MMAP_SIZE", 4):
+            self.assertEqual((expected, None), read_file(path))
+        self.assertEqual(("", None), read_file(self.write_bytes("b.txt", b"")))
+
+    def test_not_checked(self):
+        """
+        Binary files and files larger than the maximum size are not
+        checked, and a message is reported.
+        """
+        binary = self.write_bytes("a.txt", b"text\0\xff\xfe")
+        large = self.write_bytes("b.txt", b"trailing \n" * 10)
+
+        self.assertEqual(
+            (None, "File is binary and was not checked."), read_file(binary)
+        )
+        self.assertEqual(
+            (None, "File is larger than 99 bytes and was not checked."),
+            read_file(large, max_size=99),
+        )
+        self.assertEqual(10, read_file(large, max_size=100)[0].count("\n"))
+
+        options = parse_command_line(["--max-file-size", "99"])
+        self.assertEqual(99, options.max_file_size)
+        self.assertEqual(
+            [
+                (
+                    0,
+                    "File is larger than 99 bytes and was not checked.",
+                    "info",
+                    self.base_dir,
+                    "b.txt",
+                    "text",
+                    None,
+                )
+            ],
+            check_file(large, options),
+        )
+
+    def test_log_not_read(self):
+        """
+        The log files are not checked, so they are not read.
+        """
+        path = self.write_bytes("a.log", b"trailing \n")
+
+        with patch("scame.runner.read_file") as mock_read_file:
+            self.assertEqual([], check_file(path, parse_command_line([])))
+
+        mock_read_file.assert_not_called()
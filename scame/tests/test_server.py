@@ -0,0 +1,244 @@
+"""
+Tests for the server used by `scame --client`.
+"""
+
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import unittest
+from io import StringIO
+from unittest.mock import patch
+
+from scame.__main__ import check_sources, parse_command_line
+from scame.server import (
+    ServerError,
+    create_server,
+    get_default_socket_path,
+    get_results,
+)
+from scame.tests import CheckerTestCase
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "Requires Unix domain sockets.")
+class TestServer(CheckerTestCase):
+    """
+    Verify checking the files using the server.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.base_dir = tempfile.mkdtemp(prefix="scame_")
+        self.addCleanup(shutil.rmtree, self.base_dir)
+        socket_dir = tempfile.mkdtemp(prefix="scame_socket_")
+        self.addCleanup(shutil.rmtree, socket_dir)
+        self.socket_path = os.path.join(socket_dir, "scame.sock")
+        with open(os.path.join(self.base_dir, "a.txt"), "w") as stream:
+            stream.write("trailing \n")
+
+    def start_server(self):
+        """
+        Start a server in a thread, stopped at the end of the test.
+        """
+        server = create_server(self.socket_path)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+
+        def stop():
+            server.shutdown()
+            thread.join()
+            server.server_close()
+
+        self.addCleanup(stop)
+        return server
+
+    def get_options(self, *args):
+        """
+        Return the client options for checking the temporary folder.
+        """
+        return parse_command_line(
+            ["--client", "--socket", self.socket_path, "--no-cache"]
+            + list(args)
+            + [self.base_dir]
+        )
+
+    def test_client(self):
+        """
+        The files are checked by the server.
+        """
+        server = self.start_server()
+        options = self.get_options()
+
+        result = check_sources(options, self.reporter)
+
+        self.assertEqual(1, result)
+        self.assertEqual([(1, "Line has trailing whitespace.")], self.reporter.messages)
+        self.assertEqual(1, len(server.scame_options))
+        # The options are parsed only once.
+        check_sources(options, self.reporter)
+        self.assertEqual(1, len(server.scame_options))
+
+    def test_client_buffer(self):
+        """
+        The unsaved text is sent to the server instead of reading the file.
+        """
+        self.start_server()
+        path = os.path.join(self.base_dir, "a.txt")
+
+        results = get_results(self.socket_path, [], [path], {path: "good\nb \n"})
+
+        self.assertEqual(
+            [
+                (
+                    path,
+                    [
+                        (
+                            2,
+                            "Line has trailing whitespace.",
+                            "info",
+                            self.base_dir,
+                            "a.txt",
+                            "text",
+                            None,
+                        )
+                    ],
+                )
+            ],
+            list(results),
+        )
+
+    def test_client_stdin(self):
+        """
+        The text from the standard input is checked by the server.
+        """
+        self.start_server()
+        options = parse_command_line(
+            ["--client", "--socket", self.socket_path, "--stdin-filename", "b.py"]
+        )
+
+        with patch("sys.stdin", StringIO("import os\n")):
+            result = check_sources(options, self.reporter)
+
+        self.assertEqual(1, result)
+        self.assertEqual([(1, "1 'os' imported but unused")], self.reporter.messages)
+
+    def test_client_error(self):
+        """
+        Errors from the server are raised in the client.
+        """
+        self.start_server()
+
+        results = get_results(
+            self.socket_path, [], [os.path.join(self.base_dir, "missing.txt")]
+        )
+
+        with self.assertRaises(ServerError) as context:
+            list(results)
+        self.assertIn("FileNotFoundError", str(context.exception))
+
+    def test_no_server(self):
+        """
+        The files are checked in this process when the server is not
+        running.
+        """
+        options = self.get_options()
+
+        result = check_sources(options, self.reporter)
+
+        self.assertEqual(1, result)
+        self.assertEqual([(1, "Line has trailing whitespace.")], self.reporter.messages)
+
+    def test_already_running(self):
+        """
+        Only one server can listen on a socket, but the socket left by a
+        stopped server is replaced.
+        """
+        self.start_server()
+
+        with self.assertRaises(ServerError):
+            create_server(self.socket_path)
+
+        other_path = os.path.join(os.path.dirname(self.socket_path), "other.sock")
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(other_path)
+        stale.close()
+        server = create_server(other_path)
+        server.server_close()
+
+    def test_default_socket_path(self):
+        """
+        The default socket is in the runtime folder of the user, or in a
+        folder for the user from the temporary folder.
+        """
+        with patch.dict(os.environ, {"XDG_RUNTIME_DIR": self.base_dir}):
+            self.assertEqual(
+                os.path.join(self.base_dir, "scame.sock"), get_default_socket_path()
+            )
+
+        with patch.dict(os.environ, {"XDG_RUNTIME_DIR": ""}):
+            self.assertEqual(
+                os.path.join(
+                    tempfile.gettempdir(), "scame-%s" % (os.getuid(),), "scame.sock"
+                ),
+                get_default_socket_path(),
+            )
+
+    def test_private_folder(self):
+        """
+        The server creates the socket folder, accessible only by the
+        current user.
+        """
+        self.socket_path = os.path.join(self.base_dir, "private", "scame.sock")
+
+        self.start_server()
+
+        mode = os.stat(os.path.dirname(self.socket_path)).st_mode
+        self.assertEqual(0o700, mode & 0o777)
+
+    def test_shared_folder(self):
+        """
+        A socket from a folder writable by other users is not used.
+        """
+        os.chmod(os.path.dirname(self.socket_path), 0o777)
+
+        with self.assertRaises(ServerError):
+            create_server(self.socket_path)
+        with self.assertRaises(ServerError):
+            get_results(self.socket_path, [], [])
+
+    def test_server_failure(self):
+        """
+        When the server fails, the files not yet checked are checked in
+        this process.
+        """
+        with open(os.path.join(self.base_dir, "b.txt"), "w") as stream:
+            stream.write("trailing \n")
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(self.socket_path)
+        listener.listen(1)
+        self.addCleanup(listener.close)
+
+        def serve_one_file():
+            connection, _ = listener.accept()
+            with connection, connection.makefile("rwb") as stream:
+                request = json.loads(stream.readline())
+                path = request["files"][0]["path"]
+                stream.write(json.dumps({"path": path, "messages": []}).encode())
+                stream.write(b"\n")
+
+        thread = threading.Thread(target=serve_one_file)
+        thread.start()
+        self.addCleanup(thread.join)
+        options = self.get_options()
+
+        with patch("sys.stderr", new_callable=StringIO) as stderr:
+            result = check_sources(options, self.reporter)
+
+        self.assertEqual(1, result)
+        self.assertEqual([(1, "Line has trailing whitespace.")], self.reporter.messages)
+        self.assertEqual(
+            "Checking without the server: Connection closed by the server.\n",
+            stderr.getvalue(),
+        )
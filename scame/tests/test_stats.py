@@ -0,0 +1,59 @@
+"""
+Tests for the check statistics.
+"""
+
+import unittest
+from io import StringIO
+
+from scame.stats import CheckStats, FileStats
+
+
+class TestCheckStats(unittest.TestCase):
+    """
+    Verify collecting and reporting the statistics.
+    """
+
+    def test_add_file(self):
+        """
+        The hooks are called for each file and the checker times and
+        message categories are summed.
+        """
+        calls = []
+        stats = CheckStats(hooks=[calls.append])
+        message = (1, "Bad.", "info", "base", "a.py", "pyflakes", None)
+
+        stats.add_file("a.py", [message, message], 0.5, {"pyflakes": 0.25})
+        stats.add_file("b.py", [message], 0.25, {"pyflakes": 0.5, "bandit": 0.1})
+        stats.add_file("c.py", [])
+
+        self.assertEqual(
+            [
+                FileStats("a.py", 0.5, {"pyflakes": 0.25}, 2, False),
+                FileStats("b.py", 0.25, {"pyflakes": 0.5, "bandit": 0.1}, 1, False),
+                FileStats("c.py", None, None, 0, True),
+            ],
+            calls,
+        )
+        self.assertEqual(calls, stats.files)
+        self.assertEqual({"pyflakes": 0.75, "bandit": 0.1}, stats.checkers)
+        self.assertEqual({"pyflakes": 3}, stats.categories)
+        self.assertEqual(["a.py"], [item.path for item in stats.get_slowest(1)])
+
+    def test_write_report(self):
+        """
+        The slowest files are written first and the cached files are not
+        included.
+        """
+        stats = CheckStats()
+        stats.add_file("fast.py", [], 0.1, {"pyflakes": 0.1})
+        stats.add_file("slow.py", [], 2.0, {"pylint": 1.9, "pyflakes": 0.1})
+        stats.add_file("cached.py", [])
+        stream = StringIO()
+
+        stats.write_report(stream, top=5)
+
+        output = stream.getvalue()
+        self.assertIn("  cached files", output)
+        self.assertNotIn("cached.py", output)
+        self.assertLess(output.index("slow.py"), output.index("fast.py"))
+        self.assertLess(output.index("  pylint"), output.index("  pyflakes"))
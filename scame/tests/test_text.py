@@ -2,8 +2,27 @@
 # This software is licensed under the MIT license (see the file COPYING).
 
 
+import unittest
+from importlib.metadata import EntryPoint
+from importlib.util import find_spec
+from unittest.mock import patch
+
 from scame.__main__ import parse_command_line
-from scame.formatcheck import AnyTextChecker
+from scame.formatcheck import (
+    AnyTextChecker,
+    BaseChecker,
+    CheckerRegistry,
+    Language,
+    PathOptions,
+    RegexLineMatcher,
+    ScameOptions,
+    SQLChecker,
+    TextBuffer,
+    UniversalChecker,
+    XMLChecker,
+    get_regex_line_matcher,
+    is_in_ranges,
+)
 from scame.tests import Bunch, CheckerTestCase
 
 
@@ -86,6 +105,360 @@ class AnyTextMixin:
             self.reporter.messages,
         )
 
+    def test_regex_line_multiple_rules(self):
+        """
+        All the rules matching a line are reported, in the order of
+        the rules.
+        """
+        options = Bunch(
+            max_line_length=80,
+            hang_closing=True,
+            regex_line=[
+                ("sign", "Literal."),
+                ("^other", "Start."),
+                ("[mM]arker", "Regex."),
+            ],
+        )
+
+        self.create_and_check(
+            "bogus", "with Marker here\nother sign\nsign marker", options
+        )
+
+        self.assertEqual(
+            [
+                (1, "Line contains flagged text. Regex."),
+                (2, "Line contains flagged text. Literal."),
+                (2, "Line contains flagged text. Start."),
+                (3, "Line contains flagged text. Literal."),
+                (3, "Line contains flagged text. Regex."),
+            ],
+            self.reporter.messages,
+        )
+
+    def test_regex_line_multi_line_rule(self):
+        """
+        Rules which might match a new line are only matched inside a line.
+        """
+        options = Bunch(
+            max_line_length=80,
+            hang_closing=True,
+            regex_line=[("one\\s+two", "Space."), ("^$", "Empty.")],
+        )
+
+        self.create_and_check("bogus", "one\ntwo\n\none  two", options)
+
+        self.assertEqual(
+            [
+                (3, "Line contains flagged text. Empty."),
+                (4, "Line contains flagged text. Space."),
+            ],
+            self.reporter.messages,
+        )
+
+
+class TestRegexLineMatcher(unittest.TestCase):
+    """
+    Unit tests for compiling the `regex_line` rules.
+    """
+
+    def test_line_rules(self):
+        """
+        Rules matching inside a line are searched over the whole text.
+        """
+        matcher = RegexLineMatcher(
+            [("literal", "1"), ("start.*", "2"), ("^other", "3"), ("[ab]", "4")]
+        )
+
+        self.assertIsNone(matcher.prefilter)
+        self.assertEqual("literal", matcher.candidates[0])
+        self.assertEqual("start.*", matcher.candidates[1].pattern)
+        self.assertEqual("(?:^other)|(?:[ab])", matcher.candidates[2].pattern)
+
+    def test_multi_line_rules(self):
+        """
+        When rules might match across lines, each line is searched using
+        a combined regex.
+        """
+        matcher = RegexLineMatcher([("literal", "1"), ("a\\sb", "2")])
+
+        self.assertIsNone(matcher.candidates)
+        self.assertEqual("(?:literal)|(?:a\\sb)", matcher.prefilter.pattern)
+
+    def test_get_regex_line_matcher(self):
+        """
+        The rules are compiled once.
+        """
+        rules = (("literal", "1"),)
+
+        self.assertIs(get_regex_line_matcher(rules), get_regex_line_matcher(rules))
+
+
+class TestTextBuffer(CheckerTestCase):
+    """
+    Verify the text shared by the checks.
+    """
+
+    def test_new_lines(self):
+        buffer = TextBuffer("first\nsecond\n\nlast")
+
+        self.assertEqual(4, buffer.total_lines)
+        self.assertNotIn("lines", buffer.__dict__)
+        self.assertEqual([0, 6, 13, 14], list(buffer.line_starts))
+        self.assertEqual(
+            ["", "first", "second", "", "last", ""],
+            [buffer.get_line(line_no) for line_no in range(6)],
+        )
+        self.assertEqual(1, buffer.get_line_no(0))
+        self.assertEqual(1, buffer.get_line_no(5))
+        self.assertEqual(2, buffer.get_line_no(6))
+        self.assertEqual(4, buffer.get_line_no(16))
+        self.assertEqual(["first", "second", "", "last"], buffer.lines)
+
+    def test_other_line_breaks(self):
+        """
+        The lines and the total use all the line breaks, and the line
+        offsets only the new lines.
+        """
+        buffer = TextBuffer("first\r\nsecond\x0cthird\n")
+
+        self.assertTrue(buffer.has_other_line_breaks)
+        self.assertEqual(3, buffer.total_lines)
+        self.assertEqual(["first", "second", "third"], buffer.lines)
+        self.assertEqual("second\x0cthird", buffer.get_line(2))
+        self.assertEqual("", buffer.get_line(3))
+
+    def test_get_suppressions(self):
+        """
+        The markers are found once for the whole text.
+        """
+        buffer = TextBuffer(
+            "all  # noqa\n"
+            "none\n"
+            "one  # noqa:text\n"
+            "codes  # noqa:bandit=B101,B102  # noqa:pylint\n"
+            "empty  # noqa:\n"
+            "extra  # noqa:pyflakes:ignore\n"
+            "both  # noqa:text  # noqa\n"
+        )
+
+        suppressions = buffer.get_suppressions("  # noqa")
+
+        self.assertEqual(
+            {
+                1: None,
+                3: {"text": None},
+                4: {"bandit": {"B101", "B102"}, "pylint": None},
+                5: {},
+                6: {"pyflakes": None},
+                7: None,
+            },
+            suppressions,
+        )
+        self.assertIs(suppressions, buffer.get_suppressions("  # noqa"))
+
+    def test_shared(self):
+        """
+        The buffer is shared by the checker for the language.
+        """
+        checker = UniversalChecker("bogus.txt", "Text \n", reporter=self.reporter)
+        buffer = checker.buffer
+
+        with patch("scame.formatcheck.TextBuffer", side_effect=AssertionError):
+            checker.check()
+
+        self.assertEqual([(1, "Line has trailing whitespace.")], self.reporter.messages)
+        self.assertEqual(["Text "], buffer.lines)
+
+
+class TestSuppression(CheckerTestCase):
+    """
+    Verify ignoring the messages using the noqa marker.
+    """
+
+    def test_is_suppressed(self):
+        checker = AnyTextChecker(
+            "bogus",
+            "all  # noqa\n"
+            "category  # noqa:text\n"
+            "codes  # noqa:bandit=B101,B102\n",
+            self.reporter,
+        )
+
+        self.assertTrue(checker.is_suppressed(1))
+        self.assertTrue(checker.is_suppressed(1, "text"))
+        self.assertFalse(checker.is_suppressed(2))
+        self.assertTrue(checker.is_suppressed(2, "text", "any"))
+        self.assertFalse(checker.is_suppressed(2, "textual"))
+        self.assertTrue(checker.is_suppressed(3, "bandit", "B102"))
+        self.assertFalse(checker.is_suppressed(3, "bandit", "B103"))
+        self.assertFalse(checker.is_suppressed(3, "bandit"))
+        self.assertFalse(checker.is_suppressed(4))
+
+    def test_message(self):
+        """
+        The suppressed messages are not reported.
+        """
+        checker = AnyTextChecker(
+            "bogus", "one  # noqa:pylint=C0103\n" * 2, self.reporter
+        )
+
+        checker.message(1, "Ignored.", category="pylint", code="C0103")
+        checker.message(2, "Reported.", category="pylint", code="W0611")
+
+        self.assertEqual([(2, "Reported.")], self.reporter.messages)
+
+
+class TabChecker(BaseChecker):
+    """
+    A checker from another distribution.
+    """
+
+    def check(self):
+        if "\t" in self.text:
+            self.message(0, "Tab found.", category="tab")
+
+
+class TestCheckerRegistry(CheckerTestCase):
+    """
+    Verify selecting the checkers for each language.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.registry = CheckerRegistry()
+        # No entry points from the installed distributions.
+        self.registry._entry_points = {}
+
+    def check(self, file_name, text, language):
+        checker = UniversalChecker(file_name, text, language, self.reporter)
+        checker.registry = self.registry
+        checker.check()
+
+    def test_builtin(self):
+        self.assertEqual((SQLChecker,), self.registry.get_checkers(Language.SQL))
+        self.assertEqual((XMLChecker,), self.registry.get_checkers(Language.ZCML))
+        self.assertEqual((AnyTextChecker,), self.registry.get_checkers(Language.SH))
+        self.assertEqual((), self.registry.get_checkers(Language.LOG))
+
+    def test_resolved_once(self):
+        checkers = self.registry.get_checkers(Language.PYTHON)
+
+        self.assertIs(checkers, self.registry.get_checkers(Language.PYTHON))
+
+    def test_sql(self):
+        """
+        SQL files may have long lines, but no tabs.
+        """
+        self.check("bogus.sql", "SELECT 1" + " " * 80 + "1;\n\tFROM a\n", Language.SQL)
+
+        self.assertEqual(
+            [(2, "Line contains a tab character.")], self.reporter.messages
+        )
+
+    def test_register(self):
+        """
+        The registered checkers are run after the built-in checkers.
+        """
+        self.registry.get_checkers(Language.SH)
+        self.registry.register(Language.SH, TabChecker)
+
+        self.check("bogus.sh", "\techo 1 \n", Language.SH)
+
+        self.assertEqual(
+            [(1, "Line has trailing whitespace."), (0, "Tab found.")],
+            self.reporter.messages,
+        )
+        self.assertEqual(
+            ["sh=scame.tests.test_text:TabChecker"], self.registry.get_fingerprint()
+        )
+
+    def test_entry_points(self):
+        """
+        The checkers from the entry points are imported at first use and
+        the entry points for unknown languages are ignored.
+        """
+        self.registry._entry_points = None
+        found = [
+            EntryPoint("log", "scame.tests.test_text:TabChecker", "scame.checkers"),
+            EntryPoint("other", "no_such_module:Checker", "scame.checkers"),
+        ]
+
+        with patch("importlib.metadata.entry_points", return_value=found):
+            self.assertEqual(
+                ["log=scame.tests.test_text:TabChecker"],
+                self.registry.get_fingerprint(),
+            )
+
+        self.assertEqual((TabChecker,), self.registry.get_checkers(Language.LOG))
+
+
+class TestPathOptions(CheckerTestCase):
+    """
+    Verify the options changed for some paths.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.options = ScameOptions()
+        self.options.max_line_length = 80
+        self.options.path_options = [
+            ("legacy", {"max_line_length": 120}),
+            ("legacy/new/**", {"max_line_length": 90}),
+            ("**/tests/test_*.py", {"pylint": {"enabled": True}}),
+        ]
+
+    def test_no_path(self):
+        """
+        Without a path, the global options are used.
+        """
+        self.assertEqual(80, self.options.get("max_line_length"))
+        self.assertEqual(80, self.options.get("max_line_length", "other/a.py"))
+
+    def test_prefix(self):
+        """
+        The options of a folder are used for all the files inside it and
+        the later rules replace the values of the earlier ones.
+        """
+        self.assertEqual(120, self.options.get("max_line_length", "legacy/a.py"))
+        self.assertEqual(120, self.options.get("max_line_length", "./legacy/b/a.py"))
+        self.assertEqual(90, self.options.get("max_line_length", "legacy/new/a.py"))
+        self.assertEqual(
+            89, self.options.get("pycodestyle", "legacy/new/a.py")["max_line_length"]
+        )
+        self.assertEqual(79, self.options.get("pycodestyle")["max_line_length"])
+
+    def test_glob(self):
+        """
+        `**` matches any number of folders and the dictionary options are
+        updated with the values of the rule.
+        """
+        for path in ("tests/test_a.py", "src/sub/tests/test_a.py"):
+            pylint = self.options.get("pylint", path)
+            self.assertTrue(pylint["enabled"])
+            self.assertEqual([], pylint["disable"])
+        self.assertFalse(self.options.get("pylint", "tests/helper.py")["enabled"])
+        self.assertFalse(self.options.get("pylint")["enabled"])
+
+    def test_resolved_once(self):
+        """
+        The options are shared by the paths matching the same rules.
+        """
+        first = self.options.get("pycodestyle", "legacy/a.py")
+
+        self.assertIs(first, self.options.get("pycodestyle", "legacy/other/b.py"))
+
+    def test_unknown_option(self):
+        with self.assertRaises(ValueError):
+            PathOptions([("src", {"no_such_option": 1})], self.options)
+
+    def test_check_length(self):
+        checker = AnyTextChecker(
+            "legacy/a.txt", "a" * 100 + "\n", self.reporter, self.options
+        )
+        checker.check()
+
+        self.assertEqual([], self.reporter.messages)
+
 
 class TestText(CheckerTestCase, AnyTextMixin):
     """Verify text integration."""
@@ -154,3 +527,130 @@ class TestText(CheckerTestCase, AnyTextMixin):
         expected = [(1, "File does not ends with an empty line.")]
         self.assertEqual(expected, self.reporter.messages)
         self.assertEqual(1, self.reporter.call_count)
+
+    def test_check_text_lines_order(self):
+        """
+        Messages are reported in the order of the lines, and for the same
+        line in the order of the checks.
+        """
+        content = "ok\n" + "a" * 90 + " \n>>>>>>> other\nend \n"
+        checker = AnyTextChecker("bogus", content, self.reporter)
+
+        result = checker.check_text_lines(
+            checker.check_trailing_whitespace,
+            checker.check_length,
+            checker.check_conflicts,
+        )
+
+        self.assertEqual(4, result)
+        self.assertEqual(
+            [
+                (2, "Line has trailing whitespace."),
+                (2, "Line exceeds 80 characters."),
+                (3, "File has conflicts."),
+                (4, "Line has trailing whitespace."),
+            ],
+            self.reporter.messages,
+        )
+
+    def test_check_text_lines_other_line_breaks(self):
+        """
+        Lines are split using the same line breaks as str.splitlines().
+        """
+        content = "first \r\n<<<<<<< second\r\nlast "
+        checker = AnyTextChecker("bogus", content, self.reporter)
+
+        result = checker.check_text_lines(
+            checker.check_trailing_whitespace,
+            checker.check_conflicts,
+        )
+
+        self.assertEqual(3, result)
+        self.assertEqual(
+            [
+                (1, "Line has trailing whitespace."),
+                (2, "File has conflicts."),
+                (3, "Line has trailing whitespace."),
+            ],
+            self.reporter.messages,
+        )
+
+    def test_check_text_lines_changed_lines(self):
+        """
+        Only the changed lines are checked and reported, but the messages
+        for the whole file are always reported.
+        """
+        content = "one \ntwo \nthree\tx \nfour \r\n"
+        options = ScameOptions()
+        options.changed_lines = {"some/file.txt": ((2, 3), (8, 9))}
+        checker = AnyTextChecker("some/./file.txt", content, self.reporter, options)
+        calls = []
+
+        def check_all(line_no, line):
+            calls.append(line_no)
+
+        checker.check_text_lines(check_all)
+        checker.check()
+
+        self.assertEqual([2, 3], calls)
+        self.assertEqual(
+            [
+                (2, "Line has trailing whitespace."),
+                (3, "Line has trailing whitespace."),
+                (0, "File contains Windows new lines."),
+            ],
+            self.reporter.messages,
+        )
+
+    @unittest.skipUnless(find_spec("numpy"), "numpy is not installed.")
+    def test_check_text_lines_numpy(self):
+        """
+        For large texts, the lines failing the line checks are found
+        using NumPy, with the same messages.
+        """
+        content = (
+            "ok\n" + "a" * 90 + " \n\tone\r\n<<<<<<< two\r\n"
+            "http://" + "b" * 80 + "\nlast\t "
+        )
+        AnyTextChecker("bogus", content, self.reporter).check()
+        expected = self.reporter.messages
+        self.reporter.messages = []
+
+        with patch("scame.formatcheck.NUMPY_MIN_SIZE", 0):
+            checker = AnyTextChecker("bogus", content, self.reporter)
+            checker.check()
+
+        self.assertIsNotNone(checker.line_statistics)
+        self.assertEqual(expected, self.reporter.messages)
+
+    def test_check_text_lines_numpy_not_ascii(self):
+        """
+        The candidates are used for the texts which are not ASCII.
+        """
+        with patch("scame.formatcheck.NUMPY_MIN_SIZE", 0):
+            checker = AnyTextChecker("bogus", "\xe9 \n", self.reporter)
+            checker.check()
+
+        self.assertIsNone(checker.line_statistics)
+        self.assertEqual([(1, "Line has trailing whitespace.")], self.reporter.messages)
+
+    def test_not_changed_file(self):
+        """
+        No line is checked for a file without changed lines.
+        """
+        options = ScameOptions()
+        options.changed_lines = {}
+        checker = AnyTextChecker("bogus", "trailing \n", self.reporter, options)
+
+        checker.check()
+
+        self.assertEqual([], self.reporter.messages)
+
+    def test_is_in_ranges(self):
+        ranges = ((2, 3), (5, 5), (10, 20))
+
+        self.assertEqual(
+            [2, 3, 5] + list(range(10, 21)),
+            [line_no for line_no in range(25) if is_in_ranges(ranges, line_no)],
+        )
+        self.assertFalse(is_in_ranges((), 1))
@@ -0,0 +1,158 @@
+"""
+Tests for the files known by the version control system.
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+from scame.vcs import GitRepository, VCSError, parse_diff_lines, parse_name_status
+
+
+class TestParse(unittest.TestCase):
+    """
+    Verify parsing the output of git.
+    """
+
+    def test_parse_diff_lines(self):
+        """
+        The ranges of new lines are read from the hunk headers.
+        """
+        diff = (
+            "diff --git a/changed.py b/changed.py\n"
+            "--- a/changed.py\n"
+            "+++ b/changed.py\n"
+            "@@ -1 +1 @@\n"
+            "-old\n"
+            "+new\n"
+            "@@ -20,0 +21,3 @@ def other():\n"
+            "+a\n"
+            "@@ -30,2 +33,0 @@\n"
+            "-removed\n"
+            "--- a/deleted.py\n"
+            "+++ /dev/null\n"
+            "@@ -1,2 +0,0 @@\n"
+            "--- /dev/null\n"
+            "+++ b/sub/new.txt\n"
+            "@@ -0,0 +1,2 @@\n"
+        )
+
+        self.assertEqual(
+            {
+                "changed.py": ((1, 1), (21, 23)),
+                os.path.join("sub", "new.txt"): ((1, 2),),
+            },
+            parse_diff_lines(diff),
+        )
+
+    def test_parse_name_status(self):
+        """
+        The new path is used for the renamed and copied files.
+        """
+        output = "M\0changed.py\0D\0deleted.py\0R100\0old.py\0new.py\0A\0added.py\0"
+
+        self.assertEqual(
+            [
+                ("m", "changed.py"),
+                ("d", "deleted.py"),
+                ("r100", "new.py"),
+                ("a", "added.py"),
+            ],
+            parse_name_status(output),
+        )
+        self.assertEqual([], parse_name_status(""))
+
+
+@unittest.skipUnless(shutil.which("git"), "git is not installed.")
+class TestGitRepository(unittest.TestCase):
+    """
+    Verify getting the files from a git repository.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.base_dir = tempfile.mkdtemp(prefix="scame_")
+        self.addCleanup(shutil.rmtree, self.base_dir)
+        initial_cwd = os.getcwd()
+        os.chdir(self.base_dir)
+        self.addCleanup(os.chdir, initial_cwd)
+        self.git("init", "-q")
+
+    def git(self, *args):
+        subprocess.run(
+            ("git", "-c", "user.name=scame", "-c", "user.email=scame@example.com")
+            + args,
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+
+    def write(self, path, content="content\n"):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as stream:
+            stream.write(content)
+
+    def test_list_files(self):
+        """
+        The ignored files and the files removed from the disk are not
+        listed.
+        """
+        self.write(".gitignore", "venv/\n*.log\n")
+        self.write("src/a.py")
+        self.write("src/sub/b.txt")
+        self.write("src/removed.txt")
+        self.write("srcother/c.txt")
+        self.write("venv/lib/d.py")
+        self.write("src/e.log")
+        self.git("add", ".")
+        self.git("commit", "-q", "-m", "initial")
+        os.remove(os.path.join("src", "removed.txt"))
+        # Not yet tracked, but not ignored.
+        self.write("src/new.txt")
+        repository = GitRepository()
+
+        self.assertEqual(
+            [
+                os.path.join("src", "a.py"),
+                os.path.join("src", "new.txt"),
+                os.path.join("src", "sub", "b.txt"),
+            ],
+            repository.list_files("src"),
+        )
+        self.assertEqual(
+            [
+                os.path.join(".", ".gitignore"),
+                os.path.join(".", "src", "a.py"),
+                os.path.join(".", "src", "new.txt"),
+                os.path.join(".", "src", "sub", "b.txt"),
+                os.path.join(".", "srcother", "c.txt"),
+            ],
+            repository.list_files("."),
+        )
+        self.assertIsNone(repository.list_files(os.pardir))
+        self.assertEqual([], repository.list_files("venv"))
+
+    def test_changes(self):
+        """
+        The changed files and lines are read from git only once.
+        """
+        self.write("a.txt", "one\ntwo\n")
+        self.write("b.txt")
+        self.git("add", ".")
+        self.git("commit", "-q", "-m", "initial")
+        self.write("a.txt", "one\nchanged\nthree\n")
+        os.remove("b.txt")
+        repository = GitRepository()
+
+        changed_files = repository.get_changed_files("HEAD")
+        self.assertEqual([("m", "a.txt"), ("d", "b.txt")], changed_files)
+        self.assertIs(changed_files, repository.get_changed_files("HEAD"))
+        self.assertEqual({"a.txt": ((2, 3),)}, repository.get_changed_lines("HEAD"))
+        with self.assertRaises(VCSError):
+            repository.get_changed_files("no-such-ref")
+
+    def test_not_a_repository(self):
+        shutil.rmtree(".git")
+
+        self.assertIsNone(GitRepository().list_files("."))
@@ -2,6 +2,9 @@
 # This software is licensed under the MIT license (see the file COPYING).
 
 
+from unittest.mock import patch
+
+from scame import formatcheck
 from scame.formatcheck import XMLChecker
 from scame.tests import CheckerTestCase
 from scame.tests.test_text import AnyTextMixin
@@ -101,6 +104,61 @@ class TestXML(CheckerTestCase):
         checker.check()
         self.assertEqual([], self.reporter.messages)
 
+    def test_chunks(self):
+        """
+        The text is fed to the parser in chunks, with the XHTML doctype
+        instead of the XML declaration.
+        """
+        checker = XMLChecker("bogus", good_markup, self.reporter)
+
+        with patch.object(formatcheck, "XML_CHUNK_SIZE", 10):
+            chunks = list(checker._get_xml_chunks())
+
+        self.assertEqual(XMLChecker.xhtml_doctype + "\n", chunks[0])
+        self.assertEqual(good_markup[good_markup.index("\n") :], "".join(chunks[1:]))
+        self.assertEqual(10, max(len(chunk) for chunk in chunks[1:]))
+
+    def test_error_after_chunks(self):
+        """
+        The line of the error is the same as when the text is fed at once.
+        """
+        text = "<root>\n" + "<a>hello&nbsp;world</a>\n" * 100 + "<b>\n</root>\n"
+        checker = XMLChecker("bogus", text, self.reporter)
+
+        with patch.object(formatcheck, "XML_CHUNK_SIZE", 7):
+            checker.check()
+
+        self.assertEqual([(103, "mismatched tag")], self.reporter.messages)
+
+    def test_undefined_entity(self):
+        checker = XMLChecker("bogus", "<root>\n&bogus;</root>\n", self.reporter)
+        checker.check()
+        self.assertEqual([(2, "undefined entity")], self.reporter.messages)
+
+    def test_multi_byte_encoding(self):
+        """
+        The encoding from the XML declaration is not used, also when
+        expat does not support it.
+        """
+        content = (
+            '<?xml version="1.0" encoding="Shift_JIS"?>\n'
+            "<!DOCTYPE root>\n"
+            "<root>\u65e5\u672c</root>\n"
+        )
+        checker = XMLChecker("bogus", content, self.reporter)
+        checker.check()
+        self.assertEqual([], self.reporter.messages)
+
+    def test_utf16_declaration(self):
+        content = (
+            '<?xml version="1.0" encoding="UTF-16"?>\n'
+            "<!DOCTYPE root>\n"
+            "<root>text</root>\n"
+        )
+        checker = XMLChecker("bogus", content, self.reporter)
+        checker.check()
+        self.assertEqual([], self.reporter.messages)
+
 
 class TestText(CheckerTestCase, AnyTextMixin):
     """Verify text integration."""
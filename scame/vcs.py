@@ -0,0 +1,208 @@
+"""
+Files known by the version control system.
+
+Each git command is run once and its result is kept for the lifetime of
+the `GitRepository`, usually a single run of the checkers.
+"""
+
+__all__ = [
+    "GitRepository",
+    "VCSError",
+]
+
+import bisect
+import os
+import re
+import subprocess
+from functools import cached_property
+
+# The new lines of a hunk header from a unified diff.
+_HUNK_HEADER = re.compile(r"^@@ -\S+ \+(\d+)(?:,(\d+))? @@")
+
+
+class VCSError(Exception):
+    """
+    A version control command failed.
+    """
+
+
+def parse_diff_lines(diff):
+    """
+    Return a dictionary with the sorted (first, last) ranges of the
+    changed lines for each file in the `diff` text, created with `-U0`.
+
+    Deleted files are not included.
+    """
+    result = {}
+    ranges = None
+    for line in diff.splitlines():
+        if line.startswith("+++ "):
+            name = line[4:].rstrip("\t")
+            if name.startswith('"') and name.endswith('"'):
+                name = name[1:-1]
+            if name == "/dev/null":
+                # A deleted file.
+                ranges = None
+                continue
+            if name.startswith("b/"):
+                name = name[2:]
+            ranges = result.setdefault(os.path.normpath(name), [])
+            continue
+
+        if ranges is None or not line.startswith("@@ "):
+            continue
+        match = _HUNK_HEADER.match(line)
+        if match is None:
+            continue
+        first = int(match.group(1))
+        count = 1 if match.group(2) is None else int(match.group(2))
+        if count:
+            # Hunks with only removed lines have no new lines.
+            ranges.append((first, first + count - 1))
+
+    return {name: tuple(sorted(ranges)) for name, ranges in result.items()}
+
+
+def parse_name_status(output):
+    """
+    Return a list of (action, path) from the `output` of
+    `git diff --name-status -z`.
+
+    For the renamed and copied files, the path is the new path.
+    """
+    result = []
+    parts = output.split("\0")
+    index = 0
+    while index < len(parts) and parts[index]:
+        action = parts[index].lower()
+        if action[:1] in ("r", "c"):
+            # Followed by the source and the destination paths.
+            name = parts[index + 2]
+            index += 3
+        else:
+            name = parts[index + 1]
+            index += 2
+        result.append((action, name))
+    return result
+
+
+class GitRepository:
+    """
+    The git repository of the current working folder.
+
+    The paths are relative to the current working folder.
+    """
+
+    def __init__(self):
+        self._changed_files = {}
+        self._changed_lines = {}
+
+    def _run(self, *args):
+        """
+        Return the output of the git command with `args`.
+
+        Raises VCSError when git fails or is not available.
+        """
+        command = ("git",) + args
+        try:
+            process = subprocess.run(
+                command,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
+        except OSError as error:
+            raise VCSError("Failed to execute %s: %s" % (" ".join(command), error))
+        if process.returncode != 0:
+            raise VCSError(
+                "Failed to execute %s\n%s"
+                % (
+                    " ".join(command),
+                    process.stderr.decode("utf-8", "replace").strip(),
+                )
+            )
+        return process.stdout.decode("utf-8", "surrogateescape")
+
+    def get_changed_files(self, ref):
+        """
+        Return a list of (action, path) for the files changed in
+        comparison with `ref`.
+
+        The paths are relative to the root of the repository.
+        """
+        result = self._changed_files.get(ref)
+        if result is None:
+            result = parse_name_status(
+                self._run("diff", "--name-status", "-z", "--no-renames", ref)
+            )
+            self._changed_files[ref] = result
+        return result
+
+    def get_changed_lines(self, ref):
+        """
+        Return a dictionary with the sorted (first, last) ranges of the
+        lines changed in comparison with `ref`, for each changed file.
+
+        The paths are relative to the root of the repository.
+        """
+        result = self._changed_lines.get(ref)
+        if result is None:
+            result = parse_diff_lines(
+                self._run(
+                    "diff",
+                    "-U0",
+                    "--no-color",
+                    "--no-ext-diff",
+                    "--src-prefix=a/",
+                    "--dst-prefix=b/",
+                    ref,
+                )
+            )
+            self._changed_lines[ref] = result
+        return result
+
+    @cached_property
+    def files(self):
+        """
+        The sorted list of the files under the current folder which are
+        tracked, or not tracked and not ignored.
+
+        `None` when the current folder is not in a git repository.
+        """
+        try:
+            output = self._run(
+                "ls-files", "-z", "--cached", "--others", "--exclude-standard"
+            )
+        except VCSError:
+            return None
+        return sorted({os.path.normpath(name) for name in output.split("\0") if name})
+
+    def list_files(self, dir_path):
+        """
+        Return the paths of the files from `files` inside `dir_path`.
+
+        `None` when `dir_path` is not inside the current folder or the
+        current folder is not in a git repository.
+        The paths start with `dir_path`, as for `os.walk`.
+        """
+        relative = os.path.relpath(dir_path)
+        if relative == os.pardir or relative.startswith(os.pardir + os.sep):
+            return None
+        files = self.files
+        if files is None:
+            return None
+
+        if relative == os.curdir:
+            prefix = ""
+        else:
+            prefix = relative + os.sep
+        start = bisect.bisect_left(files, prefix)
+        result = []
+        for name in files[start:]:
+            if not name.startswith(prefix):
+                break
+            path = os.path.join(dir_path, name[len(prefix) :])
+            # Removed from the disk, but still in the index.
+            if os.path.isfile(path):
+                result.append(path)
+        return result
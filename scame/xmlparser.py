@@ -0,0 +1,133 @@
+# Copyright (C) 2009-2013 - Curtis Hovey <sinzui.is at verizon.net>
+# This software is licensed under the MIT license (see the file COPYING).
+"""
+Well-formedness parser for XML documents.
+
+This is a separate module, so that expat and ElementTree are only
+imported when XML files are checked.
+"""
+
+__all__ = [
+    "FastParser",
+    "FastTreeBuilder",
+    "ValidatingParser",
+]
+
+from html.entities import entitydefs
+from xml.etree import ElementTree
+from xml.etree.ElementTree import ParseError
+from xml.parsers import expat
+
+
+class FastTreeBuilder(ElementTree.TreeBuilder):
+    def _flush(self):
+        if self._data:
+            if self._last is not None:
+                # Ensure all text is ascii; the data is never written back.
+                text = "".join([b for b in str(self._data) if ord(b) < 128])
+                if self._tail:
+                    assert self._last.tail is None, "internal error (tail)"
+                    self._last.tail = text
+                else:
+                    assert self._last.text is None, "internal error (text)"
+                    self._last.text = text
+            self._data = []
+
+
+class FastParser:
+    """A simple and pure-python parser that checks well-formedness.
+
+    This parser works in py 2 and 3. It handles entities and ignores
+    namespaces. This parser works with python ElementTree.
+    """
+
+    def __init__(self, html=0, target=None, encoding=None):
+        parser = expat.ParserCreate(encoding, None)
+        target = FastTreeBuilder()
+        self.parser = parser
+        self.target = target
+        self._error = expat.error
+        self._names = {}  # Name memo cache
+        parser.DefaultHandlerExpand = self._default
+        parser.StartElementHandler = target.start
+        parser.EndElementHandler = target.end
+        parser.CharacterDataHandler = target.data
+        parser.buffer_text = 1
+        # Py3, but not Py2.
+        # parser.ordered_attributes = 1
+        # parser.specified_attributes = 1
+        self._doctype = None
+        self.entity = dict(entitydefs)
+        self.version = "Expat %d.%d.%d" % expat.version_info
+
+    def _default(self, text):
+        prefix = text[:1]
+        if prefix == "&":
+            # Deal with undefined entities.
+            data_handler = self.target.data
+            try:
+                data_handler(self.entity[text[1:-1]])
+            except KeyError:
+                err = expat.error(
+                    "undefined entity %s: line %d, column %d"
+                    % (text, self.parser.ErrorLineNumber, self.parser.ErrorColumnNumber)
+                )
+                err.code = 11  # XML_ERROR_UNDEFINED_ENTITY
+                err.lineno = self.parser.ErrorLineNumber
+                err.offset = self.parser.ErrorColumnNumber
+                raise err
+
+    def _raiseerror(self, value):
+        err = ParseError(value)
+        err.code = value.code
+        err.position = value.lineno, value.offset
+        raise err
+
+    def feed(self, data):
+        try:
+            self.parser.Parse(data, 0)
+        except self._error as v:
+            self._raiseerror(v)
+
+    def close(self):
+        try:
+            self.parser.Parse("", 1)  # End of data.
+        except self._error as v:
+            self._raiseerror(v)
+        self.target.close()
+
+
+class ValidatingParser(FastParser):
+    """
+    A parser which only checks the well-formedness of the document.
+
+    No element tree is built and the only Python handler is the one for
+    the entities which are not defined by the document, so that the
+    document can be fed in chunks using constant memory.
+    The `encoding` replaces the one from the XML declaration, as when
+    parsing text instead of bytes.
+    """
+
+    def __init__(self, encoding="utf-8"):
+        parser = expat.ParserCreate(encoding, None)
+        self.parser = parser
+        self.target = self
+        self._error = expat.error
+        # The skipped entities are the ones not defined by the document.
+        parser.SkippedEntityHandler = self._skipped
+        self.entity = entitydefs
+        self.version = "Expat %d.%d.%d" % expat.version_info
+
+    def _skipped(self, name, is_parameter_entity):
+        self._default("&%s;" % (name,))
+
+    def data(self, text):
+        """
+        Ignore the text of the entities.
+        """
+
+    def close(self):
+        try:
+            self.parser.Parse(b"", 1)  # End of data.
+        except self._error as v:
+            self._raiseerror(v)